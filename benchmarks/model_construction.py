@@ -0,0 +1,128 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure throughput of model construction.
+
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/model_construction.py [--number N]
+
+Compares regular models (a Property object per value), compact models
+(__compact__) and models with a generated constructor (__compiled__).
+Attribute access of regular models (descriptors) is checked against the
+generic access through Model.__getattr__/__setattr__, and construction
+against building of the property manager alone.
+"""
+
+import argparse
+import timeit
+import uuid
+
+from restalchemy.dm import models
+from restalchemy.dm import properties
+from restalchemy.dm import types
+
+
+FIELDS = dict(
+    ('field%02d' % i, properties.property(types.String(max_length=64),
+                                          default='value'))
+    for i in range(10))
+FIELDS.update(dict(
+    ('int_field%02d' % i, properties.property(types.Integer(min_value=0),
+                                              default=0))
+    for i in range(8)))
+FIELDS['enabled'] = properties.property(types.Boolean, default=True)
+
+
+RegularModel = type('RegularModel', (models.ModelWithUUID,), dict(FIELDS))
+CompactModel = type('CompactModel', (models.ModelWithUUID,),
+                    dict(FIELDS, __compact__=True))
+CompiledModel = type('CompiledModel', (models.ModelWithUUID,),
+                     dict(FIELDS, __compiled__=True))
+# A regular model without descriptors, its properties are got by
+# Model.__getattr__ and set by __setattr__ through the property manager.
+GenericModel = type('GenericModel', (models.ModelWithUUID,), dict(FIELDS))
+for _name in FIELDS:
+    delattr(GenericModel, _name)
+GenericModel._shadowed_names = frozenset(FIELDS)
+GenericModel.__setattr__ = models._set_shadowed_property
+
+
+KWARGS = dict(('field%02d' % i, 'value%d' % i) for i in range(10))
+KWARGS.update(dict(('int_field%02d' % i, i) for i in range(8)))
+KWARGS['uuid'] = uuid.uuid4()
+
+# Minimal rate of an operation relative to its reference.
+TOLERANCE = 0.7
+
+
+def measure(func, number):
+    return number / min(timeit.repeat(func, repeat=5, number=number))
+
+
+def check_hot_paths(number):
+    model = RegularModel(**KWARGS)
+    generic = GenericModel(**KWARGS)
+
+    def getattr_model():
+        return model.field01
+
+    def getattr_generic():
+        return generic.field01
+
+    def setattr_model():
+        model.field01 = 'value'
+
+    def setattr_generic():
+        generic.field01 = 'value'
+
+    def construct_model():
+        return RegularModel(**KWARGS)
+
+    def construct_manager():
+        return properties.PropertyManager(RegularModel.properties, **KWARGS)
+
+    for name, func, reference in (
+            ('getattr', getattr_model, getattr_generic),
+            ('setattr', setattr_model, setattr_generic),
+            ('construction', construct_model, construct_manager)):
+        rate = measure(func, number)
+        reference_rate = measure(reference, number)
+        print("%-14s %10.0f ops/s  reference %10.0f ops/s" % (
+            name, rate, reference_rate))
+        assert rate >= reference_rate * TOLERANCE, (
+            "%s of a model is slower than its reference" % name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    check_hot_paths(args.number)
+
+    baseline = None
+    for model in (RegularModel, CompactModel, CompiledModel):
+        rate = measure(lambda: model(**KWARGS), args.number)
+        baseline = baseline or rate
+        print("%-14s %10.0f objects/s  x%.2f" % (model.__name__, rate,
+                                                 rate / baseline))
+
+
+if __name__ == '__main__':
+    main()
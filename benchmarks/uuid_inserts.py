@@ -0,0 +1,86 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure insert throughput of random and time-ordered UUID keys.
+
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/uuid_inserts.py [--rows N] [--step N]
+
+Rows are inserted into an SQLite WITHOUT ROWID table (the primary key is
+a clustered B-tree like in InnoDB) with a small page cache, so the table
+outgrows memory. Throughput is printed for every step as the table grows.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from restalchemy.common import utils
+
+
+GENERATORS = (('uuid4', uuid.uuid4), ('uuid7', utils.uuid7))
+PAYLOAD = 'x' * 200
+
+
+def run(generator, rows, step, cache_pages):
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA cache_size = %d" % cache_pages)
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("CREATE TABLE records (uuid BLOB PRIMARY KEY, "
+                           "payload TEXT) WITHOUT ROWID")
+        rates = []
+        for _ in range(rows // step):
+            values = [(generator().bytes, PAYLOAD) for _ in range(step)]
+            started = time.time()
+            with connection:
+                for value in values:
+                    connection.execute("INSERT INTO records VALUES (?, ?)",
+                                       value)
+            rates.append(step / (time.time() - started))
+        connection.close()
+        return rates
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--step', type=int, default=100000)
+    parser.add_argument('--cache-pages', type=int, default=2000)
+    args = parser.parse_args()
+
+    results = [(name, run(generator, args.rows, args.step,
+                          args.cache_pages))
+               for name, generator in GENERATORS]
+    print("%10s" % "rows" +
+          "".join("%16s" % ("%s rows/s" % name) for name, _ in results))
+    for index in range(args.rows // args.step):
+        print("%10d" % ((index + 1) * args.step) +
+              "".join("%16.0f" % rates[index] for _, rates in results))
+
+
+if __name__ == '__main__':
+    main()
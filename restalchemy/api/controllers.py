@@ -24,9 +24,12 @@ import webob
 from restalchemy.api import packers
 from restalchemy.api import resources
 from restalchemy.common import exceptions as exc
+from restalchemy.storage import base as storage_base
 
 
 LOG = logging.getLogger(__name__)
+# NOTE: A marker of the next page is returned to clients in the header.
+PAGINATION_MARKER_HEADER = 'X-Pagination-Marker'
 
 
 class Controller(object):
@@ -58,6 +61,9 @@ class Controller(object):
             return body, c, headers
 
         def create_response(body, status, headers):
+            if (isinstance(body, storage_base.Page) and
+                    body.marker is not None):
+                headers[PAGINATION_MARKER_HEADER] = body.marker
             if body is not None:
                 headers['Content-Type'] = packers.get_content_type(headers)
                 packer = self.get_packer(headers['Content-Type'])
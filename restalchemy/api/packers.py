@@ -18,10 +18,16 @@
 
 import copy
 import json
+import re
 import types
+import uuid
 
 import six
 
+from restalchemy.dm import batches
+from restalchemy.dm import types as ra_types
+from restalchemy.storage import base as storage_base
+
 
 DEFAULT_CONTENT_TYPE = 'application/json'
 
@@ -46,12 +52,29 @@ class BaseResourcePacker(object):
                 api_name = prop.api_name
                 value = getattr(obj, name)
                 if (value is not None and prop.is_public()):
-                    result[api_name] = prop.dump_value(value)
+                    result[api_name] = self._dump_value(prop, value)
 
             return result
 
+    def pack_batch(self, batch):
+        # NOTE: Values are dumped column by column without creating models.
+        result = [{} for _ in range(len(batch))]
+        for name, prop in self._rt.get_fields():
+            if not prop.is_public():
+                continue
+            api_name = prop.api_name
+            for row, value in zip(result, batch.get_column(name)):
+                if value is not None:
+                    row[api_name] = self._dump_value(prop, value)
+        return result
+
+    def _dump_value(self, prop, value):
+        return prop.dump_value(value)
+
     def pack(self, obj):
-        if (isinstance(obj, list) or
+        if isinstance(obj, batches.ModelBatch):
+            return self.pack_batch(obj)
+        if (isinstance(obj, (list, storage_base.Page)) or
                 isinstance(obj, types.GeneratorType)):
             return [self.pack_resource(resource) for resource in obj]
         else:
@@ -74,10 +97,50 @@ class BaseResourcePacker(object):
         return result
 
 
+class _RawJSON(object):
+    """JSON document which is put into a packed result as is."""
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw):
+        self.raw = raw
+
+
+def _is_json_type(prop_type):
+    return isinstance(getattr(prop_type, 'nested_type', prop_type),
+                      ra_types.JSON)
+
+
 class JSONPacker(BaseResourcePacker):
 
+    def _dump_value(self, prop, value):
+        # NOTE: An unchanged document is put into the result as is instead
+        #       of being decoded and encoded again.
+        if (isinstance(value, ra_types.LazyJSONDict) and
+                _is_json_type(getattr(prop, 'prop_type', None))):
+            raw = value.get_raw()
+            if raw is not None:
+                return _RawJSON(raw)
+        return super(JSONPacker, self)._dump_value(prop, value)
+
     def pack(self, obj):
-        return json.dumps(super(JSONPacker, self).pack(obj))
+        raw_documents = []
+        marker = uuid.uuid4().hex
+
+        def default(value):
+            if isinstance(value, _RawJSON):
+                raw_documents.append(value.raw)
+                return "%s-%d" % (marker, len(raw_documents) - 1)
+            raise TypeError("%r is not JSON serializable" % value)
+
+        result = json.dumps(super(JSONPacker, self).pack(obj),
+                            default=default)
+        if not raw_documents:
+            return result
+        # NOTE: Placeholders are replaced by documents in one pass.
+        return re.sub('"%s-([0-9]+)"' % marker,
+                      lambda match: raw_documents[int(match.group(1))],
+                      result)
 
     def unpack(self, value):
         if (six.PY3 and isinstance(value, six.binary_type)):
@@ -124,6 +124,10 @@ class ResourceRAProperty(ResourceProperty):
         self._prop_type = (
             prop_type() if inspect.isclass(prop_type) else prop_type)
 
+    @property
+    def prop_type(self):
+        return self._prop_type
+
     def parse_value(self, req, value):
         return self._prop_type.from_simple_type(value)
 
@@ -122,6 +122,12 @@ class ReadOnlyProperty(PropertyException):
     message = ("Property '%(name)s' of model %(model)s is read only!")
 
 
+class DeferredProperty(PropertyException):
+
+    message = ("Property '%(name)s' of model %(model)s isn't loaded and "
+               "deferred loading is disabled.")
+
+
 class TypeError(RestAlchemyException, TypeError):
 
     message = "Invalid type value '%(value)s' for '%(property_type)s'"
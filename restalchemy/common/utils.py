@@ -17,7 +17,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import binascii
 import collections
+import os
+import threading
+import time
+import uuid
+
 import six
 
 
@@ -82,3 +88,34 @@ def lastslash(url):
         return url + '/'
     else:
         return url
+
+
+_UUID7_LOCK = threading.Lock()
+_UUID7_STATE = [0, 0]  # last timestamp (ms), counter
+
+
+def uuid7():
+    """Generate a time-ordered UUID (version 7).
+
+    48 bits of Unix time in milliseconds are followed by a 12 bit counter
+    which keeps UUIDs generated by the process ordered within a millisecond
+    (and when the clock goes back), the rest 62 bits are random. Values
+    are close to each other in an index, so inserts don't touch random
+    pages of a clustered primary key.
+    """
+    with _UUID7_LOCK:
+        timestamp = int(time.time() * 1000)
+        last_timestamp, counter = _UUID7_STATE
+        if timestamp > last_timestamp:
+            counter = 0
+        else:
+            timestamp = last_timestamp
+            counter += 1
+            if counter > 0xfff:
+                timestamp += 1
+                counter = 0
+        _UUID7_STATE[:] = [timestamp, counter]
+    random_bits = int(binascii.hexlify(os.urandom(8)), 16) >> 2
+    return uuid.UUID(int=((timestamp & 0xffffffffffff) << 80 |
+                          0x7 << 76 | counter << 64 |
+                          0x2 << 62 | random_bits))
@@ -0,0 +1,303 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import six
+
+from restalchemy.dm import properties
+from restalchemy.dm import types
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# NOTE: Columns of these types can be kept in numpy arrays. Their simple
+#       and python representations are the same numbers.
+NUMPY_DTYPES = {
+    types.Integer: 'int64',
+    types.Float: 'float64',
+    types.Boolean: 'bool',
+}
+
+
+def get_property_type(model_cls, name):
+    creator = model_cls.properties.properties[name]
+    if isinstance(creator, properties.PropertyCollection):
+        raise TypeError("Containers are not supported by ModelBatch (%s)" %
+                        name)
+    prepare_type = getattr(creator.get_property_class(), 'prepare_type',
+                           None)
+    if prepare_type is None:
+        return creator.get_property_type()
+    return prepare_type(creator.get_property_type())
+
+
+def get_value_check(model_cls, name):
+    """Return a function which validates a value of a property.
+
+    The value is checked as the constructor of the model checks it, the
+    default is taken for None.
+    """
+    creator = model_cls.properties.properties[name]
+    if not creator.is_compact():
+        return lambda value: creator(value).value
+    prop_class = creator.get_property_class()
+    prop_type = get_property_type(model_cls, name)
+    required = creator.is_required()
+
+    def check_value(value):
+        if value is None:
+            value = creator.get_default()
+        return prop_class.check_value(prop_type, value, required)
+
+    return check_value
+
+
+def _to_python(value):
+    if numpy is not None and isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+class ModelView(object):
+    """Lazy read-only view on a row of ModelBatch.
+
+    Values are read from the columns of the batch on attribute access. A
+    model object is created only by to_model().
+    """
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch, index):
+        super(ModelView, self).__init__()
+        self._batch = batch
+        self._index = index
+
+    def __getattr__(self, name):
+        try:
+            return self._batch.get_value(name, self._index)
+        except KeyError:
+            raise AttributeError("%s object has no attribute %s" % (
+                type(self).__name__, name))
+
+    def __getitem__(self, name):
+        return self._batch.get_value(name, self._index)
+
+    def get_id(self):
+        return self.to_model().get_id()
+
+    def to_model(self):
+        return self._batch.get_model(self._index)
+
+    def __repr__(self):
+        return '<%s %s[%d]>' % (type(self).__name__,
+                                self._batch.model_cls.__name__,
+                                self._index)
+
+
+class ModelBatch(collections.Sequence):
+    """Columnar container of model data.
+
+    A batch keeps values of a model class as a list per property instead
+    of a model object per row, so conversion from/to simple types is done
+    column by column. Numeric and boolean columns without NULL values are
+    kept in numpy arrays if use_numpy is set and numpy is installed.
+    Items of a batch are lazy ModelView objects.
+
+    Values of a batch aren't validated until check() is called. Models
+    are created by the constructor of the model class unless the batch is
+    trusted (e.g. it's built from rows of the own database of a model
+    with trusted restore), then restore_trusted is used.
+    """
+
+    def __init__(self, model_cls, columns=None, use_numpy=False,
+                 trusted=False):
+        super(ModelBatch, self).__init__()
+        self._model_cls = model_cls
+        self._trusted = trusted
+        self._names = tuple(sorted(model_cls.properties))
+        self._types = dict((name, get_property_type(model_cls, name))
+                           for name in self._names)
+        self._use_numpy = use_numpy and numpy is not None
+        columns = columns or {}
+        unknown = set(columns) - set(self._names)
+        if unknown:
+            raise ValueError("Unknown columns: %s" % sorted(unknown))
+        sizes = set(len(column) for column in columns.values())
+        if len(sizes) > 1:
+            raise ValueError("All columns should have the same length")
+        self._size = sizes.pop() if sizes else 0
+        self._columns = {}
+        for name in self._names:
+            column = columns.get(name)
+            self._columns[name] = self._make_column(
+                name, [None] * self._size if column is None else column)
+
+    def _make_column(self, name, values):
+        dtype = NUMPY_DTYPES.get(type(self._types[name]))
+        if self._use_numpy and dtype is not None:
+            if isinstance(values, numpy.ndarray):
+                return values
+            if None not in values:
+                try:
+                    return numpy.array(values, dtype=dtype)
+                except (OverflowError, TypeError, ValueError):
+                    pass
+        return values if isinstance(values, list) else list(values)
+
+    @classmethod
+    def from_models(cls, model_cls, models, use_numpy=False):
+        columns = collections.defaultdict(list)
+        names = sorted(model_cls.properties)
+        for model in models:
+            for name in names:
+                columns[name].append(model[name])
+        # NOTE: Values of model objects were validated.
+        return cls(model_cls, dict(columns) if columns else None,
+                   use_numpy=use_numpy, trusted=True)
+
+    @classmethod
+    def from_simple_columns(cls, model_cls, columns, use_numpy=False,
+                            storage=False, trusted=False):
+        result = {}
+        for name, column in six.iteritems(columns):
+            prop_type = get_property_type(model_cls, name)
+            dtype = NUMPY_DTYPES.get(type(prop_type))
+            if (use_numpy and numpy is not None and dtype is not None and
+                    None not in column):
+                # NOTE: Vectorized conversion of numbers and booleans.
+                result[name] = numpy.array(column, dtype=dtype)
+                continue
+            convert = (prop_type.from_storage_type if storage else
+                       prop_type.from_simple_type)
+            result[name] = [None if value is None else convert(value)
+                            for value in column]
+        return cls(model_cls, result, use_numpy=use_numpy, trusted=trusted)
+
+    @classmethod
+    def from_simple_rows(cls, model_cls, rows, use_numpy=False,
+                         storage=False, trusted=False):
+        """Create a batch from rows in simple (or storage) format."""
+        columns = collections.defaultdict(list)
+        for row in rows:
+            for name, value in six.iteritems(row):
+                columns[name].append(value)
+        return cls.from_simple_columns(model_cls, columns,
+                                       use_numpy=use_numpy, storage=storage,
+                                       trusted=trusted)
+
+    @classmethod
+    def from_simple_tuples(cls, model_cls, names, rows, use_numpy=False,
+                           storage=False, trusted=False):
+        """Create a batch from row tuples with values ordered by names."""
+        columns = {}
+        for name, column in zip(names, zip(*rows)):
+            columns[name] = list(column)
+        return cls.from_simple_columns(model_cls, columns,
+                                       use_numpy=use_numpy, storage=storage,
+                                       trusted=trusted)
+
+    @property
+    def model_cls(self):
+        return self._model_cls
+
+    @property
+    def names(self):
+        return self._names
+
+    @property
+    def trusted(self):
+        return self._trusted
+
+    def check(self):
+        """Validate values column by column without model objects.
+
+        Values are checked as the constructor of the model checks them
+        and None values are replaced by defaults. validate() of the model
+        class isn't called. The batch is trusted after it.
+        """
+        if self._trusted:
+            return
+        for name in self._names:
+            check_value = get_value_check(self._model_cls, name)
+            self._columns[name] = self._make_column(
+                name, [check_value(value) for value in self.get_column(name)])
+        self._trusted = True
+
+    def get_column(self, name):
+        column = self._columns[name]
+        if isinstance(column, list):
+            return column
+        return column.tolist()
+
+    def get_value(self, name, index):
+        return _to_python(self._columns[name][index])
+
+    def get_model(self, index):
+        if self._trusted:
+            return self._model_cls.restore_trusted(**self.get_row(index))
+        return self._model_cls(**self.get_row(index))
+
+    def get_row(self, index):
+        return dict((name, self.get_value(name, index))
+                    for name in self._names)
+
+    def to_models(self):
+        return [self.get_model(index) for index in range(self._size)]
+
+    def to_simple_columns(self, storage=False):
+        result = {}
+        for name in self._names:
+            column = self._columns[name]
+            if not isinstance(column, list):
+                result[name] = column.tolist()
+                continue
+            prop_type = self._types[name]
+            convert = (prop_type.to_storage_type if storage else
+                       prop_type.to_simple_type)
+            result[name] = [None if value is None else convert(value)
+                            for value in column]
+        return result
+
+    def to_simple_rows(self, storage=False):
+        columns = self.to_simple_columns(storage=storage)
+        return [dict((name, columns[name][index]) for name in self._names)
+                for index in range(self._size)]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self)(
+                self._model_cls,
+                dict((name, column[index])
+                     for name, column in six.iteritems(self._columns)),
+                use_numpy=self._use_numpy, trusted=self._trusted)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ModelBatch index out of range")
+        return ModelView(self, index)
+
+    def __repr__(self):
+        return '<%s %s (%d rows)>' % (type(self).__name__,
+                                      self._model_cls.__name__, self._size)
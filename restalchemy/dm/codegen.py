@@ -0,0 +1,233 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid
+
+import six
+
+from restalchemy.common import exceptions as exc
+from restalchemy.dm import properties
+from restalchemy.dm import types
+
+
+def _is_default_check(creator):
+    check_value = creator.get_property_class().check_value
+    return (six.get_method_function(check_value) is
+            six.get_method_function(properties.Property.check_value))
+
+
+def _get_inline_check(prop_type, namespace, suffix):
+    """Return python expression which validates `value` or None.
+
+    Only exact built-in types are inlined. Subclasses may override
+    validate so they are checked by the generic code path.
+    """
+    type_cls = type(prop_type)
+    checks = []
+
+    def constant(name, value):
+        name = "%s_%s" % (name, suffix)
+        namespace[name] = value
+        return name
+
+    def add_bounds(min_name, min_value, max_name, max_value):
+        if min_value != -types.INFINITI:
+            checks.append("value >= %s" % constant(min_name, min_value))
+        if max_value != types.INFINITI:
+            checks.append("value <= %s" % constant(max_name, max_value))
+
+    if type_cls is types.String:
+        checks.append("isinstance(value, string_types)")
+        if prop_type.min_length > 0:
+            checks.append("len(value) >= %s" % constant(
+                'min_length', prop_type.min_length))
+        if prop_type.max_length < six.MAXSIZE:
+            checks.append("len(value) <= %s" % constant(
+                'max_length', prop_type.max_length))
+    elif type_cls is types.Integer:
+        checks.append("isinstance(value, integer_types)")
+        add_bounds('min_value', prop_type.min_value,
+                   'max_value', prop_type.max_value)
+    elif type_cls is types.Float:
+        checks.append("isinstance(value, float)")
+        add_bounds('min_value', prop_type.min_value,
+                   'max_value', prop_type.max_value)
+    elif type_cls is types.Boolean:
+        checks.append("isinstance(value, bool)")
+    elif type_cls is types.UUID:
+        checks.append("isinstance(value, UUID)")
+    elif type_cls is types.Enum:
+        checks.append("value in %s" % constant('enum_values',
+                                               prop_type.values))
+    else:
+        return None
+    return " and ".join(checks)
+
+
+def _get_check_lines(layout, index, namespace, required_exc):
+    creator = layout.get_creator(index)
+    prop_type = layout.get_type(index)
+    namespace['type_%d' % index] = prop_type
+    lines = ["if value is None:"]
+    if layout.is_required(index):
+        lines.append("    raise %s" % required_exc)
+    else:
+        lines.append("    pass")
+    check = (_get_inline_check(prop_type, namespace, index)
+             if _is_default_check(creator) else None)
+    if check is not None:
+        lines.extend([
+            "elif not (%s):" % check,
+            "    raise type_error(value=value, property_type=type_%d)" % (
+                index)])
+    else:
+        namespace['check_value_%d' % index] = (
+            creator.get_property_class().check_value)
+        lines.extend([
+            "else:",
+            "    value = check_value_%d(type_%d, value)" % (index, index)])
+    return lines
+
+
+def _get_default_lines(layout, index, namespace):
+    default = layout.get_creator(index).get_raw_default()
+    if default is None:
+        return []
+    namespace['default_%d' % index] = default
+    return ["if value is None:",
+            "    value = default_%d%s" % (index,
+                                          "()" if callable(default) else "")]
+
+
+def _compile(name, lines, namespace):
+    source = "\n".join(lines)
+    six.exec_(source, namespace)
+    function = namespace[name]
+    function.__source__ = source
+    return function
+
+
+def _get_namespace():
+    return {
+        'string_types': six.string_types,
+        'integer_types': six.integer_types,
+        'UUID': uuid.UUID,
+        'type_error': exc.TypeError,
+        'property_required': exc.PropertyRequired,
+    }
+
+
+def compile_build_values(layout):
+    namespace = _get_namespace()
+    lines = ["def build_values(kwargs):"]
+    for index, name in enumerate(layout.names):
+        body = ["value = kwargs.get(%r)" % name]
+        body.extend(_get_default_lines(layout, index, namespace))
+        body.extend(_get_check_lines(
+            layout, index, namespace,
+            required_exc="property_required(name=%r)" % name))
+        body.append("value_%d = value" % index)
+        lines.extend("    " + line for line in body)
+    lines.append("    return [%s]" % ", ".join(
+        "value_%d" % index for index in range(len(layout.names))))
+    return _compile('build_values', lines, namespace)
+
+
+def compile_restore_values(layout):
+    namespace = _get_namespace()
+    lines = ["def restore_values(kwargs):"]
+    for index, name in enumerate(layout.names):
+        body = ["value = kwargs.get(%r)" % name]
+        body.extend(_get_default_lines(layout, index, namespace))
+        body.append("value_%d = value" % index)
+        lines.extend("    " + line for line in body)
+    lines.append("    return [%s]" % ", ".join(
+        "value_%d" % index for index in range(len(layout.names))))
+    return _compile('restore_values', lines, namespace)
+
+
+def compile_check_value(layout, index):
+    namespace = _get_namespace()
+    lines = ["def check_value(value):"]
+    lines.extend("    " + line for line in _get_check_lines(
+        layout, index, namespace, required_exc="property_required()"))
+    lines.append("    return value")
+    return _compile('check_value', lines, namespace)
+
+
+def compile_row_decoder(names, converters, restore, constants=None,
+                        convert_null=None, checks=None):
+    """Compile a function which restores a model from a row tuple.
+
+    converters are functions by positions of names (None for values which
+    are taken as is), restore is called with converted values and
+    constants as keyword arguments. None values are passed as is unless
+    convert_null is set for their positions. checks are functions by
+    positions which validate converted values (None for values which
+    aren't checked). Arguments are passed by a dictionary, so column
+    names don't have to be identifiers.
+    """
+    namespace = {'restore': restore, 'constants': constants or {}}
+    convert_null = convert_null or [False] * len(names)
+    checks = checks or [None] * len(names)
+    arguments = []
+    for index, (name, convert) in enumerate(zip(names, converters)):
+        if convert is None:
+            value = "value_%d" % index
+        elif convert_null[index]:
+            namespace['convert_%d' % index] = convert
+            value = "convert_%d(value_%d)" % (index, index)
+        else:
+            namespace['convert_%d' % index] = convert
+            value = "(None if value_%d is None else convert_%d(value_%d))" % (
+                index, index, index)
+        if checks[index] is not None:
+            namespace['check_%d' % index] = checks[index]
+            value = "check_%d(%s)" % (index, value)
+        arguments.append("%r: %s" % (name, value))
+    lines = ["def decode_row(row):"]
+    if names:
+        lines.append("    %s, = row" % ", ".join(
+            "value_%d" % index for index in range(len(names))))
+    lines.append("    values = {%s}" % ", ".join(arguments))
+    if constants:
+        lines.append("    values.update(constants)")
+    lines.append("    return restore(**values)")
+    return _compile('decode_row', lines, namespace)
+
+
+class CompiledPropertyLayout(properties.PropertyLayout):
+    """Property layout with generated constructor and validators.
+
+    Source code of a constructor, of a trusted restore and of a validator
+    per property is generated once per model class. Checks of the
+    built-in types (String, Integer, Float, Boolean, UUID and Enum) are
+    inlined, other types are validated by the property class.
+    """
+
+    def __init__(self, property_collection, model_cls=None):
+        super(CompiledPropertyLayout, self).__init__(property_collection,
+                                                     model_cls)
+        self._check_functions = tuple(
+            compile_check_value(self, index)
+            for index in range(len(self.names)))
+        self.build_values = compile_build_values(self)
+        self.restore_values = compile_restore_values(self)
+
+    def check_value(self, index, value):
+        return self._check_functions[index](value)
@@ -21,12 +21,34 @@ import collections
 import uuid
 
 from restalchemy.common import exceptions as exc
+from restalchemy.common import utils
+from restalchemy.dm import codegen
 from restalchemy.dm import properties
 from restalchemy.dm import types
 
 import six
 
 
+def _set_shadowed_property(self, name, value):
+    # NOTE: Properties which are shadowed by attributes of the class (e.g.
+    #       items) have no descriptors and are set through the manager.
+    if name not in self._shadowed_names:
+        return object.__setattr__(self, name, value)
+    try:
+        self.properties[name].value = value
+    except exc.TypeError as e:
+        raise exc.ModelTypeError(
+            property_name=name,
+            value=value,
+            model=self,
+            property_type=e.get_property_type())
+    except exc.ReadOnlyProperty:
+        raise exc.ReadOnlyProperty(
+            name=name,
+            model=type(self)
+        )
+
+
 class MetaModel(abc.ABCMeta):
 
     def __new__(cls, name, bases, attrs):
@@ -44,7 +66,61 @@ class MetaModel(abc.ABCMeta):
         attrs['properties'] = (
             attrs.pop('properties', properties.PropertyCollection()) +
             all_base_properties + properties.PropertyCollection(**props))
-        return super(MetaModel, cls).__new__(cls, name, bases, attrs)
+        model = super(MetaModel, cls).__new__(cls, name, bases, attrs)
+        if getattr(model, '__compiled__', False):
+            model._layout = codegen.CompiledPropertyLayout(model.properties,
+                                                           model)
+        elif getattr(model, '__compact__', False):
+            model._layout = properties.PropertyLayout(model.properties, model)
+        else:
+            model._layout = None
+        cls._set_property_names(model)
+        cls._install_descriptors(model)
+        return model
+
+    @staticmethod
+    def _set_property_names(model):
+        # NOTE: Names are computed once per class and stored in the class
+        #       itself. A subclass gets its own names from the merged
+        #       collection of properties when it is created.
+        id_names = []
+        data_names = []
+        for name, item in model.properties.properties.items():
+            if (isinstance(item, properties.PropertyCreator) and
+                    item.is_id_property()):
+                id_names.append(name)
+            else:
+                data_names.append(name)
+        model._id_property_names = tuple(sorted(id_names))
+        model._data_property_names = tuple(sorted(data_names))
+
+    @staticmethod
+    def _install_descriptors(model):
+        shadowed = []
+        for name in model.properties:
+            # NOTE: Don't shadow methods and attributes which are defined
+            #       in the model or its bases with the same name.
+            for klass in model.__mro__:
+                if name in vars(klass):
+                    attr = vars(klass)[name]
+                    break
+            else:
+                attr = None
+            if not (attr is None or
+                    isinstance(attr, properties.PropertyDescriptor)):
+                shadowed.append(name)
+                continue
+            if model._layout is not None:
+                descriptor = properties.CompactPropertyDescriptor(
+                    name, model._layout.index(name))
+            else:
+                descriptor = properties.PropertyDescriptor(name)
+            setattr(model, name, descriptor)
+        # NOTE: Only models with shadowed properties pay for __setattr__,
+        #       the rest are set by descriptors.
+        model._shadowed_names = frozenset(shadowed)
+        if shadowed:
+            model.__setattr__ = _set_shadowed_property
 
     def __getattr__(cls, name):
         try:
@@ -57,6 +133,16 @@ class MetaModel(abc.ABCMeta):
 @six.add_metaclass(MetaModel)
 class Model(collections.Mapping):
 
+    # Set __compact__ to True to keep values of the model in
+    # CompactPropertyManager instead of a Property object per value. Nested
+    # containers are not supported in this mode.
+    __compact__ = False
+    # Set __compiled__ to True to generate a specialized constructor and
+    # validators for the model class. It implies compact storage.
+    __compiled__ = False
+    _layout = None
+    _shadowed_names = frozenset()
+
     def __init__(self, **kwargs):
         super(Model, self).__init__()
         self.pour(**kwargs)
@@ -68,29 +154,19 @@ class Model(collections.Mapping):
             raise AttributeError("%s object has no attribute %s" % (
                 type(self).__name__, name))
 
-    def __setattr__(self, name, value):
-        try:
-            self.properties[name].value = value
-        except KeyError:
-            super(Model, self).__setattr__(name, value)
-        except exc.TypeError as e:
-            raise exc.ModelTypeError(
-                property_name=name,
-                value=value,
-                model=self,
-                property_type=e.get_property_type())
-        except exc.ReadOnlyProperty as e:
-            raise exc.ReadOnlyProperty(
-                name=name,
-                model=type(self)
-            )
-
     def pour(self, **kwargs):
         try:
-            self.properties = properties.PropertyManager(
-                self.properties,
-                **kwargs
-            )
+            if self._layout is not None:
+                manager = properties.CompactPropertyManager(
+                    self._layout,
+                    **kwargs
+                )
+            else:
+                manager = properties.PropertyManager(
+                    self.properties,
+                    **kwargs
+                )
+            object.__setattr__(self, 'properties', manager)
             self.validate()
         except exc.PropertyRequired as e:
             raise exc.PropertyRequired(
@@ -107,6 +183,24 @@ class Model(collections.Mapping):
         obj.pour(**kwargs)
         return obj
 
+    @classmethod
+    def restore_trusted(cls, **kwargs):
+        """Restore a model from values which were validated before.
+
+        Use it for data which comes from a trusted source (e.g. the own
+        database). Type checks and validate() are skipped and defaults are
+        evaluated for missing values only.
+        """
+        obj = cls.__new__(cls)
+        if cls._layout is not None:
+            manager = properties.CompactPropertyManager.restore(
+                cls._layout, **kwargs)
+        else:
+            manager = properties.PropertyManager.restore(
+                cls.properties, **kwargs)
+        object.__setattr__(obj, 'properties', manager)
+        return obj
+
     def validate(self):
         pass
 
@@ -114,28 +208,60 @@ class Model(collections.Mapping):
         for name, value in values.iteritems():
             setattr(self, name, value)
 
+    @classmethod
+    def get_id_property_names(cls):
+        return cls._id_property_names
+
+    @classmethod
+    def get_data_property_names(cls):
+        return cls._data_property_names
+
     def get_id_properties(self):
-        result = {}
-        for name, prop in self.properties.items():
-            if prop.is_id_property():
-                result[name] = prop
-        return result
+        props = self.properties
+        return dict((name, props[name]) for name in self._id_property_names)
 
     def get_data_properties(self):
-        result = {}
-        for name, prop in self.properties.items():
-            if not prop.is_id_property():
-                result[name] = prop
-        return result
+        props = self.properties
+        return dict((name, props[name])
+                    for name in self._data_property_names)
 
     def is_dirty(self):
-        for prop in self.properties.values():
-            if prop.is_dirty():
-                return True
-        return False
+        return self.properties.is_dirty()
+
+    def get_dirty_names(self):
+        return self.properties.get_dirty_names()
+
+    def clear_dirty(self):
+        """Take current values as the first values of the model."""
+        self.properties.clear_dirty()
+
+    def get_deferred_names(self):
+        """Return names of properties which aren't loaded yet.
+
+        Deferred values (see properties.DEFERRED) are loaded by
+        load_deferred() of a storage mixin on first access.
+        """
+        props = self.properties
+        return [name for name in props
+                if props[name].value is properties.DEFERRED]
+
+    def _restore_values(self, values):
+        # NOTE: Loaded values are trusted and aren't changes of the model,
+        #       so they are set as first values too.
+        if self._layout is not None:
+            for name, value in six.iteritems(values):
+                self.properties.restore_value(self._layout.index(name), value)
+            return
+        for name, value in six.iteritems(values):
+            self.properties._properties[name] = (
+                type(self).properties.restore_property(name, value))
 
     def __getitem__(self, name):
-        return self.properties[name].value
+        value = self.properties[name].value
+        if value is properties.DEFERRED:
+            self.load_deferred()
+            value = self.properties[name].value
+        return value
 
     def __iter__(self):
         return six.iterkeys(self.properties)
@@ -177,3 +303,10 @@ class ModelWithUUID(Model):
 
     def __hash__(self):
         return hash(str(self.get_id()))
+
+
+class ModelWithTimeUUID(ModelWithUUID):
+    """Model with a time-ordered UUID (see utils.uuid7) by default."""
+
+    uuid = properties.property(types.UUID, read_only=True, id_property=True,
+                               default=utils.uuid7)
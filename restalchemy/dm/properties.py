@@ -28,9 +28,35 @@ import six
 from six.moves import builtins
 
 
+class _Deferred(object):
+    """Value of a property which isn't loaded from storage yet."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<DEFERRED>'
+
+    def __reduce__(self):
+        return 'DEFERRED'
+
+
+DEFERRED = _Deferred()
+
+
+def is_mutable(property_type):
+    # NOTE: It's called for every new property, so only True is taken
+    #       instead of an isinstance check of BaseType (an ABC).
+    return getattr(property_type, 'mutable', False) is True
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractProperty(object):
 
+    # NOTE: _changed is True if the value may differ from the first one.
+    #       Properties which don't track changes keep it True, so their
+    #       values are compared on every dirty check.
+    _changed = True
+
     @abc.abstractproperty
     def value(self):
         pass
@@ -43,6 +69,13 @@ class AbstractProperty(object):
     def is_dirty(self):
         pass
 
+    def clear_dirty(self):
+        """Take the current value as the first one.
+
+        It's called when the model is saved. Properties which don't track
+        changes keep it as is.
+        """
+
 
 class BaseProperty(AbstractProperty):
     pass
@@ -56,20 +89,65 @@ class Property(BaseProperty):
                       else property_type)
         self._required = bool(required)
         self._read_only = bool(read_only)
-        default = default() if callable(default) else default
-        self.set_value_force(value if value is not None else default)
-        self.__first_value = self.value
+        if value is None:
+            value = default() if callable(default) else default
+        self.set_value_force(value)
+        if is_mutable(self._type):
+            self.clear_dirty()
+        else:
+            # NOTE: clear_dirty inlined for immutable values.
+            self.__first_value = self.value
+            self._changed = False
+
+    @classmethod
+    def restore(cls, property_type, default=None, required=False,
+                read_only=False, value=None):
+        """Create a property from a trusted value without validation."""
+        prop = cls.__new__(cls)
+        prop._type = cls.prepare_type(property_type)
+        prop._required = bool(required)
+        prop._read_only = bool(read_only)
+        if value is None:
+            value = default() if callable(default) else default
+        prop._value = value
+        prop.clear_dirty()
+        return prop
 
     def is_dirty(self):
+        # NOTE: Only values which were set or which can be changed in place
+        #       are compared with the first ones.
+        if not (self._changed or is_mutable(self._type)):
+            return False
         return not self.__first_value == self.value
 
+    def clear_dirty(self):
+        value = self.value
+        if is_mutable(self._type):
+            value = self._type.copy_value(value)
+        self.__first_value = value
+        self._changed = False
+
+    @classmethod
+    def prepare_type(cls, property_type):
+        return (property_type() if inspect.isclass(property_type)
+                else property_type)
+
+    @classmethod
+    def check_value(cls, property_type, value, required=False):
+        if value is None or property_type.validate(value):
+            if value is None and required:
+                raise exc.PropertyRequired()
+            return value
+        else:
+            raise exc.TypeError(value=value, property_type=property_type)
+
     def _safe_value(self, value):
+        # NOTE: It's check_value inlined, values are checked on every set.
         if value is None or self._type.validate(value):
             if value is None and self.is_required():
                 raise exc.PropertyRequired()
             return value
-        else:
-            raise exc.TypeError(value=value, property_type=self._type)
+        raise exc.TypeError(value=value, property_type=self._type)
 
     def is_read_only(self):
         return self._read_only
@@ -90,9 +168,11 @@ class Property(BaseProperty):
         if (self.is_read_only() or self.is_id_property()):
             raise exc.ReadOnlyProperty()
         self._value = self._safe_value(value)
+        self._changed = True
 
     def set_value_force(self, value):
         self._value = self._safe_value(value)
+        self._changed = True
 
     @property
     def property_type(self):
@@ -118,15 +198,52 @@ class PropertyCreator(object):
         return self._property(value=value, property_type=self._property_type,
                               *self._args, **self._kwargs)
 
+    def restore(self, value):
+        restore = getattr(self._property, 'restore', None)
+        if restore is None:
+            return self(value)
+        return restore(value=value, property_type=self._property_type,
+                       *self._args, **self._kwargs)
+
     def get_property_class(self):
         return self._property
 
     def get_property_type(self):
         return self._property_type
 
+    def is_id_property(self):
+        return self._property.is_id_property()
+
+    def is_required(self):
+        return bool(self._kwargs.get('required', False))
+
+    def is_read_only(self):
+        return bool(self._kwargs.get('read_only', False))
+
+    def get_raw_default(self):
+        return self._kwargs.get('default')
+
+    def get_default(self):
+        default = self.get_raw_default()
+        return default() if callable(default) else default
+
+    def is_compact(self):
+        """Check that the property can be kept in a compact layout
+
+        Compact layout stores only values, so the property class should
+        be able to validate a value without an instance (see
+        Property.check_value) and all options should be passed as keyword
+        arguments.
+        """
+        return (not self._args and
+                hasattr(self._property, 'prepare_type') and
+                hasattr(self._property, 'check_value'))
+
 
 @six.add_metaclass(abc.ABCMeta)
-class PropertyMapping(collections.Mapping):
+class PropertyMapping(object):
+
+    __slots__ = ()
 
     @abc.abstractproperty
     def properties(self):
@@ -142,6 +259,20 @@ class PropertyMapping(collections.Mapping):
         return len(self.properties)
 
 
+# NOTE: ABCs of Python 2 have no __slots__, so a subclass of
+#       collections.Mapping always gets __dict__ per instance. Mixin methods
+#       are copied to PropertyMapping and it's registered as a Mapping
+#       instead.
+for _name in ('__contains__', 'get', 'keys', 'items', 'values', 'iterkeys',
+              'itervalues', 'iteritems', '__eq__', '__ne__'):
+    if _name in vars(collections.Mapping):
+        setattr(PropertyMapping, _name, six.get_unbound_function(
+            getattr(collections.Mapping, _name)))
+PropertyMapping.__hash__ = None
+collections.Mapping.register(PropertyMapping)
+del _name
+
+
 class PropertyCollection(PropertyMapping):
 
     def __init__(self, **kwargs):
@@ -166,6 +297,9 @@ class PropertyCollection(PropertyMapping):
     def instantiate_property(self, name, value=None):
         return self._properties[name](value)
 
+    def restore_property(self, name, value=None):
+        return self._properties[name].restore(value)
+
     def get_property_class(self):
         return type(self)
 
@@ -191,10 +325,51 @@ class PropertyManager(PropertyMapping):
 #            raise TypeError("Unknown parameters: %s" % str(kwargs))
         super(PropertyManager, self).__init__()
 
+    @classmethod
+    def restore(cls, property_collection, **kwargs):
+        """Create a manager from trusted values (e.g. storage rows).
+
+        Values are not validated and defaults are evaluated for missing
+        values only.
+        """
+        manager = cls.__new__(cls)
+        manager._properties = {}
+        for name, item in property_collection.properties.items():
+            if isinstance(item, PropertyCollection):
+                prop = cls.restore(item, **kwargs.pop(name, {}))
+            else:
+                prop = property_collection.restore_property(
+                    name, kwargs.pop(name, None))
+            manager._properties[name] = prop
+        return manager
+
     @builtins.property
     def properties(self):
         return utils.ReadOnlyDictProxy(self._properties)
 
+    def __getitem__(self, name):
+        return self._properties[name]
+
+    def __iter__(self):
+        return six.iterkeys(self._properties)
+
+    def __len__(self):
+        return len(self._properties)
+
+    def is_dirty(self):
+        for prop in six.itervalues(self._properties):
+            if prop.is_dirty():
+                return True
+        return False
+
+    def get_dirty_names(self):
+        return [name for name, prop in six.iteritems(self._properties)
+                if prop.is_dirty()]
+
+    def clear_dirty(self):
+        for prop in six.itervalues(self._properties):
+            prop.clear_dirty()
+
     @builtins.property
     def value(self):
         result = {}
@@ -208,6 +383,346 @@ class PropertyManager(PropertyMapping):
             self._properties[k].value = v
 
 
+class PropertyLayout(object):
+    """Fixed per-class layout of model properties.
+
+    The layout is built once for a model class. It orders properties by
+    name and keeps shared metadata (type, required and read only flags) so
+    instances have to store values only. See CompactPropertyManager.
+    """
+
+    def __init__(self, property_collection, model_cls=None):
+        super(PropertyLayout, self).__init__()
+        self._model_cls = model_cls
+        self._names = tuple(sorted(property_collection))
+        self._indexes = dict((name, index)
+                             for index, name in enumerate(self._names))
+        self._creators = tuple(property_collection.properties[name]
+                               for name in self._names)
+        for name, creator in zip(self._names, self._creators):
+            if not (isinstance(creator, PropertyCreator) and
+                    creator.is_compact()):
+                raise TypeError("Property %s can't be stored in compact "
+                                "layout" % name)
+        self._types = tuple(
+            creator.get_property_class().prepare_type(
+                creator.get_property_type())
+            for creator in self._creators)
+        self._required = tuple(creator.is_required()
+                               for creator in self._creators)
+        self._read_only = tuple(
+            creator.is_read_only() or creator.is_id_property()
+            for creator in self._creators)
+        self._mutable_indexes = tuple(
+            index for index, prop_type in enumerate(self._types)
+            if is_mutable(prop_type))
+        self._mutable_mask = sum(1 << index
+                                 for index in self._mutable_indexes)
+
+    def __reduce__(self):
+        # NOTE: A layout of a model class is pickled by reference to the
+        #       class, so it isn't copied per instance and generated
+        #       functions of CompiledPropertyLayout aren't pickled.
+        if self._model_cls is None:
+            return object.__reduce__(self)
+        return _get_model_layout, (self._model_cls,)
+
+    @builtins.property
+    def names(self):
+        return self._names
+
+    @builtins.property
+    def mutable_mask(self):
+        """Bitmask of values which can be changed in place."""
+        return self._mutable_mask
+
+    def index(self, name):
+        return self._indexes[name]
+
+    def copy_value(self, index, value):
+        if self._mutable_mask & (1 << index):
+            return self._types[index].copy_value(value)
+        return value
+
+    def copy_values(self, values):
+        """Return a tuple of values to compare changed values with."""
+        if not self._mutable_mask:
+            return tuple(values)
+        values = list(values)
+        for index in self._mutable_indexes:
+            values[index] = self._types[index].copy_value(values[index])
+        return tuple(values)
+
+    def get_creator(self, index):
+        return self._creators[index]
+
+    def get_type(self, index):
+        return self._types[index]
+
+    def is_required(self, index):
+        return self._required[index]
+
+    def is_read_only(self, index):
+        return self._read_only[index]
+
+    def get_default(self, index):
+        return self._creators[index].get_default()
+
+    def check_value(self, index, value):
+        return self._creators[index].get_property_class().check_value(
+            self._types[index], value, self._required[index])
+
+    def build_values(self, kwargs):
+        """Build a list of values from constructor arguments.
+
+        Default values are used for missing arguments and every value is
+        validated.
+        """
+        values = []
+        for index, name in enumerate(self._names):
+            value = kwargs.get(name)
+            if value is None:
+                value = self.get_default(index)
+            try:
+                values.append(self.check_value(index, value))
+            except exc.PropertyRequired:
+                raise exc.PropertyRequired(name=name)
+        return values
+
+    def restore_values(self, kwargs):
+        """Build a list of trusted values without validation."""
+        values = []
+        for index, name in enumerate(self._names):
+            value = kwargs.get(name)
+            if value is None:
+                value = self.get_default(index)
+            values.append(value)
+        return values
+
+
+def _get_model_layout(model_cls):
+    return model_cls._layout
+
+
+class CompactProperty(BaseProperty):
+    """Property view on a value stored in CompactPropertyManager."""
+
+    def __init__(self, manager, index):
+        super(CompactProperty, self).__init__()
+        self._manager = manager
+        self._index = index
+
+    @builtins.property
+    def _layout(self):
+        return self._manager.layout
+
+    def is_dirty(self):
+        return self._manager.is_value_dirty(self._index)
+
+    def is_read_only(self):
+        return self._layout.get_creator(self._index).is_read_only()
+
+    def is_required(self):
+        return self._layout.is_required(self._index)
+
+    def is_id_property(self):
+        return self._layout.get_creator(self._index).is_id_property()
+
+    @builtins.property
+    def value(self):
+        return self._manager.get_value(self._index)
+
+    @value.setter
+    def value(self, value):
+        self._manager.set_value(self._index, value)
+
+    def set_value_force(self, value):
+        self._manager.set_value_force(self._index, value)
+
+    @builtins.property
+    def property_type(self):
+        return self._layout.get_type(self._index)
+
+
+class CompactPropertyManager(PropertyMapping):
+    """Array-backed storage of property values.
+
+    Unlike PropertyManager it doesn't create a Property object per
+    value. Current and first values are kept in two lists ordered by
+    PropertyLayout and the metadata is taken from the layout shared by
+    all instances of a model class. Setters mark changed values in a
+    bitmask so dirty checks compare the marked values and values of
+    mutable types only.
+    """
+
+    __slots__ = ('_layout', '_values', '_first_values', '_changed')
+
+    def __init__(self, layout, **kwargs):
+        super(CompactPropertyManager, self).__init__()
+        values = layout.build_values(kwargs)
+        self._layout = layout
+        self._values = values
+        self._first_values = layout.copy_values(values)
+        self._changed = 0
+
+    @classmethod
+    def restore(cls, layout, **kwargs):
+        """Create a manager from trusted values without validation."""
+        manager = cls.__new__(cls)
+        manager._layout = layout
+        manager._values = layout.restore_values(kwargs)
+        manager._first_values = layout.copy_values(manager._values)
+        manager._changed = 0
+        return manager
+
+    def __getstate__(self):
+        return self._layout, self._values, self._first_values, self._changed
+
+    def __setstate__(self, state):
+        self._layout, self._values, self._first_values, self._changed = state
+
+    @builtins.property
+    def layout(self):
+        return self._layout
+
+    @builtins.property
+    def properties(self):
+        return utils.ReadOnlyDictProxy(dict(
+            (name, CompactProperty(self, index))
+            for index, name in enumerate(self._layout.names)))
+
+    def __getitem__(self, name):
+        return CompactProperty(self, self._layout.index(name))
+
+    def __iter__(self):
+        return iter(self._layout.names)
+
+    def __len__(self):
+        return len(self._layout.names)
+
+    def get_value(self, index):
+        return self._values[index]
+
+    def set_value(self, index, value):
+        if self._layout.is_read_only(index):
+            raise exc.ReadOnlyProperty()
+        self.set_value_force(index, value)
+
+    def set_value_force(self, index, value):
+        self._values[index] = self._layout.check_value(index, value)
+        self._changed |= 1 << index
+
+    def restore_value(self, index, value):
+        """Set a trusted value as the current and the first one."""
+        self._values[index] = value
+        first_values = list(self._first_values)
+        first_values[index] = self._layout.copy_value(index, value)
+        self._first_values = tuple(first_values)
+
+    def is_value_dirty(self, index):
+        changed = self._changed | self._layout.mutable_mask
+        return (bool(changed & (1 << index)) and
+                not self._first_values[index] == self._values[index])
+
+    def _iter_changed(self):
+        changed = self._changed | self._layout.mutable_mask
+        index = 0
+        while changed:
+            if changed & 1:
+                yield index
+            changed >>= 1
+            index += 1
+
+    def is_dirty(self):
+        for index in self._iter_changed():
+            if not self._first_values[index] == self._values[index]:
+                return True
+        return False
+
+    def get_dirty_names(self):
+        return [self._layout.names[index] for index in self._iter_changed()
+                if not self._first_values[index] == self._values[index]]
+
+    def clear_dirty(self):
+        self._first_values = self._layout.copy_values(self._values)
+        self._changed = 0
+
+    @builtins.property
+    def value(self):
+        return dict(zip(self._layout.names, self._values))
+
+    @value.setter
+    def value(self, values):
+        for k, v in six.iteritems(values):
+            self.set_value(self._layout.index(k), v)
+
+
+class PropertyDescriptor(object):
+    """Data descriptor which gives access to a property of a model.
+
+    MetaModel installs one descriptor per property so reading and writing
+    model attributes doesn't go through __getattr__/__setattr__.
+    """
+
+    def __init__(self, name):
+        super(PropertyDescriptor, self).__init__()
+        self._name = name
+
+    @builtins.property
+    def name(self):
+        return self._name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return owner.properties[self._name]
+        value = instance.properties[self._name].value
+        if value is DEFERRED:
+            instance.load_deferred()
+            value = instance.properties[self._name].value
+        return value
+
+    def _reraise(self, instance, value, error):
+        if isinstance(error, exc.ReadOnlyProperty):
+            raise exc.ReadOnlyProperty(
+                name=self._name,
+                model=type(instance)
+            )
+        raise exc.ModelTypeError(
+            property_name=self._name,
+            value=value,
+            model=instance,
+            property_type=error.get_property_type())
+
+    def __set__(self, instance, value):
+        try:
+            instance.properties[self._name].value = value
+        except (exc.TypeError, exc.ReadOnlyProperty) as e:
+            self._reraise(instance, value, e)
+
+
+class CompactPropertyDescriptor(PropertyDescriptor):
+    """Descriptor for models stored in CompactPropertyManager."""
+
+    def __init__(self, name, index):
+        super(CompactPropertyDescriptor, self).__init__(name)
+        self._index = index
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return owner.properties[self._name]
+        value = instance.properties._values[self._index]
+        if value is DEFERRED:
+            instance.load_deferred()
+            value = instance.properties._values[self._index]
+        return value
+
+    def __set__(self, instance, value):
+        try:
+            instance.properties.set_value(self._index, value)
+        except (exc.TypeError, exc.ReadOnlyProperty) as e:
+            self._reraise(instance, value, e)
+
+
 def property(property_type, *args, **kwargs):
     id_property = kwargs.pop('id_property', False)
     property_class = kwargs.pop('property_class',
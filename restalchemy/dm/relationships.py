@@ -49,13 +49,24 @@ class Relationship(BaseRelationship):
     def is_dirty(self):
         return not self.__first_value == self.value
 
-    def _safe_value(self, value):
-        if value is None or isinstance(value, self._type):
-            if value is None and self.is_required():
+    def clear_dirty(self):
+        self.__first_value = self.value
+
+    @classmethod
+    def prepare_type(cls, property_type):
+        return property_type
+
+    @classmethod
+    def check_value(cls, property_type, value, required=False):
+        if value is None or isinstance(value, property_type):
+            if value is None and required:
                 raise exc.PropertyRequired()
             return value
         else:
-            raise exc.TypeError(value=value, property_type=self._type)
+            raise exc.TypeError(value=value, property_type=property_type)
+
+    def _safe_value(self, value):
+        return self.check_value(self._type, value, self.is_required())
 
     def is_read_only(self):
         return self._read_only
@@ -17,12 +17,26 @@
 #    under the License.
 
 import abc
+import binascii
+import collections
 import copy
+import inspect
+import json
 import re
 import uuid
+import zlib
 
 import six
 
+try:
+    import ipaddress
+except ImportError:
+    ipaddress = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
 
 INFINITI = float("inf")
 UUID_RE_TEMPLATE = "[a-f0-9]{8,8}-([a-f0-9]{4,4}-){3,3}[a-f0-9]{12,12}"
@@ -31,10 +45,18 @@ UUID_RE_TEMPLATE = "[a-f0-9]{8,8}-([a-f0-9]{4,4}-){3,3}[a-f0-9]{12,12}"
 @six.add_metaclass(abc.ABCMeta)
 class BaseType(object):
 
+    # Values of mutable types (e.g. dict) can be changed in place, so
+    # properties keep a copy (see copy_value) of their first values and
+    # always compare them to detect changes.
+    mutable = False
+
     @abc.abstractmethod
     def validate(self, value):
         pass
 
+    def copy_value(self, value):
+        return value
+
     @abc.abstractmethod
     def to_simple_type(self, value):
         pass
@@ -43,6 +65,17 @@ class BaseType(object):
     def from_simple_type(self, value):
         pass
 
+    def to_storage_type(self, value):
+        """Convert a value to the format of a storage (e.g. SQL column).
+
+        By default it's the same as the simple type. Types which are
+        stored differently than they are shown in API override it.
+        """
+        return self.to_simple_type(value)
+
+    def from_storage_type(self, value):
+        return self.from_simple_type(value)
+
 
 class BasePythonType(BaseType):
 
@@ -126,12 +159,280 @@ class UUID(BaseType):
         return isinstance(value, uuid.UUID)
 
 
+class BinaryUUID(UUID):
+    """UUID which is stored as 16 bytes (BINARY(16) column)."""
+
+    @classmethod
+    def to_storage_type(cls, value):
+        return value.bytes
+
+    @classmethod
+    def from_storage_type(cls, value):
+        return uuid.UUID(bytes=bytes(value))
+
+
 # TODO(efrolov): Make converters to convert Dict type to storable type
 class Dict(BasePythonType):
 
+    mutable = True
+
     def __init__(self):
         super(Dict, self).__init__(dict)
 
+    def copy_value(self, value):
+        return copy.deepcopy(value)
+
+
+class LazyJSONDict(collections.MutableMapping):
+    """Dictionary which is decoded from JSON on first access.
+
+    The raw JSON document is kept and reused by to_json() while the
+    dictionary isn't changed. Nested lists and dictionaries can't be
+    tracked, so the document is encoded again once any of them was
+    returned.
+    """
+
+    def __init__(self, raw=None, data=None):
+        super(LazyJSONDict, self).__init__()
+        self._raw = raw
+        self._data = data
+        self._changed = raw is None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self._raw)
+        return self._data
+
+    def is_decoded(self):
+        return self._data is not None
+
+    def is_changed(self):
+        return self._changed
+
+    def get_raw(self):
+        """Return the raw JSON document if it's still valid or None."""
+        return None if self._changed else self._raw
+
+    def to_json(self):
+        raw = self.get_raw()
+        return json.dumps(self.data) if raw is None else raw
+
+    def to_dict(self):
+        """Return the decoded dictionary.
+
+        The dictionary may be changed by a caller, so the raw document
+        isn't reused after that.
+        """
+        self._changed = True
+        return self.data
+
+    def __getitem__(self, key):
+        value = self.data[key]
+        if isinstance(value, (dict, list)):
+            self._changed = True
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self._changed = True
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self._changed = True
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if isinstance(other, LazyJSONDict):
+            if (other.get_raw() is not None and
+                    other.get_raw() == self.get_raw()):
+                return True
+            other = other.data
+        return self.data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self.is_decoded():
+            return "%s(%r)" % (type(self).__name__, self._data)
+        return "%s(raw=%r)" % (type(self).__name__, self._raw)
+
+
+class JSON(BaseType):
+    """Dictionary which is stored as a JSON document (JSON/TEXT column).
+
+    A value restored from storage is a LazyJSONDict: it isn't decoded
+    until it's accessed and it isn't encoded again until it's changed.
+    The simple type is a plain dictionary, JSONPacker passes an unchanged
+    document through as is.
+    """
+
+    mutable = True
+
+    def validate(self, value):
+        return isinstance(value, (dict, LazyJSONDict))
+
+    def copy_value(self, value):
+        # NOTE: A copy of an unchanged document is another lazy dictionary
+        #       of the same raw JSON, so it isn't decoded.
+        if isinstance(value, LazyJSONDict):
+            raw = value.get_raw()
+            if raw is not None:
+                return LazyJSONDict(raw=raw)
+            value = value.data
+        return copy.deepcopy(value)
+
+    @classmethod
+    def to_simple_type(cls, value):
+        if isinstance(value, LazyJSONDict):
+            return value.to_dict()
+        return value
+
+    @classmethod
+    def from_simple_type(cls, value):
+        return value
+
+    @classmethod
+    def to_storage_type(cls, value):
+        if isinstance(value, LazyJSONDict):
+            return value.to_json()
+        return json.dumps(value)
+
+    @classmethod
+    def from_storage_type(cls, value):
+        return LazyJSONDict(raw=value)
+
+
+class ZlibCompressor(object):
+
+    marker = b'z'
+
+    def __init__(self, level=6):
+        super(ZlibCompressor, self).__init__()
+        self._level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self._level)
+
+    @staticmethod
+    def decompress(data):
+        return zlib.decompress(data)
+
+
+class LZ4Compressor(object):
+
+    marker = b'4'
+
+    def __init__(self):
+        super(LZ4Compressor, self).__init__()
+        if lz4_frame is None:
+            raise RuntimeError("The lz4 package is required for %s" %
+                               type(self).__name__)
+
+    @staticmethod
+    def compress(data):
+        return lz4_frame.compress(data)
+
+    @staticmethod
+    def decompress(data):
+        return lz4_frame.decompress(data)
+
+
+COMPRESSORS = {ZlibCompressor.marker: ZlibCompressor()}
+if lz4_frame is not None:
+    COMPRESSORS[LZ4Compressor.marker] = LZ4Compressor()
+
+
+def register_compressor(compressor):
+    """Make values compressed by the compressor readable from storage."""
+    COMPRESSORS[compressor.marker] = compressor
+
+
+class Compressed(BaseType):
+    """Wrapper which compresses a storage value of a text type.
+
+    The nested type (e.g. String or JSON) should be stored as text. Only
+    values longer than the threshold are compressed, they are stored with
+    a two byte header (zero byte and a marker of the compressor), other
+    values are stored as is. So an existing column can be converted to a
+    BLOB column by a migration without converting its rows. The value in
+    API is the value of the nested type.
+    """
+
+    HEADER_PREFIX = b'\x00'
+    RAW_MARKER = b'\x00'
+
+    def __init__(self, nested_type, compressor=None, threshold=1024):
+        super(Compressed, self).__init__()
+        self._nested_type = (nested_type() if inspect.isclass(nested_type)
+                             else nested_type)
+        self._compressor = compressor or COMPRESSORS[ZlibCompressor.marker]
+        self._threshold = threshold
+        register_compressor(self._compressor)
+
+    @property
+    def nested_type(self):
+        return self._nested_type
+
+    @property
+    def mutable(self):
+        return self._nested_type.mutable
+
+    def copy_value(self, value):
+        return self._nested_type.copy_value(value)
+
+    def validate(self, value):
+        return self._nested_type.validate(value)
+
+    def to_simple_type(self, value):
+        return self._nested_type.to_simple_type(value)
+
+    def from_simple_type(self, value):
+        return self._nested_type.from_simple_type(value)
+
+    def to_storage_type(self, value):
+        value = self._nested_type.to_storage_type(value)
+        data = (value.encode('utf-8') if isinstance(value, six.text_type)
+                else value)
+        if not isinstance(data, six.binary_type):
+            raise TypeError("%s should be stored as text to be compressed" %
+                            type(self._nested_type).__name__)
+        if len(data) >= self._threshold:
+            compressed = self._compressor.compress(data)
+            if len(compressed) + 2 < len(data):
+                return (self.HEADER_PREFIX + self._compressor.marker +
+                        compressed)
+        if data.startswith(self.HEADER_PREFIX):
+            return self.HEADER_PREFIX + self.RAW_MARKER + data
+        return value
+
+    def from_storage_type(self, value):
+        if isinstance(value, bytearray):
+            value = bytes(value)
+        if (isinstance(value, six.binary_type) and
+                value.startswith(self.HEADER_PREFIX)):
+            marker, data = value[1:2], value[2:]
+            if marker != self.RAW_MARKER:
+                try:
+                    data = COMPRESSORS[marker].decompress(data)
+                except KeyError:
+                    raise ValueError("Unknown compressor of a stored value "
+                                     "(marker %r)" % marker)
+            value = data
+        if isinstance(value, six.binary_type):
+            value = value.decode('utf-8')
+        return self._nested_type.from_storage_type(value)
+
 
 class Enum(BaseType):
 
@@ -139,6 +440,10 @@ class Enum(BaseType):
         super(Enum, self).__init__()
         self._enums_values = copy.deepcopy(enum_values)
 
+    @property
+    def values(self):
+        return self._enums_values
+
     def validate(self, value):
         return value in self._enums_values
 
@@ -149,6 +454,23 @@ class Enum(BaseType):
         return value
 
 
+class CodedEnum(Enum):
+    """Enum which is stored as an index of a value (TINYINT column).
+
+    The order of enum values defines codes, so new values should only be
+    appended to the end.
+    """
+
+    def __init__(self, enum_values):
+        super(CodedEnum, self).__init__(list(enum_values))
+
+    def to_storage_type(self, value):
+        return self._enums_values.index(value)
+
+    def from_storage_type(self, value):
+        return self._enums_values[value]
+
+
 class BaseRegExpType(BaseType):
 
     def __init__(self, pattern):
@@ -181,3 +503,129 @@ class Mac(BaseRegExpType):
 
     def __init__(self):
         super(Mac, self).__init__("^([0-9a-fA-F]{2,2}:){5,5}[0-9a-fA-F]{2,2}$")
+
+
+class BinaryMac(Mac):
+    """Mac which is stored as an integer (BIGINT column).
+
+    Restored values are in lower case.
+    """
+
+    @classmethod
+    def to_storage_type(cls, value):
+        return int(value.replace(':', ''), 16)
+
+    @classmethod
+    def from_storage_type(cls, value):
+        value = "%012x" % value
+        return ":".join(value[i:i + 2] for i in range(0, 12, 2))
+
+
+# NOTE: Prefix of IPv4-mapped IPv6 addresses (::ffff:0:0/96).
+IPV4_MAPPED_PREFIX = 0xffff << 32
+# NOTE: Prefix lengths of IPv6 networks are 0..128, IPv4 networks of mixed
+#       columns are stored with 129..161.
+IPV4_PREFIXLEN_OFFSET = 129
+
+
+def _bytes_to_int(value):
+    return int(binascii.hexlify(bytes(value)), 16)
+
+
+def _pack_mapped_ipv4(address):
+    return ipaddress.IPv6Address(IPV4_MAPPED_PREFIX | int(address)).packed
+
+
+class BaseIPType(BaseType):
+
+    def __init__(self, version=None):
+        super(BaseIPType, self).__init__()
+        if ipaddress is None:
+            raise RuntimeError("The ipaddress package is required for %s" %
+                               type(self).__name__)
+        if version not in (None, 4, 6):
+            raise ValueError("Unknown IP version %r" % version)
+        self._version = version
+
+    @property
+    def version(self):
+        return self._version
+
+    def _get_classes(self):
+        raise NotImplementedError()
+
+    def validate(self, value):
+        return (isinstance(value, self._get_classes()) and
+                (self._version is None or value.version == self._version))
+
+    @classmethod
+    def to_simple_type(cls, value):
+        return str(value)
+
+
+class IPAddress(BaseIPType):
+    """IPv4 or IPv6 address.
+
+    Addresses of IPAddress(version=4) are stored as 4 bytes (BINARY(4)
+    column), other ones as 16 bytes (BINARY(16) column). IPv4 addresses
+    of a mixed column are stored as IPv4-mapped IPv6 addresses
+    (::ffff:a.b.c.d), so a zero padded column doesn't change them and
+    IPv6 addresses of this form are restored as IPv4 ones. The order of
+    stored values is the order of addresses of the same version.
+    """
+
+    def _get_classes(self):
+        return (ipaddress.IPv4Address, ipaddress.IPv6Address)
+
+    @classmethod
+    def from_simple_type(cls, value):
+        return ipaddress.ip_address(six.text_type(value))
+
+    def to_storage_type(self, value):
+        if value.version == 4 and self._version is None:
+            return _pack_mapped_ipv4(value)
+        return value.packed
+
+    @classmethod
+    def from_storage_type(cls, value):
+        if len(value) == 4:
+            return ipaddress.IPv4Address(_bytes_to_int(value))
+        address = ipaddress.IPv6Address(_bytes_to_int(value))
+        return address.ipv4_mapped or address
+
+
+class IPNetwork(BaseIPType):
+    """IPv4 or IPv6 network.
+
+    Stored as a network address followed by a prefix length byte: 5 bytes
+    for IPNetwork(version=4) (BINARY(5) column), 17 bytes for other ones
+    (BINARY(17) column). IPv4 networks of a mixed column are stored by
+    IPv4-mapped addresses as IPAddress does, their prefix length is
+    shifted by IPV4_PREFIXLEN_OFFSET to tell them from IPv6 networks of
+    the ::ffff:0:0/96 range.
+    """
+
+    def _get_classes(self):
+        return (ipaddress.IPv4Network, ipaddress.IPv6Network)
+
+    @classmethod
+    def from_simple_type(cls, value):
+        return ipaddress.ip_network(six.text_type(value))
+
+    def to_storage_type(self, value):
+        address = value.network_address
+        if value.version == 4 and self._version is None:
+            return (_pack_mapped_ipv4(address) +
+                    six.int2byte(value.prefixlen + IPV4_PREFIXLEN_OFFSET))
+        return address.packed + six.int2byte(value.prefixlen)
+
+    @classmethod
+    def from_storage_type(cls, value):
+        value = bytearray(value)
+        address, prefixlen = _bytes_to_int(value[:-1]), value[-1]
+        if len(value) == 5:
+            return ipaddress.IPv4Network((address, prefixlen))
+        if prefixlen >= IPV4_PREFIXLEN_OFFSET:
+            return ipaddress.IPv4Network(
+                (address & 0xffffffff, prefixlen - IPV4_PREFIXLEN_OFFSET))
+        return ipaddress.IPv6Network((address, prefixlen))
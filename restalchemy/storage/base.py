@@ -17,12 +17,33 @@
 #    under the License.
 
 import abc
+import collections
 
 import six
 
+from restalchemy.common import exceptions as ra_exc
 from restalchemy.common import utils
 
 
+class Page(collections.Sequence):
+    """Models of a page and a marker of the next page (None if last)."""
+
+    def __init__(self, models, marker=None):
+        super(Page, self).__init__()
+        self._models = models
+        self._marker = marker
+
+    @property
+    def marker(self):
+        return self._marker
+
+    def __getitem__(self, index):
+        return self._models[index]
+
+    def __len__(self):
+        return len(self._models)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractObjectCollection(object):
 
@@ -48,13 +69,25 @@ class AbstractStorableMixin(object):
         result = {}
         props = properties or self.properties
         for name, prop in props.items():
-            result[name] = prop.property_type.to_simple_type(prop.value)
+            value = prop.value
+            result[name] = (None if value is None else
+                            prop.property_type.to_storage_type(value))
         return result
 
     @utils.classproperty
     def objects(cls):
         return cls._ObjectCollection(cls)
 
+    def load_deferred(self, session=None):
+        """Load values of deferred properties of the model.
+
+        Storages which can't load them raise DeferredProperty.
+        """
+        names = self.get_deferred_names()
+        if names:
+            raise ra_exc.DeferredProperty(name=', '.join(names),
+                                          model=type(self))
+
     @abc.abstractmethod
     def insert(self):
         raise NotImplementedError()
@@ -39,3 +39,22 @@ class HasManyRecords(exceptions.RestAlchemyException):
 
 class ConflictRecords(exceptions.RestAlchemyException):
     message = "Duplicate parameters for '%(model)s'. Original message: %(msg)s"
+
+
+class StaleRecord(exceptions.RestAlchemyException):
+
+    message = ("Record of %(model)s was changed concurrently (version "
+               "%(version)s is stale).")
+    code = 409
+
+
+class VersionedUpsert(exceptions.RestAlchemyException):
+
+    message = ("Upsert of versioned %(model)s isn't supported, it would "
+               "overwrite rows without checking their versions.")
+
+
+class InvalidMarker(exceptions.RestAlchemyException):
+
+    message = "Invalid pagination marker '%(marker)s' for %(model)s."
+    code = 400
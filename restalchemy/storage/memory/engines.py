@@ -20,6 +20,8 @@ import copy
 
 from restalchemy.common import singletons
 from restalchemy.storage import exceptions
+from restalchemy.storage.sql import expressions
+from restalchemy.storage.sql import filters as flt
 
 
 class Collection(object):
@@ -46,15 +48,27 @@ class Collection(object):
             raise exceptions.RecordNotFound(model=model, filters=None)
         self._models.remove(model)
 
+    def update_all(self, filters, values):
+        result = self.get_all(filters=filters)
+        for model in result:
+            for name, value in values.items():
+                if isinstance(value, expressions.AbstractValueExpression):
+                    value = value.apply(getattr(model, name))
+                setattr(model, name, value)
+        return len(result)
+
+    def delete_all(self, filters):
+        result = self.get_all(filters=filters)
+        for model in result:
+            self._models.remove(model)
+        return len(result)
+
     def get_all(self, filters=None):
         filters = filters or {}
         if not filters:
             return copy.copy(self._models)
-        result = self._models
-        for name, value in filters.items():
-            result = [model for model in result
-                      if getattr(model, name) == value]
-        return result
+        return [model for model in self._models
+                if flt.match(filters, lambda name: getattr(model, name))]
 
 
 class MemoryEngine(object):
@@ -80,6 +94,14 @@ class MemoryEngine(object):
         collection = self._get_collection(type(model))
         collection.delete(model)
 
+    def update_all(self, cls, filters, values):
+        collection = self._get_collection(cls)
+        return collection.update_all(filters=filters, values=values)
+
+    def delete_all(self, cls, filters):
+        collection = self._get_collection(cls)
+        return collection.delete_all(filters=filters)
+
     def get_all(self, cls, filters=None):
         collection = self._get_collection(cls)
         return collection.get_all(filters=filters)
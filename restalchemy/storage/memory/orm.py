@@ -20,6 +20,8 @@ import abc
 
 import six
 
+from restalchemy.common import exceptions as ra_exc
+from restalchemy.dm import batches
 from restalchemy.storage import base
 from restalchemy.storage import exceptions
 from restalchemy.storage.memory import engines
@@ -34,6 +36,45 @@ class ObjectCollection(base.AbstractObjectCollection):
     def get_all(self, filters=None):
         return self._engine.get_all(cls=self.model_cls, filters=filters)
 
+    def get_batch(self, filters=None, use_numpy=False):
+        return batches.ModelBatch.from_models(
+            self.model_cls, self.get_all(filters=filters),
+            use_numpy=use_numpy)
+
+    def update(self, filters, values):
+        """Update all models matched by filters, return their number."""
+        for name in values:
+            prop = self.model_cls.properties.properties[name]
+            if prop.is_read_only() or prop.is_id_property():
+                raise ra_exc.ReadOnlyProperty(name=name, model=self.model_cls)
+        return self._engine.update_all(cls=self.model_cls, filters=filters,
+                                       values=values)
+
+    def delete(self, filters):
+        """Delete all models matched by filters, return their number."""
+        return self._engine.delete_all(cls=self.model_cls, filters=filters)
+
+    def iter_batches(self, filters=None, batch_size=1000):
+        result = self.get_all(filters=filters)
+        for index in range(0, len(result), batch_size):
+            yield result[index:index + batch_size]
+
+    def count(self, filters=None):
+        return len(self.get_all(filters=filters))
+
+    def exists(self, filters=None):
+        return bool(self.get_all(filters=filters))
+
+    def first(self, filters=None, order_by=None):
+        result = self.get_all(filters=filters)
+        # NOTE: Sorting is stable, so models are sorted by the last name
+        #       first to support a direction per name.
+        for name in reversed(order_by or ()):
+            result = sorted(
+                result, reverse=name.startswith('-'),
+                key=lambda model, name=name.lstrip('-'): getattr(model, name))
+        return result[0] if result else None
+
     def get_one(self, filters=None):
         result = self._engine.get_all(cls=self.model_cls, filters=filters)
         result_len = len(result)
@@ -17,10 +17,15 @@
 #    under the License.
 
 import abc
+import collections
+import threading
 
 import six
 
 
+DEFAULT_STATEMENT_CACHE_SIZE = 1024
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractProcessResult(object):
 
@@ -32,12 +37,96 @@ class AbstractProcessResult(object):
         raise NotImplementedError()
 
 
+class CompiledStatement(object):
+    """SQL statement with the order of its parameters.
+
+    Values of the names are taken from data of a command and values of the
+    pk_names are taken from ids (or filters of a filtered command).
+    column_names are names of columns of rows returned by the statement.
+    """
+
+    __slots__ = ('statement', 'names', 'pk_names', 'column_names')
+
+    def __init__(self, statement, names=(), pk_names=(), column_names=()):
+        super(CompiledStatement, self).__init__()
+        self.statement = statement
+        self.names = tuple(names)
+        self.pk_names = tuple(pk_names)
+        self.column_names = tuple(column_names)
+
+
+class StatementCache(object):
+    """Bounded LRU cache of compiled statements by their shapes."""
+
+    def __init__(self, max_size=DEFAULT_STATEMENT_CACHE_SIZE):
+        super(StatementCache, self).__init__()
+        self._max_size = max_size
+        self._statements = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def get(self, key, compile_statement):
+        with self._lock:
+            compiled = self._statements.pop(key, None)
+            if compiled is not None:
+                self._statements[key] = compiled
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        compiled = compile_statement()
+        with self._lock:
+            self._statements[key] = compiled
+            while len(self._statements) > self._max_size:
+                self._statements.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self), 'max_size': self._max_size}
+
+    def __len__(self):
+        return len(self._statements)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractDialectCommand(object):
 
-    def __init__(self, table, data):
+    def __init__(self, table, data, statement_cache=None):
         self._table = table
         self._data = data
+        self._statement_cache = statement_cache
+        self._compiled = None
+
+    def get_statement_key(self):
+        """Return a hashable shape of the statement or None.
+
+        Commands with the same key should have the same compiled statement.
+        None means that the statement isn't cached.
+        """
+        return None
+
+    def compile(self):
+        raise NotImplementedError()
+
+    def get_compiled(self):
+        if self._compiled is None:
+            key = self.get_statement_key()
+            if key is None or self._statement_cache is None:
+                self._compiled = self.compile()
+            else:
+                self._compiled = self._statement_cache.get(key, self.compile)
+        return self._compiled
 
     @abc.abstractmethod
     def get_values(self):
@@ -60,6 +149,10 @@ class AbstractDialect(object):
     def insert(self, table, data):
         raise NotImplementedError()
 
+    @abc.abstractproperty
+    def insert_many(self, table, rows):
+        raise NotImplementedError()
+
     @abc.abstractproperty
     def update(self, table, ids, data):
         raise NotImplementedError()
@@ -69,5 +162,31 @@ class AbstractDialect(object):
         raise NotImplementedError()
 
     @abc.abstractproperty
-    def select(self, table, filters):
+    def select(self, table, filters, order_by=None, descending=False,
+               limit=None, offset=None, keyset=None, columns=None,
+               for_update=False, nowait=False, skip_locked=False):
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def upsert(self, table, data):
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def upsert_many(self, table, rows):
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def count(self, table, filters):
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def exists(self, table, filters):
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def filtered_update(self, table, filters, data):
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def filtered_delete(self, table, filters):
         raise NotImplementedError()
@@ -27,6 +27,10 @@ class BaseException(Exception):
     def code(self):
         return self._code
 
+    @property
+    def message(self):
+        return self.args[0]
+
 
 class Conflict(BaseException):
     pass
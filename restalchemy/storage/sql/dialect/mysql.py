@@ -22,35 +22,86 @@ from mysql.connector import errors
 
 from restalchemy.storage.sql.dialect import base
 from restalchemy.storage.sql.dialect import exceptions as exc
+from restalchemy.storage.sql import expressions
 from restalchemy.storage.sql import filters
+from restalchemy.storage.sql import utils
+
+
+def _get_data_key(data):
+    return frozenset(
+        (name, value.get_shape()
+         if isinstance(value, expressions.AbstractValueExpression) else None)
+        for name, value in data.items())
+
+
+def _construct_assignments(names, data):
+    result = []
+    for name in names:
+        value = data[name]
+        if isinstance(value, expressions.AbstractValueExpression):
+            result.append(value.construct_assignment(name))
+        else:
+            result.append("%s = %s" % (utils.escape(name), "%s"))
+    return ", ".join(result)
+
+
+def _get_data_values(names, data):
+    result = []
+    for name in names:
+        value = data[name]
+        if isinstance(value, expressions.AbstractValueExpression):
+            result.extend(value.get_values())
+        else:
+            result.append(value)
+    return result
 
 
 class MySQLProcessResult(base.AbstractProcessResult):
+    """Result of a statement.
+
+    Rows are read from the cursor as tuples by iter_tuples(). fetchall()
+    returns rows as dictionaries by column names for convenience.
+    """
 
-    def __init__(self, result):
+    def __init__(self, result, column_names=()):
         super(MySQLProcessResult, self).__init__(result)
+        self._column_names = tuple(column_names)
         self._rows = None
 
+    @property
+    def column_names(self):
+        return (self._column_names or
+                tuple(getattr(self._result, 'column_names', None) or ()))
+
     def get_count(self):
         return self._result.rowcount
 
+    def iter_tuples(self):
+        return iter(self._result)
+
     def fetchall(self):
+        names = self.column_names
         for row in self._result:
-            yield row
+            yield dict(zip(names, row))
 
     @property
     def rows(self):
         if self._rows is None:
-            self._rows = self._result.fetchall()
+            self._rows = list(self.fetchall())
         return self._rows
 
 
 class AbstractDialectCommand(base.AbstractDialectCommand):
 
+    def get_column_names(self):
+        """Return names of columns of rows returned by the statement."""
+        return ()
+
     def execute(self, session):
         try:
             return MySQLProcessResult(
-                super(AbstractDialectCommand, self).execute(session))
+                super(AbstractDialectCommand, self).execute(session),
+                column_names=self.get_column_names())
         except errors.IntegrityError as e:
             if e.errno == 1062:
                 raise exc.Conflict(code=e.sqlstate, message=e.msg)
@@ -59,118 +110,421 @@ class AbstractDialectCommand(base.AbstractDialectCommand):
 
 class MySQLInsert(AbstractDialectCommand):
 
+    def get_statement_key(self):
+        return 'insert', self._table
+
+    def compile(self):
+        column_names = self._table.get_escaped_column_names()
+        return base.CompiledStatement(
+            "INSERT INTO `%s` (%s) VALUES (%s)" % (
+                self._table.name,
+                ", ".join(column_names),
+                ", ".join(['%s'] * len(column_names))),
+            names=self._table.get_column_names())
+
     def get_values(self):
-        values = tuple()
-        for column_name in self._table.get_column_names():
-            values += (self._data[column_name],)
-        return values
+        data = self._data
+        return tuple(data[name] for name in self.get_compiled().names)
 
     def get_statement(self):
+        return self.get_compiled().statement
+
+
+class MySQLInsertMany(AbstractDialectCommand):
+    """Insert of many rows by one multi-row INSERT statement."""
+
+    def __init__(self, table, rows, statement_cache=None):
+        super(MySQLInsertMany, self).__init__(
+            table=table, data={}, statement_cache=statement_cache)
+        self._rows = rows
+
+    def get_statement_key(self):
+        return 'insert_many', self._table, len(self._rows)
+
+    def compile(self):
         column_names = self._table.get_escaped_column_names()
-        return "INSERT INTO `%s` (%s) VALUES (%s)" % (
-            self._table.name,
-            ", ".join(column_names),
-            ", ".join(['%s'] * len(column_names))
-        )
+        row = "(%s)" % ", ".join(['%s'] * len(column_names))
+        return base.CompiledStatement(
+            "INSERT INTO `%s` (%s) VALUES %s" % (
+                self._table.name,
+                ", ".join(column_names),
+                ", ".join([row] * len(self._rows))),
+            names=self._table.get_column_names())
+
+    def get_values(self):
+        names = self.get_compiled().names
+        return tuple(row[name] for row in self._rows for name in names)
+
+    def get_statement(self):
+        return self.get_compiled().statement
+
+
+class MySQLUpsertMany(MySQLInsertMany):
+    """Insert of rows or update of existing ones by one statement.
+
+    Rows which conflict with existing ones by the primary key (or by any
+    unique key) update all other columns of the existing rows.
+    """
+
+    def get_statement_key(self):
+        return 'upsert_many', self._table, len(self._rows)
+
+    def compile(self):
+        compiled = super(MySQLUpsertMany, self).compile()
+        column_names = (self._table.get_escaped_column_names(with_pk=False) or
+                        self._table.get_escaped_pk_names())
+        return base.CompiledStatement(
+            "%s ON DUPLICATE KEY UPDATE %s" % (
+                compiled.statement,
+                ", ".join("%s = VALUES(%s)" % (name, name)
+                          for name in column_names)),
+            names=compiled.names)
 
 
 class MySQLUpdate(AbstractDialectCommand):
 
-    def __init__(self, table, ids, data):
-        super(MySQLUpdate, self).__init__(table, data)
+    def __init__(self, table, ids, data, statement_cache=None):
+        super(MySQLUpdate, self).__init__(table, data,
+                                          statement_cache=statement_cache)
         self._ids = ids
 
+    def _get_column_names(self):
+        # NOTE: Only columns which are passed in data are updated.
+        return [name for name in self._table.get_column_names(with_pk=False)
+                if name in self._data]
+
+    def get_statement_key(self):
+        return 'update', self._table, _get_data_key(self._data)
+
+    def compile(self):
+        column_names = self._get_column_names()
+        return base.CompiledStatement(
+            "UPDATE `%s` SET %s WHERE %s" % (
+                self._table.name,
+                _construct_assignments(column_names, self._data),
+                " AND ".join(["%s = %s" % (name, "%s") for name in
+                              self._table.get_escaped_pk_names()])),
+            names=column_names,
+            pk_names=self._table.get_pk_names())
+
     def get_values(self):
-        values = tuple()
-        column_names = self._table.get_column_names(with_pk=False)
-        pk_names = self._table.get_pk_names()
-        for column_name in column_names:
-            values += (self._data[column_name],)
-        for column_name in pk_names:
-            values += (self._ids[column_name],)
-        return values
+        compiled = self.get_compiled()
+        ids = self._ids
+        return (tuple(_get_data_values(compiled.names, self._data)) +
+                tuple(ids[name] for name in compiled.pk_names))
 
     def get_statement(self):
-        column_names = self._table.get_escaped_column_names(with_pk=False)
-        pk_names = self._table.get_escaped_pk_names()
-        return "UPDATE `%s` SET %s WHERE %s" % (
-            self._table.name,
-            ", ".join(["%s = %s" % (name, "%s") for name in column_names]),
-            ", ".join(["%s = %s" % (name, "%s") for name in pk_names])
-        )
+        return self.get_compiled().statement
 
 
 class MySQLDelete(AbstractDialectCommand):
 
-    def __init__(self, table, ids):
-        super(MySQLDelete, self).__init__(table=table, data={})
+    def __init__(self, table, ids, statement_cache=None):
+        super(MySQLDelete, self).__init__(table=table, data={},
+                                          statement_cache=statement_cache)
         self._ids = ids
 
+    def get_statement_key(self):
+        return 'delete', self._table
+
+    def compile(self):
+        return base.CompiledStatement(
+            "DELETE FROM `%s` WHERE %s" % (
+                self._table.name,
+                " AND ".join(["%s = %s" % (name, "%s") for name in
+                              self._table.get_escaped_pk_names()])),
+            pk_names=self._table.get_pk_names())
+
     def get_values(self):
-        values = tuple()
-        pk_names = self._table.get_pk_names()
-        for column_name in pk_names:
-            values += (self._ids[column_name],)
-        return values
+        ids = self._ids
+        return tuple(ids[name] for name in self.get_compiled().pk_names)
 
     def get_statement(self):
-        pk_names = self._table.get_escaped_pk_names()
-        return "DELETE FROM `%s` WHERE %s" % (
-            self._table.name,
-            ", ".join(["%s = %s" % (name, "%s") for name in pk_names])
-        )
+        return self.get_compiled().statement
 
 
-class MySQLSelect(AbstractDialectCommand):
+class AbstractFilteredCommand(AbstractDialectCommand):
+    """Command with a WHERE clause built by filters."""
 
-    def __init__(self, table, filters):
-        super(MySQLSelect, self).__init__(table=table, data={})
-        self._check_filters(filters)
+    def __init__(self, table, filters, data=None, statement_cache=None):
+        super(AbstractFilteredCommand, self).__init__(
+            table=table, data=data or {}, statement_cache=statement_cache)
         self._filters = filters
+        # NOTE: Filters are checked when the statement is compiled, so only
+        #       once for a shape of filters.
+        self.get_compiled()
 
-    def _check_filters(self, filters):
-        result = set(filters.keys()) - set(self._table.get_column_names())
+    def _check_filters(self, items):
+        result = (filters.get_names(items) -
+                  set(self._table.get_column_names()))
         if result:
             raise ValueError("Unknown columns: %s. Filters is %s" % (
-                result, filters))
+                result, items))
 
-    def get_values(self):
-        values = []
-        for key in sorted(self._filters.keys()):
-            value = self._filters[key]
-            if isinstance(value, filters.AbstractExpression):
-                values.append(value.value)
-            else:
-                values.append(value)
-        return values
+    def _get_filters_key(self):
+        # NOTE: Filters (a dictionary or a clause of filters.AND/OR) are
+        #       walked in the same order by all functions below, so values
+        #       of filters with the same shape match the same statement.
+        return filters.get_shape(self._filters)
+
+    def _get_filter_values(self):
+        return filters.get_values(self._filters)
 
     def construct_where(self):
-        where_list = []
-        for name, value in sorted(self._filters.items()):
-            if not isinstance(value, filters.AbstractExpression):
-                value = filters.EQ(value)
-            where_list.append(value.construct_expression(name))
-        return " AND ".join(where_list)
+        return filters.construct_where(self._filters)
 
-    def get_statement(self):
-        sql = "SELECT %s FROM `%s`" % (
-            ", ".join(self._table.get_escaped_column_names()),
-            self._table.name
-        )
+    def _add_where(self, sql):
         filt = self.construct_where()
         return sql + " WHERE %s" % filt if filt else sql
 
+    def get_column_names(self):
+        return self.get_compiled().column_names
+
+    def get_statement(self):
+        return self.get_compiled().statement
+
+
+class MySQLSelect(AbstractFilteredCommand):
+
+    # NOTE: MySQL doesn't support OFFSET without LIMIT.
+    MAX_LIMIT = 18446744073709551615
+
+    def __init__(self, table, filters, order_by=None, descending=False,
+                 limit=None, offset=None, keyset=None, columns=None,
+                 for_update=False, nowait=False, skip_locked=False,
+                 statement_cache=None):
+        if nowait and skip_locked:
+            raise ValueError("nowait and skip_locked can't be used together")
+        self._columns = (None if columns is None
+                         else tuple(sorted(set(columns))))
+        # NOTE: nowait and skip_locked are options of a locking read, so
+        #       they imply FOR UPDATE.
+        self._lock = None
+        if for_update or nowait or skip_locked:
+            self._lock = ("FOR UPDATE NOWAIT" if nowait else
+                          "FOR UPDATE SKIP LOCKED" if skip_locked else
+                          "FOR UPDATE")
+        self._order_by = tuple(order_by or ())
+        # NOTE: descending is a direction of the whole order or a list of
+        #       directions of its columns.
+        if isinstance(descending, (list, tuple)):
+            self._descending = tuple(bool(desc) for desc in descending)
+        else:
+            self._descending = (bool(descending),) * len(self._order_by)
+        self._limit = limit
+        self._offset = offset
+        self._keyset = keyset
+        super(MySQLSelect, self).__init__(table=table, filters=filters,
+                                          statement_cache=statement_cache)
+
+    def get_statement_key(self):
+        return ('select', self._table, self._get_filters_key(),
+                self._order_by, self._descending, self._limit is not None,
+                self._offset is not None, self._keyset is not None,
+                self._columns, self._lock)
+
+    def _get_selected_names(self):
+        if self._columns is None:
+            return tuple(self._table.get_column_names())
+        # NOTE: Primary key is always selected, so the rest of columns can
+        #       be loaded later.
+        pk_names = tuple(self._table.get_pk_names())
+        return pk_names + tuple(name for name in self._columns
+                                if name not in pk_names)
+
+    def _check_order(self):
+        self._check_filters(dict.fromkeys(self._order_by))
+        if len(self._descending) != len(self._order_by):
+            raise ValueError("Directions %s don't match order %s" % (
+                self._descending, self._order_by))
+        if self._keyset is None:
+            return
+        if len(self._keyset) != len(self._order_by):
+            raise ValueError("Keyset %s doesn't match order %s" % (
+                self._keyset, self._order_by))
+        if len(set(self._descending)) > 1:
+            raise ValueError("Keyset can't be used with mixed directions "
+                             "of order %s" % (self._order_by,))
+
+    def construct_where(self):
+        where = super(MySQLSelect, self).construct_where()
+        if self._keyset is None:
+            return where
+        # NOTE: Seek to rows after the keyset by a row comparison, so the
+        #       index of the order is used instead of skipping rows.
+        keyset = "(%s) %s (%s)" % (
+            ", ".join(utils.escape(name) for name in self._order_by),
+            "<" if any(self._descending) else ">",
+            ", ".join(["%s"] * len(self._order_by)))
+        return " AND ".join(part for part in (where, keyset) if part)
+
+    def compile(self):
+        self._check_filters(self._filters)
+        self._check_order()
+        if self._columns is not None:
+            self._check_filters(dict.fromkeys(self._columns))
+        column_names = self._get_selected_names()
+        sql = self._add_where("SELECT %s FROM `%s`" % (
+            ", ".join(utils.escape(name) for name in column_names),
+            self._table.name))
+        if self._order_by:
+            sql += " ORDER BY %s" % ", ".join(
+                "%s %s" % (utils.escape(name), "DESC" if desc else "ASC")
+                for name, desc in zip(self._order_by, self._descending))
+        if self._limit is not None:
+            sql += " LIMIT %s"
+        elif self._offset is not None:
+            sql += " LIMIT %d" % self.MAX_LIMIT
+        if self._offset is not None:
+            sql += " OFFSET %s"
+        if self._lock is not None:
+            sql += " " + self._lock
+        return base.CompiledStatement(sql, column_names=column_names)
+
+    def get_values(self):
+        values = self._get_filter_values()
+        if self._keyset is not None:
+            values.extend(self._keyset)
+        if self._limit is not None:
+            values.append(self._limit)
+        if self._offset is not None:
+            values.append(self._offset)
+        return values
+
+
+class MySQLCount(AbstractFilteredCommand):
+    """Count of rows matched by filters."""
+
+    def __init__(self, table, filters, statement_cache=None):
+        super(MySQLCount, self).__init__(
+            table=table, filters=filters, statement_cache=statement_cache)
+
+    def get_statement_key(self):
+        return 'count', self._table, self._get_filters_key()
+
+    def compile(self):
+        self._check_filters(self._filters)
+        return base.CompiledStatement(
+            self._add_where("SELECT COUNT(*) AS `count` FROM `%s`" %
+                            self._table.name),
+            column_names=('count',))
+
+    def get_values(self):
+        return self._get_filter_values()
+
+
+class MySQLExists(MySQLCount):
+    """Check that at least one row is matched by filters."""
+
+    def get_statement_key(self):
+        return 'exists', self._table, self._get_filters_key()
+
+    def compile(self):
+        self._check_filters(self._filters)
+        return base.CompiledStatement(
+            self._add_where("SELECT 1 AS `exists` FROM `%s`" %
+                            self._table.name) + " LIMIT 1",
+            column_names=('exists',))
+
+
+class MySQLFilteredUpdate(AbstractFilteredCommand):
+    """Update of all rows matched by filters."""
+
+    def get_statement_key(self):
+        return ('filtered_update', self._table, _get_data_key(self._data),
+                self._get_filters_key())
+
+    def compile(self):
+        self._check_filters(self._filters)
+        self._check_filters(self._data)
+        column_names = sorted(self._data)
+        return base.CompiledStatement(
+            self._add_where("UPDATE `%s` SET %s" % (
+                self._table.name,
+                _construct_assignments(column_names, self._data))),
+            names=column_names)
+
+    def get_values(self):
+        return (tuple(_get_data_values(self.get_compiled().names,
+                                       self._data)) +
+                tuple(self._get_filter_values()))
+
+
+class MySQLFilteredDelete(AbstractFilteredCommand):
+    """Delete of all rows matched by filters."""
+
+    def __init__(self, table, filters, statement_cache=None):
+        super(MySQLFilteredDelete, self).__init__(
+            table=table, filters=filters, statement_cache=statement_cache)
+
+    def get_statement_key(self):
+        return 'filtered_delete', self._table, self._get_filters_key()
+
+    def compile(self):
+        self._check_filters(self._filters)
+        return base.CompiledStatement(
+            self._add_where("DELETE FROM `%s`" % self._table.name))
+
+    def get_values(self):
+        return tuple(self._get_filter_values())
+
 
 class MySQLDialect(base.AbstractDialect):
 
+    def __init__(self, statement_cache_size=base.DEFAULT_STATEMENT_CACHE_SIZE):
+        super(MySQLDialect, self).__init__()
+        self._statement_cache = base.StatementCache(
+            max_size=statement_cache_size)
+
+    @property
+    def statement_cache(self):
+        return self._statement_cache
+
     def insert(self, table, data):
-        return MySQLInsert(table, data)
+        return MySQLInsert(table, data,
+                           statement_cache=self._statement_cache)
+
+    def insert_many(self, table, rows):
+        return MySQLInsertMany(table, rows,
+                               statement_cache=self._statement_cache)
+
+    def upsert(self, table, data):
+        return MySQLUpsertMany(table, [data],
+                               statement_cache=self._statement_cache)
+
+    def upsert_many(self, table, rows):
+        return MySQLUpsertMany(table, rows,
+                               statement_cache=self._statement_cache)
 
     def update(self, table, ids, data):
-        return MySQLUpdate(table, ids, data)
+        return MySQLUpdate(table, ids, data,
+                           statement_cache=self._statement_cache)
 
     def delete(self, table, ids):
-        return MySQLDelete(table, ids)
-
-    def select(self, table, filters):
-        return MySQLSelect(table, filters)
+        return MySQLDelete(table, ids, statement_cache=self._statement_cache)
+
+    def filtered_update(self, table, filters, data):
+        return MySQLFilteredUpdate(table, filters, data,
+                                   statement_cache=self._statement_cache)
+
+    def filtered_delete(self, table, filters):
+        return MySQLFilteredDelete(table, filters,
+                                   statement_cache=self._statement_cache)
+
+    def select(self, table, filters, order_by=None, descending=False,
+               limit=None, offset=None, keyset=None, columns=None,
+               for_update=False, nowait=False, skip_locked=False):
+        return MySQLSelect(table, filters, order_by=order_by,
+                           descending=descending, limit=limit, offset=offset,
+                           keyset=keyset, columns=columns,
+                           for_update=for_update, nowait=nowait,
+                           skip_locked=skip_locked,
+                           statement_cache=self._statement_cache)
+
+    def count(self, table, filters):
+        return MySQLCount(table, filters,
+                          statement_cache=self._statement_cache)
+
+    def exists(self, table, filters):
+        return MySQLExists(table, filters,
+                           statement_cache=self._statement_cache)
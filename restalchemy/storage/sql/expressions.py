@@ -0,0 +1,72 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+
+import six
+
+
+@six.add_metaclass(abc.ABCMeta)
+class AbstractValueExpression(object):
+    """Value of an UPDATE which is computed by the database.
+
+    Unlike a plain value it's evaluated from the current value of a
+    column, so concurrent updates don't overwrite each other.
+    """
+
+    def __init__(self, value):
+        super(AbstractValueExpression, self).__init__()
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    def convert_value(self, convert):
+        """Return the same expression with a converted operand."""
+        return type(self)(convert(self._value))
+
+    def get_shape(self):
+        return type(self)
+
+    def get_values(self):
+        return [self._value]
+
+    @abc.abstractmethod
+    def construct_assignment(self, name):
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def apply(self, value):
+        """Evaluate the expression for a current value (see memory storage).
+        """
+        raise NotImplementedError()
+
+
+class Incr(AbstractValueExpression):
+    """Add a number to the current value (negative to subtract)."""
+
+    def __init__(self, value=1):
+        super(Incr, self).__init__(value)
+
+    def construct_assignment(self, name):
+        return ("`%s` = `%s` + " % (name, name)) + "%s"
+
+    def apply(self, value):
+        # NOTE: NULL + n is NULL in SQL.
+        return None if value is None else value + self._value
@@ -17,10 +17,30 @@
 #    under the License.
 
 import abc
+import re
 
 import six
 
 
+# NOTE: Lists of IN expressions are padded to a power of two (and to a
+#       multiple of this size if longer), so lists of different lengths
+#       share a few compiled statements.
+IN_PAD_SIZE = 1024
+
+
+def _get_padded_size(size):
+    if size <= IN_PAD_SIZE:
+        return 1 << (size - 1).bit_length()
+    return -(-size // IN_PAD_SIZE) * IN_PAD_SIZE
+
+
+def _compare(value, other, compare):
+    # NOTE: Comparison with NULL is never true in SQL.
+    if value is None or other is None:
+        return False
+    return compare(value, other)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class AbstractExpression(object):
 
@@ -32,54 +52,416 @@ class AbstractExpression(object):
     def value(self):
         return self._value
 
+    def convert_value(self, convert):
+        """Return the same expression with a converted operand."""
+        if self._value is None:
+            return self
+        return type(self)(convert(self._value))
+
+    def get_shape(self):
+        """Return a key of the SQL form of the expression."""
+        return type(self)
+
+    def get_values(self):
+        """Return values of placeholders of the expression."""
+        return [self._value]
+
     @abc.abstractmethod
     def construct_expression(self, name):
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def match(self, value):
+        """Evaluate the expression for a value (see memory storage)."""
+        raise NotImplementedError()
+
 
 class EQ(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` = " % name) + "%s"
 
+    def match(self, value):
+        return value == self._value
+
 
 class NE(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` <> " % name) + "%s"
 
+    def match(self, value):
+        return _compare(value, self._value, lambda a, b: a != b)
+
 
 class GT(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` > " % name) + "%s"
 
+    def match(self, value):
+        return _compare(value, self._value, lambda a, b: a > b)
+
 
 class GE(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` >= " % name) + "%s"
 
+    def match(self, value):
+        return _compare(value, self._value, lambda a, b: a >= b)
+
 
 class LT(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` < " % name) + "%s"
 
+    def match(self, value):
+        return _compare(value, self._value, lambda a, b: a < b)
+
 
 class LE(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` <= " % name) + "%s"
 
+    def match(self, value):
+        return _compare(value, self._value, lambda a, b: a <= b)
+
 
 class Is(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` IS " % name) + "%s"
 
+    def match(self, value):
+        return value == self._value
+
 
 class IsNot(AbstractExpression):
 
     def construct_expression(self, name):
         return ("`%s` IS NOT " % name) + "%s"
+
+    def match(self, value):
+        return not value == self._value
+
+
+class In(AbstractExpression):
+    """Match one of values of a list.
+
+    Long lists are split by ObjectCollection into several statements
+    where the result allows it (see orm.IN_CHUNK_SIZE).
+    """
+
+    operator = "IN"
+
+    def __init__(self, value):
+        super(In, self).__init__(list(value))
+
+    def convert_value(self, convert):
+        return type(self)([None if value is None else convert(value)
+                           for value in self._value])
+
+    def get_shape(self):
+        return type(self), self._get_size()
+
+    def _get_size(self):
+        return _get_padded_size(len(self._value)) if self._value else 0
+
+    def get_values(self):
+        values = self._value
+        return values + values[-1:] * (self._get_size() - len(values))
+
+    def construct_expression(self, name):
+        if not self._value:
+            return "FALSE"
+        return "`%s` %s (%s)" % (name, self.operator,
+                                 ", ".join(["%s"] * self._get_size()))
+
+    def match(self, value):
+        return value is not None and value in self._value
+
+
+class NotIn(In):
+
+    operator = "NOT IN"
+
+    def construct_expression(self, name):
+        if not self._value:
+            return "TRUE"
+        return super(NotIn, self).construct_expression(name)
+
+    def match(self, value):
+        # NOTE: NOT IN is never true for a NULL in the list.
+        return (value is not None and None not in self._value and
+                value not in self._value)
+
+
+class Between(AbstractExpression):
+    """Match values in a closed range [low, high]."""
+
+    def __init__(self, low, high):
+        super(Between, self).__init__((low, high))
+
+    def convert_value(self, convert):
+        return type(self)(*[None if value is None else convert(value)
+                            for value in self._value])
+
+    def get_values(self):
+        return list(self._value)
+
+    def construct_expression(self, name):
+        return ("`%s` BETWEEN " % name) + "%s AND %s"
+
+    def match(self, value):
+        low, high = self._value
+        return (_compare(value, low, lambda a, b: a >= b) and
+                _compare(value, high, lambda a, b: a <= b))
+
+
+class Like(AbstractExpression):
+    """Match a LIKE pattern ("%" - any string, "_" - any character).
+
+    An index is used only if a pattern starts with a constant prefix, so
+    prefer StartsWith to patterns like "%value".
+    """
+
+    def get_values(self):
+        return [self.get_pattern()]
+
+    def get_pattern(self):
+        return self._value
+
+    def construct_expression(self, name):
+        return ("`%s` LIKE " % name) + "%s"
+
+    def _get_regex(self):
+        regex = []
+        chars = iter(self.get_pattern())
+        for char in chars:
+            if char == '\\':
+                regex.append(re.escape(next(chars, '\\')))
+            elif char == '%':
+                regex.append('.*')
+            elif char == '_':
+                regex.append('.')
+            else:
+                regex.append(re.escape(char))
+        return re.compile(''.join(regex) + r'\Z', re.DOTALL)
+
+    def match(self, value):
+        return value is not None and bool(self._get_regex().match(value))
+
+
+class StartsWith(Like):
+    """Match values with a prefix by an index-friendly LIKE 'prefix%'."""
+
+    def get_pattern(self):
+        prefix = self._value
+        for char in ('\\', '%', '_'):
+            prefix = prefix.replace(char, '\\' + char)
+        return prefix + '%'
+
+    def match(self, value):
+        return value is not None and value.startswith(self._value)
+
+
+class AbstractClause(object):
+    """Group of filters joined by an operator.
+
+    Every item is a dictionary of filters (name -> value or expression)
+    or a nested clause, so the groups can be nested like
+    OR({'a': 1}, AND({'b': 2}, {'c': GT(3)})). A dictionary of filters
+    itself is an implicit AND of its items.
+    """
+
+    operator = None
+
+    def __init__(self, *clauses):
+        super(AbstractClause, self).__init__()
+        self._clauses = clauses
+
+    @property
+    def clauses(self):
+        return self._clauses
+
+    def get_names(self):
+        return set(name for clause in self._clauses
+                   for name in get_names(clause))
+
+    def get_shape(self):
+        return (type(self),) + tuple(get_shape(clause)
+                                     for clause in self._clauses)
+
+    def get_values(self):
+        return [value for clause in self._clauses
+                for value in get_values(clause)]
+
+    def construct_expression(self):
+        parts = [construct_where(clause) or "TRUE"
+                 for clause in self._clauses]
+        if not parts:
+            return self.empty
+        return "(%s)" % (" %s " % self.operator).join(parts)
+
+    def convert_values(self, convert):
+        return type(self)(*[convert_values(clause, convert)
+                            for clause in self._clauses])
+
+    def __and__(self, other):
+        return AND(self, other)
+
+    def __or__(self, other):
+        return OR(self, other)
+
+    def __invert__(self):
+        return NOT(self)
+
+
+class AND(AbstractClause):
+
+    operator = "AND"
+    empty = "TRUE"
+
+    def match(self, get_value):
+        return all(match(clause, get_value) for clause in self._clauses)
+
+
+class OR(AbstractClause):
+
+    operator = "OR"
+    empty = "FALSE"
+
+    def match(self, get_value):
+        return any(match(clause, get_value) for clause in self._clauses)
+
+
+class NOT(AbstractClause):
+    """Negation of filters (a dictionary or a clause)."""
+
+    def __init__(self, clause):
+        super(NOT, self).__init__(clause)
+
+    def construct_expression(self):
+        where = construct_where(self._clauses[0]) or "TRUE"
+        if not isinstance(self._clauses[0], AbstractClause):
+            where = "(%s)" % where
+        return "NOT %s" % where
+
+    def match(self, get_value):
+        return not match(self._clauses[0], get_value)
+
+
+class Column(object):
+    """Builder of filters by Python operators.
+
+    Column('name') == 'x' is a clause of {'name': EQ('x')}, so clauses
+    can be combined by &, | and ~ like
+    (Column('a') > 1) | ~Column('b').in_([2, 3]).
+    """
+
+    __hash__ = None
+
+    def __init__(self, name):
+        super(Column, self).__init__()
+        self._name = name
+
+    @property
+    def name(self):
+        return self._name
+
+    def _clause(self, expression):
+        return AND({self._name: expression})
+
+    def __eq__(self, value):
+        return self._clause(Is(None) if value is None else EQ(value))
+
+    def __ne__(self, value):
+        return self._clause(IsNot(None) if value is None else NE(value))
+
+    def __gt__(self, value):
+        return self._clause(GT(value))
+
+    def __ge__(self, value):
+        return self._clause(GE(value))
+
+    def __lt__(self, value):
+        return self._clause(LT(value))
+
+    def __le__(self, value):
+        return self._clause(LE(value))
+
+    def in_(self, values):
+        return self._clause(In(values))
+
+    def not_in(self, values):
+        return self._clause(NotIn(values))
+
+    def between(self, low, high):
+        return self._clause(Between(low, high))
+
+    def like(self, pattern):
+        return self._clause(Like(pattern))
+
+    def startswith(self, prefix):
+        return self._clause(StartsWith(prefix))
+
+
+# NOTE: Functions below accept filters as a dictionary or a clause.
+
+def _iter_items(filters):
+    for name, value in sorted(filters.items()):
+        if not isinstance(value, AbstractExpression):
+            value = EQ(value)
+        yield name, value
+
+
+def get_names(filters):
+    if isinstance(filters, AbstractClause):
+        return filters.get_names()
+    return set(filters)
+
+
+def get_shape(filters):
+    if isinstance(filters, AbstractClause):
+        return filters.get_shape()
+    return tuple((name, value.get_shape())
+                 for name, value in _iter_items(filters))
+
+
+def get_values(filters):
+    if isinstance(filters, AbstractClause):
+        return filters.get_values()
+    return [item for _, value in _iter_items(filters)
+            for item in value.get_values()]
+
+
+def construct_where(filters):
+    if isinstance(filters, AbstractClause):
+        return filters.construct_expression()
+    return " AND ".join(value.construct_expression(name)
+                        for name, value in _iter_items(filters))
+
+
+def convert_values(filters, convert):
+    """Convert operands of filters by convert(name, value)."""
+    if isinstance(filters, AbstractClause):
+        return filters.convert_values(convert)
+    result = {}
+    for name, value in filters.items():
+        if isinstance(value, AbstractExpression):
+            result[name] = value.convert_value(
+                lambda item, name=name: convert(name, item))
+        else:
+            result[name] = convert(name, value)
+    return result
+
+
+def match(filters, get_value):
+    """Evaluate filters for values returned by get_value(name)."""
+    if isinstance(filters, AbstractClause):
+        return filters.match(get_value)
+    return all(value.match(get_value(name))
+               for name, value in _iter_items(filters))
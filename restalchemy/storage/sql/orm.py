@@ -17,51 +17,120 @@
 #    under the License.
 
 import abc
+import itertools
 
 import six
 
+from restalchemy.common import exceptions as ra_exc
+from restalchemy.dm import batches
+from restalchemy.dm import codegen
+from restalchemy.dm import properties
+from restalchemy.dm import types
 from restalchemy.storage import base
 from restalchemy.storage import exceptions
 from restalchemy.storage.sql.dialect import exceptions as exc
 from restalchemy.storage.sql import engines
+from restalchemy.storage.sql import expressions
 from restalchemy.storage.sql import filters as flt
 from restalchemy.storage.sql import sessions
 from restalchemy.storage.sql import utils
 
 
+DEFAULT_INSERT_CHUNK_SIZE = 1000
+# NOTE: Default max_allowed_packet of MySQL 5.7 with a reserve for the
+#       rest of a statement.
+DEFAULT_MAX_PACKET_SIZE = 4 * 1024 * 1024 - 64 * 1024
+# NOTE: Long lists of flt.In filters are split into several statements
+#       of this size if the result doesn't depend on an order.
+IN_CHUNK_SIZE = 1000
+
+
+def _get_function(method):
+    return getattr(method, '__func__', method)
+
+
+def _get_storage_converter(property_type):
+    """Return from_storage_type of a type or None if it keeps values."""
+    type_cls = type(property_type)
+    if (isinstance(property_type, types.BaseType) and
+            _get_function(type_cls.from_storage_type) is
+            _get_function(types.BaseType.from_storage_type) and
+            _get_function(type_cls.from_simple_type) is
+            _get_function(types.BasePythonType.from_simple_type)):
+        return None
+    return property_type.from_storage_type
+
+
+def _converts_null(property_type):
+    """Check that NULL is converted by from_simple_type of a type.
+
+    Simple python types convert all values (e.g. NULL of Boolean is
+    False), other types keep NULL as None.
+    """
+    return (isinstance(property_type, types.BasePythonType) and
+            _get_function(type(property_type).from_storage_type) is
+            _get_function(types.BaseType.from_storage_type))
+
+
+def _from_storage_type(property_type, value):
+    if value is None and not _converts_null(property_type):
+        return None
+    return property_type.from_storage_type(value)
+
+
+def _estimate_row_size(row):
+    # NOTE: Strings may be escaped, so their length is doubled.
+    size = 0
+    for value in row.values():
+        if isinstance(value, (six.string_types, six.binary_type)):
+            size += 2 * len(value) + 4
+        else:
+            size += 24
+    return size
+
+
 class SQLTable(object):
+    """Table of a model class.
+
+    Column metadata is computed once when the table is created and
+    returned as tuples. Tables are cached per model class, see
+    SQLStorableMixin.get_table.
+    """
 
     def __init__(self, table_name, model):
         super(SQLTable, self).__init__()
         self._table_name = table_name
         self._model = model
+        names = list(self._model.properties)
+        pk_names = [name for name, prop in self._model.properties.items()
+                    if prop.is_id_property()]
+        self._column_names = {}
+        self._pk_names = {}
+        for do_sort in (True, False):
+            columns = sorted(names) if do_sort else names
+            pks = sorted(pk_names) if do_sort else pk_names
+            self._column_names[(True, do_sort)] = tuple(columns)
+            self._column_names[(False, do_sort)] = tuple(
+                name for name in columns if name not in pks)
+            self._pk_names[do_sort] = tuple(pks)
+        self._escaped_column_names = dict(
+            (key, tuple(utils.escape(name) for name in value))
+            for key, value in self._column_names.items())
+        self._escaped_pk_names = dict(
+            (key, tuple(utils.escape(name) for name in value))
+            for key, value in self._pk_names.items())
 
     def get_column_names(self, with_pk=True, do_sort=True):
-        result = []
-        for name, prop in self._model.properties.items():
-            if with_pk == False and prop.is_id_property():
-                continue
-            result.append(name)
-        if do_sort:
-            result.sort()
-        return result
+        return self._column_names[(bool(with_pk), bool(do_sort))]
 
     def get_escaped_column_names(self, with_pk=True, do_sort=True):
-        return [utils.escape(column_name) for column_name in
-                self.get_column_names(with_pk=with_pk, do_sort=do_sort)]
+        return self._escaped_column_names[(bool(with_pk), bool(do_sort))]
 
     def get_pk_names(self, do_sort=True):
-        result = []
-        for name, prop in self._model.properties.items():
-            if prop.is_id_property():
-                result.append(name)
-        if do_sort:
-            result.sort()
-        return result
+        return self._pk_names[bool(do_sort)]
 
     def get_escaped_pk_names(self, do_sort=True):
-        return [utils.escape(column_name) for column_name in self.get_pk_names(
-            do_sort=do_sort)]
+        return self._escaped_pk_names[bool(do_sort)]
 
     @property
     def name(self):
@@ -71,6 +140,18 @@ class SQLTable(object):
         cmd = engine.dialect.insert(table=self, data=data)
         return cmd.execute(session=session)
 
+    def insert_many(self, engine, rows, session):
+        cmd = engine.dialect.insert_many(table=self, rows=rows)
+        return cmd.execute(session=session)
+
+    def upsert(self, engine, data, session):
+        cmd = engine.dialect.upsert(table=self, data=data)
+        return cmd.execute(session=session)
+
+    def upsert_many(self, engine, rows, session):
+        cmd = engine.dialect.upsert_many(table=self, rows=rows)
+        return cmd.execute(session=session)
+
     def update(self, engine, ids, data, session):
         cmd = engine.dialect.update(table=self, ids=ids, data=data)
         return cmd.execute(session=session)
@@ -79,43 +160,605 @@ class SQLTable(object):
         cmd = engine.dialect.delete(table=self, ids=ids)
         return cmd.execute(session=session)
 
-    def select(self, engine, filters, session):
-        cmd = engine.dialect.select(table=self, filters=filters)
+    def select(self, engine, filters, session, order_by=None,
+               descending=False, limit=None, offset=None, keyset=None,
+               columns=None, for_update=False, nowait=False,
+               skip_locked=False):
+        cmd = engine.dialect.select(table=self, filters=filters,
+                                    order_by=order_by, descending=descending,
+                                    limit=limit, offset=offset, keyset=keyset,
+                                    columns=columns, for_update=for_update,
+                                    nowait=nowait, skip_locked=skip_locked)
         return cmd.execute(session=session)
 
+    def count(self, engine, filters, session):
+        cmd = engine.dialect.count(table=self, filters=filters)
+        return cmd.execute(session=session)
+
+    def exists(self, engine, filters, session):
+        cmd = engine.dialect.exists(table=self, filters=filters)
+        return cmd.execute(session=session)
+
+    def filtered_update(self, engine, filters, data, session):
+        cmd = engine.dialect.filtered_update(table=self, filters=filters,
+                                             data=data)
+        return cmd.execute(session=session)
+
+    def filtered_delete(self, engine, filters, session):
+        cmd = engine.dialect.filtered_delete(table=self, filters=filters)
+        return cmd.execute(session=session)
+
+
+class QuerySet(object):
+    """Lazy query of models.
+
+    Methods return new query sets and don't touch the database. The
+    query is run by one SELECT on first iteration and its result is
+    cached, so repeated iteration (or len()) doesn't run it again.
+    """
+
+    def __init__(self, collection, filters=None, order_by=(), limit=None,
+                 offset=None, columns=None, session=None):
+        super(QuerySet, self).__init__()
+        self._collection = collection
+        self._filters = filters
+        self._order_by = tuple(order_by)
+        self._limit = limit
+        self._offset = offset
+        self._columns = columns
+        self._session = session
+        self._result = None
+
+    def _clone(self, **kwargs):
+        params = dict(filters=self._filters, order_by=self._order_by,
+                      limit=self._limit, offset=self._offset,
+                      columns=self._columns, session=self._session)
+        params.update(kwargs)
+        return type(self)(self._collection, **params)
+
+    def _add_filters(self, clauses, filters):
+        clauses = list(clauses)
+        if filters:
+            clauses.append(filters)
+        if self._filters is not None:
+            clauses.insert(0, self._filters)
+        if len(clauses) == 1:
+            return clauses[0]
+        return flt.AND(*clauses)
+
+    def filter(self, *clauses, **filters):
+        """Add filters (dictionaries or clauses, see flt.Column)."""
+        return self._clone(filters=self._add_filters(clauses, filters))
+
+    def exclude(self, *clauses, **filters):
+        """Exclude models matched by all of given filters."""
+        clauses = list(clauses)
+        if filters:
+            clauses.append(filters)
+        if not clauses:
+            return self._clone()
+        clause = clauses[0] if len(clauses) == 1 else flt.AND(*clauses)
+        return self._clone(filters=self._add_filters([flt.NOT(clause)], {}))
+
+    def order_by(self, *names):
+        """Order by property names, "-name" is for descending order."""
+        return self._clone(order_by=names)
+
+    def limit(self, limit, offset=None):
+        return self._clone(limit=limit, offset=offset)
+
+    def only(self, *names):
+        """Select only given properties, the rest ones are deferred."""
+        return self._clone(columns=names)
+
+    def using(self, session):
+        return self._clone(session=session)
+
+    @property
+    def filters(self):
+        return {} if self._filters is None else self._filters
+
+    def _fetch(self):
+        if self._result is None:
+            self._result = list(self._collection.get_all(
+                filters=self.filters, session=self._session,
+                limit=self._limit, offset=self._offset,
+                order_by=self._order_by or None, columns=self._columns))
+        return self._result
+
+    def __iter__(self):
+        return iter(self._fetch())
+
+    def __len__(self):
+        return len(self._fetch())
+
+    def __getitem__(self, index):
+        return self._fetch()[index]
+
+    def count(self):
+        if self._result is not None or self._limit is not None:
+            return len(self._fetch())
+        count = self._collection.count(filters=self.filters,
+                                       session=self._session)
+        return max(count - (self._offset or 0), 0)
+
+    def exists(self):
+        if self._result is not None:
+            return bool(self._result)
+        if self._limit == 0:
+            return False
+        if self._offset is not None:
+            return bool(len(self.limit(1, self._offset)))
+        return self._collection.exists(filters=self.filters,
+                                       session=self._session)
+
+    def first(self):
+        """Return the first model (by primary key if not ordered)."""
+        if self._result is not None:
+            return self._result[0] if self._result else None
+        if self._limit == 0:
+            return None
+        if self._offset is not None:
+            result = self.limit(1, self._offset)
+            return result[0] if len(result) else None
+        return self._collection.first(
+            filters=self.filters, order_by=self._order_by,
+            session=self._session, columns=self._columns)
+
 
 class ObjectCollection(base.AbstractObjectCollection):
 
     @property
     def _table(self):
-        return SQLTable(table_name=self.model_cls.__tablename__,
-                        model=self.model_cls)
+        return self.model_cls.get_table()
 
     @property
     def _engine(self):
         return engines.engine_factory.get_engine()
 
+    def query(self):
+        """Return a lazy QuerySet of all models of the collection."""
+        return QuerySet(self)
+
+    def filter(self, *clauses, **filters):
+        return self.query().filter(*clauses, **filters)
+
+    def exclude(self, *clauses, **filters):
+        return self.query().exclude(*clauses, **filters)
+
+    def order_by(self, *names):
+        return self.query().order_by(*names)
+
+    def limit(self, limit, offset=None):
+        return self.query().limit(limit, offset)
+
+    def only(self, *names):
+        return self.query().only(*names)
+
     def _filters_to_storage_view(self, filters):
         # TODO(efrolov): Move this code from class to utils or another
         #                location.
+        property_types = self.model_cls.get_property_types()
+        return flt.convert_values(
+            filters,
+            lambda name, value: property_types[name].to_storage_type(value))
+
+    def _split_filters(self, filters):
+        """Split filters with the longest In list into chunks.
+
+        A row can't match two chunks of distinct values, so results of
+        chunks can be concatenated (or summed).
+        """
+        if isinstance(filters, flt.AbstractClause):
+            return [filters]
+        long_lists = [(len(value.value), name)
+                      for name, value in filters.items()
+                      if type(value) is flt.In and
+                      len(value.value) > IN_CHUNK_SIZE]
+        if not long_lists:
+            return [filters]
+        name = max(long_lists)[1]
+        values = []
+        seen = set()
+        for value in filters[name].value:
+            if value not in seen:
+                seen.add(value)
+                values.append(value)
+        result = []
+        for start in six.moves.range(0, len(values), IN_CHUNK_SIZE):
+            chunk = dict(filters)
+            chunk[name] = flt.In(values[start:start + IN_CHUNK_SIZE])
+            result.append(chunk)
+        return result
+
+    def _check_operand(self, name, operand, prop_type):
+        if operand is None:
+            raise ra_exc.PropertyRequired(name=name, model=self.model_cls)
+        if (isinstance(operand, bool) or
+                not isinstance(operand, six.integer_types + (float,))):
+            raise ra_exc.TypeError(value=operand, property_type=prop_type)
+
+    def _values_to_storage_view(self, values):
         result = {}
-        for name, value in filters.items():
-            result[name] = (value if isinstance(value, flt.AbstractExpression)
-                            else (self.model_cls.properties.properties[name]
-                                  .get_property_type().to_simple_type(value)))
+        property_types = self.model_cls.get_property_types()
+        for name, value in values.items():
+            prop = self.model_cls.properties.properties[name]
+            if prop.is_read_only() or prop.is_id_property():
+                raise ra_exc.ReadOnlyProperty(name=name, model=self.model_cls)
+            prop_type = property_types[name]
+            if isinstance(value, expressions.AbstractValueExpression):
+                # NOTE: An operand of an expression (e.g. Incr) is a delta
+                #       rather than a value, so limits of the type (e.g.
+                #       min_value) aren't checked for it.
+                self._check_operand(name, value.value, prop_type)
+                result[name] = value.convert_value(prop_type.to_storage_type)
+                continue
+            check_value = getattr(prop.get_property_class(), 'check_value',
+                                  None)
+            try:
+                if check_value is not None:
+                    check_value(prop_type, value, required=prop.is_required())
+            except ra_exc.PropertyRequired:
+                raise ra_exc.PropertyRequired(name=name, model=self.model_cls)
+            result[name] = (None if value is None
+                            else prop_type.to_storage_type(value))
+        version_name = self.model_cls.__version_property__
+        if version_name is not None and version_name not in result:
+            # NOTE: Rows of a versioned model are changed, so versions
+            #       which are loaded by others become stale.
+            result[version_name] = expressions.Incr(1)
         return result
 
-    def get_all(self, filters=None, session=None):
-        # TODO(efrolov): Add limit and offset parameters
+    def update(self, filters, values, session=None):
+        """Update all rows matched by filters without loading models.
+
+        Values are validated by property types. A value can be an
+        expression which is computed by the database (e.g.
+        expressions.Incr). Models which are already loaded are not
+        changed. Return the number of affected rows.
+        """
+        if not values:
+            return 0
+        data = self._values_to_storage_view(values)
+        count = 0
+        with sessions.session_manager(self._engine, session) as s:
+            for chunk in self._split_filters(
+                    self._filters_to_storage_view(filters)):
+                try:
+                    result = self._table.filtered_update(
+                        engine=self._engine, filters=chunk, data=data,
+                        session=s)
+                except exc.Conflict as e:
+                    raise exceptions.ConflictRecords(model=self.model_cls,
+                                                     msg=e.message)
+                count += result.get_count()
+        return count
+
+    def delete(self, filters, session=None):
+        """Delete all rows matched by filters without loading models.
+
+        Empty filters delete all rows. Return the number of deleted rows.
+        """
+        count = 0
+        with sessions.session_manager(self._engine, session) as s:
+            for chunk in self._split_filters(
+                    self._filters_to_storage_view(filters)):
+                result = self._table.filtered_delete(
+                    engine=self._engine, filters=chunk, session=s)
+                count += result.get_count()
+        return count
+
+    def _get_order(self, order_by, keyset=False):
+        """Return names and directions of an order.
+
+        Names prefixed by "-" are sorted in descending order. Keyset
+        pagination compares rows as a whole, so all names of a keyset
+        order should have the same direction. Primary key is added to
+        make the order unique, it has the direction of the last name.
+        """
+        order_by = list(order_by or ())
+        descending = [name.startswith('-') for name in order_by]
+        if keyset and any(descending) and not all(descending):
+            raise ValueError("Mixed directions of order %s are not "
+                             "supported by keyset pagination" % order_by)
+        names = [name.lstrip('-') for name in order_by]
+        pk_names = [name for name in self._table.get_pk_names()
+                    if name not in names]
+        names.extend(pk_names)
+        descending.extend([bool(descending) and descending[-1]] *
+                          len(pk_names))
+        return tuple(names), tuple(descending)
+
+    def _get_marker_names(self, names, descending):
+        return [('-' + name if desc else name)
+                for name, desc in zip(names, descending)]
+
+    def _decode_marker(self, marker, names, descending):
+        try:
+            marker_names, values = utils.decode_marker(marker)
+        except ValueError:
+            raise exceptions.InvalidMarker(marker=marker, model=self.model_cls)
+        if marker_names != self._get_marker_names(names, descending):
+            raise exceptions.InvalidMarker(marker=marker, model=self.model_cls)
+        return values
+
+    def _get_keyset(self, model, names):
+        data = model._get_prepared_data(
+            dict((name, model.properties[name]) for name in names))
+        return [data[name] for name in names]
+
+    def _encode_marker(self, model, names, descending):
+        return utils.encode_marker(self._get_marker_names(names, descending),
+                                   self._get_keyset(model, names))
+
+    def get_all(self, filters=None, session=None, limit=None, offset=None,
+                order_by=None, marker=None, columns=None, for_update=False,
+                nowait=False, skip_locked=False):
+        """Select models matched by filters.
+
+        order_by is a list of property names ("-name" for descending
+        order), marker is a marker of a page returned by get_page.
+        Filters are a dictionary or a clause of flt.AND/flt.OR.
+        columns is a list of property names to select, the rest of
+        properties are deferred and loaded on first access (see
+        SQLStorableMixin.load_deferred).
+        for_update locks selected rows by SELECT ... FOR UPDATE until the
+        end of the transaction of session. nowait fails instead of
+        waiting for locked rows and skip_locked skips them.
+        """
+        lock = dict(for_update=for_update, nowait=nowait,
+                    skip_locked=skip_locked)
+        names, descending = ((), ())
+        keyset = None
+        if order_by or marker is not None:
+            names, descending = self._get_order(order_by,
+                                                keyset=marker is not None)
+        if marker is not None:
+            keyset = self._decode_marker(marker, names, descending)
         filters = self._filters_to_storage_view(filters or {})
-        with sessions.session_manager(self._engine, session)as s:
+        if names or limit is not None or offset is not None:
+            return self._select(filters, session=session, limit=limit,
+                                offset=offset, order_by=names,
+                                descending=descending, keyset=keyset,
+                                columns=columns, **lock)
+        return itertools.chain.from_iterable(
+            self._select(chunk, session=session, columns=columns, **lock)
+            for chunk in self._split_filters(filters))
+
+    def _select(self, filters, session, limit=None, offset=None,
+                order_by=(), descending=False, keyset=None, columns=None,
+                **lock):
+        if columns is not None:
+            # NOTE: Order keys are needed to build a marker of a page.
+            columns = set(columns) | set(order_by)
+        with sessions.session_manager(self._engine, session) as s:
+            result = self._table.select(
+                engine=self._engine, filters=filters, session=s,
+                order_by=order_by, descending=descending, limit=limit,
+                offset=offset, keyset=keyset, columns=columns, **lock)
+            decode_row = self.model_cls._get_row_loader(result.column_names)
+            for row in result.iter_tuples():
+                model = decode_row(row)
+                model._saved = True
+                yield model
+
+    def get_page(self, limit, filters=None, order_by=None, marker=None,
+                 session=None, columns=None):
+        """Select a page of models by keyset pagination.
+
+        Rows are sought after the marker of the previous page instead of
+        skipping them by OFFSET, so the cost of a page doesn't depend on
+        its position. Return a Page with the marker of the next page.
+        """
+        names, descending = self._get_order(order_by, keyset=True)
+        models = list(self.get_all(
+            filters=filters, session=session, limit=limit,
+            order_by=self._get_marker_names(names, descending),
+            marker=marker, columns=columns))
+        next_marker = None
+        if models and len(models) == limit:
+            next_marker = self._encode_marker(models[-1], names, descending)
+        return base.Page(models, next_marker)
+
+    def get_batch(self, filters=None, session=None, use_numpy=False):
+        """Load rows into a columnar ModelBatch without model objects."""
+        filters = self._filters_to_storage_view(filters or {})
+        with sessions.session_manager(self._engine, session) as s:
             result = self._table.select(engine=self._engine, filters=filters,
                                         session=s)
-            for params in result.fetchall():
-                yield self.model_cls.restore_from_storage(**params)
+            return batches.ModelBatch.from_simple_tuples(
+                self.model_cls, result.column_names, result.iter_tuples(),
+                use_numpy=use_numpy, storage=True,
+                trusted=self.model_cls.__trusted_restore__)
+
+    def _iter_rows(self, models, session):
+        if isinstance(models, batches.ModelBatch):
+            # NOTE: Rows of a batch are written without model objects.
+            models.check()
+            return six.moves.zip(range(len(models)),
+                                 models.to_simple_rows(storage=True))
+        return ((model, model._get_row_data(session)) for model in models)
+
+    @staticmethod
+    def _iter_chunks(rows, chunk_size, max_packet_size):
+        chunk, chunk_rows, size = [], [], 0
+        for item, row in rows:
+            row_size = _estimate_row_size(row)
+            if chunk and (len(chunk) >= chunk_size or
+                          size + row_size > max_packet_size):
+                yield chunk, chunk_rows
+                chunk, chunk_rows, size = [], [], 0
+            chunk.append(item)
+            chunk_rows.append(row)
+            size += row_size
+        if chunk:
+            yield chunk, chunk_rows
+
+    def insert_many(self, models, session=None,
+                    chunk_size=DEFAULT_INSERT_CHUNK_SIZE,
+                    max_packet_size=DEFAULT_MAX_PACKET_SIZE):
+        """Insert models by multi-row INSERT statements.
+
+        Every statement contains at most chunk_size rows and its estimated
+        size is kept under max_packet_size (max_allowed_packet of MySQL).
+        models may be a ModelBatch of the model class, then its values
+        are checked column by column (see ModelBatch.check) and rows are
+        written without model objects, the batch is returned.
+        """
+        return self._write_many(self._table.insert_many, models, session,
+                                chunk_size, max_packet_size)
+
+    def upsert_many(self, models, session=None,
+                    chunk_size=DEFAULT_INSERT_CHUNK_SIZE,
+                    max_packet_size=DEFAULT_MAX_PACKET_SIZE):
+        """Insert models or update existing rows by multi-row statements.
+
+        It's like insert_many, but rows which already exist are updated
+        by INSERT ... ON DUPLICATE KEY UPDATE, so the models don't have to
+        be loaded before. Versioned models can't be upserted.
+        """
+        if self.model_cls.__version_property__ is not None:
+            raise exceptions.VersionedUpsert(model=self.model_cls)
+        return self._write_many(self._table.upsert_many, models, session,
+                                chunk_size, max_packet_size)
+
+    def _write_many(self, write, models, session, chunk_size,
+                    max_packet_size):
+        if (isinstance(models, batches.ModelBatch) and
+                models.model_cls is not self.model_cls):
+            raise TypeError("ModelBatch of %s can't be written as %s" % (
+                models.model_cls.__name__, self.model_cls.__name__))
+        written = []
+        with sessions.session_manager(self._engine, session) as s:
+            rows = self._iter_rows(models, s)
+            for chunk, chunk_rows in self._iter_chunks(rows, chunk_size,
+                                                       max_packet_size):
+                try:
+                    write(engine=self._engine, rows=chunk_rows, session=s)
+                except exc.Conflict as e:
+                    raise exceptions.ConflictRecords(model=self.model_cls,
+                                                     msg=e.message)
+                written.extend(chunk)
+        if isinstance(models, batches.ModelBatch):
+            return models
+        for model in written:
+            model._saved = True
+            model.clear_dirty()
+        return written
+
+    def iter_batches(self, filters=None, batch_size=1000, order_by=None,
+                     session=None, columns=None):
+        """Iterate over models matched by filters by lists of batch_size.
+
+        Every batch is selected by a separate keyset query (and in a
+        separate session if the session isn't passed), so only one batch
+        is kept in memory and a connection isn't held between batches.
+        Rows changed during iteration may be skipped or returned twice
+        only if their order keys are changed.
+        """
+        names, descending = self._get_order(order_by, keyset=True)
+        filters = self._filters_to_storage_view(filters or {})
+        keyset = None
+        while True:
+            batch = list(self._select(filters, session=session,
+                                      limit=batch_size, order_by=names,
+                                      descending=descending, keyset=keyset,
+                                      columns=columns))
+            if not batch:
+                return
+            keyset = self._get_keyset(batch[-1], names)
+            yield batch
+            if len(batch) < batch_size:
+                return
+
+    def count(self, filters=None, session=None):
+        """Return the number of rows matched by filters (COUNT(*))."""
+        count = 0
+        with sessions.session_manager(self._engine, session) as s:
+            for chunk in self._split_filters(
+                    self._filters_to_storage_view(filters or {})):
+                result = self._table.count(engine=self._engine,
+                                           filters=chunk, session=s)
+                count += next(result.fetchall())['count']
+        return count
+
+    def exists(self, filters=None, session=None):
+        """Check that at least one row is matched by filters."""
+        with sessions.session_manager(self._engine, session) as s:
+            for chunk in self._split_filters(
+                    self._filters_to_storage_view(filters or {})):
+                result = self._table.exists(engine=self._engine,
+                                            filters=chunk, session=s)
+                if list(result.fetchall()):
+                    return True
+        return False
 
-    def get_one(self, filters=None, session=None):
-        result = list(self.get_all(filters=filters, session=session))
+    def first(self, filters=None, order_by=None, session=None,
+              columns=None):
+        """Return the first model by order_by or None if nothing matched.
+
+        Without order_by the model is the first one by primary key.
+        """
+        names, descending = self._get_order(order_by)
+        for model in self.get_all(
+                filters=filters, session=session, limit=1,
+                order_by=self._get_marker_names(names, descending),
+                columns=columns):
+            return model
+        return None
+
+    def claim_batch(self, filters, n, values=None, session=None,
+                    order_by=None):
+        """Lock and return up to n models which aren't locked by others.
+
+        Rows are selected by SELECT ... LIMIT n FOR UPDATE SKIP LOCKED, so
+        workers which drain the same queue don't wait for each other.
+        values are set to claimed rows (e.g. a status) by one UPDATE in
+        the same transaction, so they aren't matched by filters of the
+        next claim. Without values rows are locked until the end of the
+        transaction of session only.
+        """
+        if values is None and session is None:
+            raise ValueError("Rows aren't claimed without values or "
+                             "a session to keep locks in")
+        names, descending = self._get_order(order_by)
+        pk_names = self._table.get_pk_names()
+        with sessions.session_manager(self._engine, session) as s:
+            models = list(self.get_all(
+                filters=filters, session=s, limit=n,
+                order_by=self._get_marker_names(names, descending),
+                skip_locked=True))
+            if models and values:
+                if len(pk_names) != 1:
+                    raise TypeError("Model %s should have one id property "
+                                    "to claim rows" % self.model_cls)
+                pk_name = pk_names[0]
+                self.update(
+                    filters={pk_name: flt.In([model[pk_name]
+                                              for model in models])},
+                    values=values, session=s)
+                for model in models:
+                    model._restore_values(self._get_claimed_values(model,
+                                                                   values))
+        return models
+
+    def _get_claimed_values(self, model, values):
+        # NOTE: Values of claimed models are changed as their rows are.
+        result = {}
+        for name, value in values.items():
+            if isinstance(value, expressions.AbstractValueExpression):
+                value = value.apply(model[name])
+            result[name] = value
+        version_name = self.model_cls.__version_property__
+        if version_name is not None and version_name not in result:
+            result[version_name] = expressions.Incr(1).apply(
+                model[version_name])
+        return result
+
+    def get_one(self, filters=None, session=None, columns=None):
+        # NOTE: Two rows are enough to detect ambiguity.
+        result = list(self.get_all(filters=filters, session=session,
+                                   limit=2, columns=columns))
         result_len = len(result)
         if result_len == 1:
             return result[0]
@@ -134,13 +777,121 @@ class SQLStorableMixin(base.AbstractStorableMixin):
 
     _ObjectCollection = ObjectCollection
 
+    # Rows of the own database were validated on write. Set it to True to
+    # restore models from storage without validation (see
+    # Model.restore_trusted).
+    __trusted_restore__ = False
+    # Properties which aren't selected (see ObjectCollection.get_all) are
+    # loaded by a separate query on first access. Set it to False to raise
+    # DeferredProperty instead.
+    __deferred_loading__ = True
+    # Name of an integer property which is a version of a row. If it's
+    # set, update() changes a row only if its version wasn't changed since
+    # the model was loaded and increments the version, StaleRecord is
+    # raised otherwise (optimistic locking). Versioned models can't be
+    # upserted.
+    __version_property__ = None
+
     @abc.abstractproperty
     def __tablename__(self):
         raise NotImplementedError()
 
+    @classmethod
+    def get_table(cls):
+        # NOTE: The table is stored in the class dictionary, so a subclass
+        #       never reuses a table of its parent and creates its own one
+        #       on first access.
+        table = cls.__dict__.get('_sql_table')
+        if table is None:
+            cls._check_version_property()
+            table = SQLTable(table_name=cls.__tablename__, model=cls)
+            cls._sql_table = table
+        return table
+
+    @classmethod
+    def _check_version_property(cls):
+        # NOTE: A version of a row is compared and incremented in SQL, so
+        #       it must be an integer property of the model.
+        name = cls.__version_property__
+        if name is None:
+            return
+        prop = cls.properties.properties.get(name)
+        if not (isinstance(prop, properties.PropertyCreator) and
+                isinstance(prop.get_property_type(), types.Integer)):
+            raise TypeError("Version property '%s' of model %s must be an "
+                            "Integer property." % (name, cls.__name__))
+
+    @classmethod
+    def get_property_types(cls):
+        """Return prepared property types of the model by names."""
+        property_types = cls.__dict__.get('_sql_property_types')
+        if property_types is None:
+            property_types = dict(
+                (name, batches.get_property_type(cls, name))
+                for name, prop in cls.properties.properties.items()
+                if not isinstance(prop, properties.PropertyCollection))
+            cls._sql_property_types = property_types
+        return property_types
+
+    @classmethod
+    def get_row_decoder(cls, names):
+        """Return a function which restores a model from a row tuple.
+
+        The function is compiled once per list of column names. Columns
+        which aren't selected are restored as deferred values.
+        """
+        names = tuple(names)
+        decoders = cls.__dict__.get('_sql_row_decoders')
+        if decoders is None:
+            decoders = {}
+            cls._sql_row_decoders = decoders
+        # NOTE: __trusted_restore__ may be changed after the class is
+        #       created, so it's a part of the key.
+        key = names, bool(cls.__trusted_restore__)
+        decode_row = decoders.get(key)
+        if decode_row is None:
+            property_types = cls.get_property_types()
+            deferred = dict.fromkeys(
+                (name for name in cls.get_table().get_column_names()
+                 if name not in names), properties.DEFERRED)
+            checks = None
+            if deferred and not cls.__trusted_restore__:
+                # NOTE: The constructor can't take deferred values, so
+                #       selected values are checked one by one.
+                checks = [batches.get_value_check(cls, name) for name in names]
+            decode_row = codegen.compile_row_decoder(
+                names,
+                [_get_storage_converter(property_types[name])
+                 for name in names],
+                (cls.restore_trusted if cls.__trusted_restore__ or deferred
+                 else cls),
+                constants=deferred,
+                convert_null=[_converts_null(property_types[name])
+                              for name in names],
+                checks=checks)
+            decoders[key] = decode_row
+        return decode_row
+
+    @classmethod
+    def _get_row_loader(cls, names):
+        # NOTE: An overridden restore_from_storage is a hook of models,
+        #       so rows are passed to it instead of the compiled decoder.
+        #       Columns which aren't selected are passed as DEFERRED, so
+        #       the hook can't take defaults for them by mistake.
+        restore = six.get_method_function(cls.restore_from_storage)
+        if restore is six.get_method_function(
+                SQLStorableMixin.restore_from_storage):
+            return cls.get_row_decoder(names)
+        names = tuple(names)
+        deferred = dict.fromkeys(
+            (name for name in cls.get_table().get_column_names()
+             if name not in names), properties.DEFERRED)
+        return lambda row: cls.restore_from_storage(
+            **dict(deferred, **dict(zip(names, row))))
+
     @property
     def _table(self):
-        return SQLTable(table_name=self.__tablename__, model=self)
+        return self.get_table()
 
     @property
     def _engine(self):
@@ -148,39 +899,143 @@ class SQLStorableMixin(base.AbstractStorableMixin):
 
     @classmethod
     def restore_from_storage(cls, **kwargs):
-        model_format = {}
-        for name, value in kwargs.items():
-            model_format[name] = (cls.properties.properties[name]
-                                  .get_property_type()
-                                  .from_simple_type(value))
-        obj = cls(**model_format)
+        """Restore a model from storage values of its columns.
+
+        Columns which weren't selected are missing or DEFERRED.
+        """
+        names = tuple(name for name, value in kwargs.items()
+                      if value is not properties.DEFERRED)
+        obj = cls.get_row_decoder(names)(
+            tuple(kwargs[name] for name in names))
         obj._saved = True
         return obj
 
+    def load_deferred(self, session=None):
+        """Load deferred properties of the model by one query."""
+        names = self.get_deferred_names()
+        if not names or not self.__deferred_loading__:
+            return super(SQLStorableMixin, self).load_deferred(session)
+        self._load_values(names, session)
+
+    def _load_values(self, names, session):
+        ids = self._get_prepared_data(self.get_id_properties())
+        with sessions.session_manager(self._engine, session) as s:
+            rows = list(self._table.select(
+                engine=self._engine, filters=ids, session=s,
+                columns=names).fetchall())
+        if not rows:
+            raise exceptions.RecordNotFound(model=self, filters=ids)
+        property_types = self.get_property_types()
+        row = rows[0]
+        values = dict(
+            (name, _from_storage_type(property_types[name], row[name]))
+            for name in names)
+        if not self.__trusted_restore__:
+            values = dict(
+                (name, batches.get_value_check(type(self), name)(value))
+                for name, value in values.items())
+        self._restore_values(values)
+
+    def increment(self, name, value=1, session=None, refresh=False):
+        """Add value to a property in the database without reading it.
+
+        The row is changed by one UPDATE ... SET `name` = `name` + value,
+        so concurrent increments are not lost. The value of the model is
+        reloaded only if refresh is set. The version of a versioned model
+        is always incremented as its row is, so the model doesn't become
+        stale by its own increment.
+        """
+        ids = dict((key, prop.value)
+                   for key, prop in self.get_id_properties().items())
+        with sessions.session_manager(self._engine, session) as s:
+            count = self.objects.update(
+                filters=ids, values={name: expressions.Incr(value)},
+                session=s)
+            if count == 0:
+                raise exceptions.RecordNotFound(model=self, filters=None)
+            if refresh:
+                names = [name]
+                if self.__version_property__ not in (None, name):
+                    names.append(self.__version_property__)
+                self._load_values(names, s)
+                return
+        version_name = self.__version_property__
+        if version_name is not None:
+            version = self.properties[version_name].value
+            if isinstance(version, six.integer_types):
+                # NOTE: The version itself is incremented by value.
+                step = value if version_name == name else 1
+                self._restore_values({version_name: version + step})
+
+    def _get_row_data(self, session):
+        # NOTE: A full row is written, so deferred values must be loaded
+        #       before (or DeferredProperty is raised if they can't be).
+        if self.get_deferred_names():
+            self.load_deferred(session)
+        return self._get_prepared_data()
+
     def insert(self, session=None):
         # TODO(efrolov): Add filters arameters.
         with sessions.session_manager(self._engine, session) as s:
             try:
                 self._table.insert(engine=self._engine,
-                                   data=self._get_prepared_data(),
+                                   data=self._get_row_data(s),
                                    session=s)
                 # TODO(efrolov): Check result
             except exc.Conflict as e:
                 raise exceptions.ConflictRecords(model=self, msg=e.message)
             self._saved = True
+            self.clear_dirty()
 
-    def save(self, session=None):
+    def upsert(self, session=None):
+        """Insert the model or update its row if it already exists.
+
+        One INSERT ... ON DUPLICATE KEY UPDATE statement is used, so it
+        doesn't depend on the _saved flag of the model. Versioned models
+        can't be upserted (the version of the row isn't checked).
+        """
+        if self.__version_property__ is not None:
+            raise exceptions.VersionedUpsert(model=self)
+        with sessions.session_manager(self._engine, session) as s:
+            try:
+                self._table.upsert(engine=self._engine,
+                                   data=self._get_row_data(s),
+                                   session=s)
+            except exc.Conflict as e:
+                raise exceptions.ConflictRecords(model=self, msg=e.message)
+            self._saved = True
+            self.clear_dirty()
+
+    def save(self, session=None, upsert=False):
         # TODO(efrolov): Add filters arameters.
-        self.update(session) if self._saved else self.insert(session)
+        if upsert:
+            self.upsert(session)
+        else:
+            self.update(session) if self._saved else self.insert(session)
+
+    def _get_properties_to_update(self):
+        data_properties = self.get_data_properties()
+        if not self._saved:
+            return data_properties
+        # NOTE: The first values of a saved model match the stored row so
+        #       only changed columns have to be sent.
+        return dict((name, data_properties[name])
+                    for name in self.get_dirty_names()
+                    if name in data_properties)
 
     def update(self, session=None):
         # TODO(efrolov): Add filters arameters.
+        properties = self._get_properties_to_update()
+        if not properties:
+            return
+        if self.__version_property__ is not None:
+            return self._update_versioned(properties, session)
         with sessions.session_manager(self._engine, session) as s:
             try:
                 result = self._table.update(
                     engine=self._engine,
                     ids=self._get_prepared_data(self.get_id_properties()),
-                    data=self._get_prepared_data(self.get_data_properties()),
+                    data=self._get_prepared_data(properties),
                     session=s)
             except exc.Conflict as e:
                 raise exceptions.ConflictRecords(model=self, msg=e.message)
@@ -189,6 +1044,35 @@ class SQLStorableMixin(base.AbstractStorableMixin):
             if result.get_count() > 1:
                 raise exceptions.MultipleUpdatesDetected(model=self,
                                                          filters={})
+            self.clear_dirty()
+
+    def _update_versioned(self, properties, session):
+        name = self.__version_property__
+        version = self.properties[name].value
+        ids = self._get_prepared_data(self.get_id_properties())
+        filters = dict(ids)
+        filters[name] = flt.Is(None) if version is None else version
+        new_version = (version or 0) + 1
+        data = self._get_prepared_data(properties)
+        data[name] = new_version
+        with sessions.session_manager(self._engine, session) as s:
+            try:
+                result = self._table.filtered_update(
+                    engine=self._engine, filters=filters, data=data,
+                    session=s)
+            except exc.Conflict as e:
+                raise exceptions.ConflictRecords(model=self, msg=e.message)
+            if result.get_count() == 0:
+                exists = self._table.exists(engine=self._engine, filters=ids,
+                                            session=s)
+                if list(exists.fetchall()):
+                    raise exceptions.StaleRecord(model=self, version=version)
+                raise exceptions.RecordNotFound(model=self, filters=None)
+            if result.get_count() > 1:
+                raise exceptions.MultipleUpdatesDetected(model=self,
+                                                         filters={})
+        self.properties[name].set_value_force(new_version)
+        self.clear_dirty()
 
     def delete(self, session=None):
         # TODO(efrolov): Add filters arameters.
@@ -215,3 +1099,19 @@ class SQLStorableMixin(base.AbstractStorableMixin):
                 value = (cls.properties.properties[name].get_property_type()
                          .from_simple_type(value))
                 return cls.objects.get_one(filters={name: value})
+
+    @classmethod
+    def to_storage_type(cls, value):
+        for prop in value.properties.values():
+            if prop.is_id_property():
+                return prop.property_type.to_storage_type(value.get_id())
+        raise ValueError("Model (%s) should contain a property of IdProperty "
+                         "type" % value)
+
+    @classmethod
+    def from_storage_type(cls, value):
+        for name, prop in cls.properties.items():
+            if prop.is_id_property():
+                value = cls.get_property_types()[name].from_storage_type(
+                    value)
+                return cls.objects.get_one(filters={name: value})
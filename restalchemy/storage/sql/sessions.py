@@ -24,7 +24,12 @@ class MySQLSession(object):
 
     def __init__(self, conn):
         self._conn = conn
-        self._cursor = conn.cursor(dictionary=True)
+        # NOTE: Rows are read as tuples, so the driver doesn't build a
+        #       dictionary per row. See MySQLProcessResult.fetchall.
+        #       The prepared cursor of mysql-connector isn't used: it keeps
+        #       only the last prepared statement, so a session executing
+        #       different statements would prepare them on every call.
+        self._cursor = conn.cursor()
         self._log = logging.getLogger(__name__)
 
     def execute(self, statement, values):
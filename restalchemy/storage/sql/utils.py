@@ -16,6 +16,48 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
+import json
+
+import six
+
 
 def escape(value):
     return "`%s`" % value
+
+
+def _encode_marker_value(value):
+    if isinstance(value, (six.binary_type, bytearray)):
+        if six.PY2 and isinstance(value, str):
+            try:
+                value.decode('utf-8')
+                return value
+            except UnicodeDecodeError:
+                pass
+        return {'b': base64.b64encode(bytes(value)).decode('ascii')}
+    return value
+
+
+def _decode_marker_value(value):
+    if isinstance(value, dict):
+        return base64.b64decode(value['b'])
+    return value
+
+
+def encode_marker(names, values):
+    """Encode an opaque pagination marker by storage values of a row."""
+    document = [list(names), [_encode_marker_value(value)
+                              for value in values]]
+    return base64.urlsafe_b64encode(
+        json.dumps(document, separators=(',', ':')).encode('utf-8')
+    ).decode('ascii')
+
+
+def decode_marker(marker):
+    """Return names and storage values of a pagination marker."""
+    try:
+        names, values = json.loads(base64.urlsafe_b64decode(
+            str(marker)).decode('utf-8'))
+        return names, [_decode_marker_value(value) for value in values]
+    except (TypeError, ValueError, KeyError):
+        raise ValueError("Invalid marker %r" % marker)
@@ -19,12 +19,15 @@
 import copy
 import unittest
 
+from restalchemy.common import exceptions as ra_exc
 from restalchemy.dm import models
 from restalchemy.dm import properties
 from restalchemy.dm import types
 from restalchemy.storage import exceptions
 from restalchemy.storage.memory import engines
 from restalchemy.storage.memory import orm
+from restalchemy.storage.sql import expressions
+from restalchemy.storage.sql import filters
 
 
 class TestModel1(models.ModelWithUUID, orm.MemoryStorableMixin):
@@ -111,3 +114,83 @@ class TestMemoryStorage(unittest.TestCase):
 
         self.assertRaises(exceptions.RecordNotFound,
                           model4.update)
+
+    def test_get_batch(self):
+        batch = TestModel1.objects.get_batch(
+            filters={'property1': FAKE_STRING2})
+
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch[0].uuid, self.model2.uuid)
+        self.assertEqual(batch.get_column('property2'), [FAKE_INT])
+
+    def test_update_by_filters(self):
+        result = TestModel1.objects.update(
+            filters={'property1': FAKE_STRING2},
+            values={'property2': FAKE_INT + 1})
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.model2.property2, FAKE_INT + 1)
+        self.assertEqual(self.model1.property2, FAKE_INT)
+
+    def test_update_by_filters_incr(self):
+        result = TestModel1.objects.update(
+            filters={'property2': FAKE_INT},
+            values={'property2': expressions.Incr(2)})
+
+        self.assertEqual(result, 3)
+        self.assertEqual(self.model1.property2, FAKE_INT + 2)
+
+    def test_update_by_filters_read_only(self):
+        self.assertRaises(ra_exc.ReadOnlyProperty, TestModel1.objects.update,
+                          filters={}, values={'uuid': self.model1.uuid})
+
+    def test_delete_by_filters(self):
+        result = TestModel1.objects.delete(filters={'property2': FAKE_INT})
+
+        self.assertEqual(result, 3)
+        self.assertEqual([], TestModel1.objects.get_all())
+
+    def test_iter_batches(self):
+        result = list(TestModel1.objects.iter_batches(batch_size=2))
+
+        self.assertEqual(result, [[self.model1, self.model2], [self.model3]])
+
+    def test_get_all_with_expressions(self):
+        result = TestModel1.objects.get_all(
+            filters={'property1': filters.In([FAKE_STRING1, FAKE_STRING3])})
+
+        self.assertEqual([self.model1, self.model3], result)
+        self.assertEqual([self.model2], TestModel1.objects.get_all(
+            filters={'property1': filters.StartsWith('FakeTest2'),
+                     'property2': filters.Between(FAKE_INT, FAKE_INT)}))
+
+    def test_get_all_with_or_clause(self):
+        result = TestModel1.objects.get_all(
+            filters=filters.OR({'property1': FAKE_STRING1},
+                               {'property1': filters.Like('%2')}))
+
+        self.assertEqual([self.model1, self.model2], result)
+
+    def test_count_and_exists(self):
+        self.assertEqual(TestModel1.objects.count(), 3)
+        self.assertEqual(TestModel1.objects.count(
+            filters={'property1': FAKE_STRING1}), 1)
+        self.assertTrue(TestModel1.objects.exists(
+            filters={'property1': FAKE_STRING1}))
+        self.assertFalse(TestModel1.objects.exists(
+            filters={'property2': FAKE_INT + 1}))
+
+    def test_first(self):
+        self.assertEqual(TestModel1.objects.first(order_by=['-property1']),
+                         self.model3)
+        self.assertIsNone(TestModel1.objects.first(
+            filters={'property2': FAKE_INT + 1}))
+
+    def test_first_by_mixed_directions(self):
+        self.model1.property2 = FAKE_INT + 1
+        self.model1.save()
+
+        self.assertEqual(TestModel1.objects.first(
+            order_by=['-property2', 'property1']), self.model1)
+        self.assertEqual(TestModel1.objects.first(
+            order_by=['property2', '-property1']), self.model3)
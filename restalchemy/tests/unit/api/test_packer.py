@@ -16,7 +16,97 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-pass
+import json
+
+import mock
+
+from restalchemy.api import packers
+from restalchemy.dm import batches
+from restalchemy.dm import models
+from restalchemy.dm import properties
+from restalchemy.dm import types
+from restalchemy.storage import base as storage_base
+from restalchemy.tests.unit import base
+
+
+class BatchModel(models.ModelWithUUID):
+    name = properties.property(types.String())
+    secret = properties.property(types.String())
+
+
+class PackBatchTestCase(base.BaseTestCase):
+
+    def _get_field(self, name, public=True):
+        return name, mock.Mock(**{
+            'api_name': name.upper(),
+            'is_public.return_value': public,
+            'dump_value.side_effect': lambda value: str(value)})
+
+    def test_pack_batch(self):
+        resource_type = mock.Mock(**{'get_fields.return_value': [
+            self._get_field('uuid'), self._get_field('name'),
+            self._get_field('secret', public=False)]})
+        model_list = [BatchModel(name="first", secret="1"), BatchModel()]
+        batch = batches.ModelBatch.from_models(BatchModel, model_list)
+
+        result = packers.BaseResourcePacker(resource_type, None).pack(batch)
+
+        self.assertEqual(result, [
+            {'UUID': str(model_list[0].uuid), 'NAME': "first"},
+            {'UUID': str(model_list[1].uuid)}])
+
+
+class JSONPackerTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(JSONPackerTestCase, self).setUp()
+        self.resource_type = mock.Mock(**{'get_fields.return_value': [
+            ('doc', mock.Mock(**{
+                'api_name': 'doc',
+                'prop_type': types.JSON(),
+                'is_public.return_value': True,
+                'dump_value.side_effect': types.JSON.to_simple_type}))]})
+        self.packer = packers.JSONPacker(self.resource_type, None)
+
+    def test_pack_raw_json_as_is(self):
+        raw = '{"b":  [1, 2], "a": "x"}'
+        obj = mock.Mock(doc=types.LazyJSONDict(raw=raw))
+
+        result = self.packer.pack([obj, obj])
+
+        self.assertEqual(result, '[{"doc": %s}, {"doc": %s}]' % (raw, raw))
+        self.assertFalse(obj.doc.is_decoded())
+
+    def test_pack_page(self):
+        obj = mock.Mock(doc={'a': 1})
+
+        result = self.packer.pack(storage_base.Page([obj], marker='next'))
+
+        self.assertEqual(result, '[{"doc": {"a": 1}}]')
+
+    def test_pack_many_raw_documents(self):
+        objs = [mock.Mock(doc=types.LazyJSONDict(raw='{"i": %d}' % i))
+                for i in range(3000)]
+
+        result = json.loads(self.packer.pack(objs))
+
+        self.assertEqual([item['doc']['i'] for item in result],
+                         list(range(3000)))
+
+    def test_pack_raw_json_of_compressed_type(self):
+        self.resource_type.get_fields()[0][1].prop_type = types.Compressed(
+            types.JSON())
+        obj = mock.Mock(doc=types.LazyJSONDict(raw='{"a":  "\\1"}'))
+
+        self.assertEqual(self.packer.pack(obj),
+                         '{"doc": {"a":  "\\1"}}')
+
+    def test_pack_changed_json(self):
+        obj = mock.Mock(doc=types.LazyJSONDict(raw='{"a": 1}'))
+        obj.doc['a'] = 2
+
+        self.assertEqual(self.packer.pack(obj), '{"doc": {"a": 2}}')
+
 
 # TODO(Eugene Frolov): Rewrite tests
 
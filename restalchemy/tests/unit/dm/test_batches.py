@@ -0,0 +1,191 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid
+
+import mock
+
+from restalchemy.common import exceptions as exc
+from restalchemy.dm import batches
+from restalchemy.dm import models
+from restalchemy.dm import properties
+from restalchemy.dm import types
+from restalchemy.tests.unit import base
+
+
+class BatchModel(models.ModelWithUUID):
+    name = properties.property(types.String(), default="name")
+    count = properties.property(types.Integer(), default=0)
+    enabled = properties.property(types.Boolean(), default=True)
+
+
+UUID1 = uuid.UUID('00000000-0000-0000-0000-000000000001')
+UUID2 = uuid.UUID('00000000-0000-0000-0000-000000000002')
+
+SIMPLE_ROWS = [
+    {'uuid': str(UUID1), 'name': "first", 'count': 1, 'enabled': 1},
+    {'uuid': str(UUID2), 'name': "second", 'count': 2, 'enabled': 0},
+]
+
+
+class ModelBatchTestCase(base.BaseTestCase):
+
+    use_numpy = False
+
+    def setUp(self):
+        super(ModelBatchTestCase, self).setUp()
+        self.batch = batches.ModelBatch.from_simple_rows(
+            BatchModel, SIMPLE_ROWS, use_numpy=self.use_numpy)
+
+    def test_len(self):
+        self.assertEqual(len(self.batch), 2)
+
+    def test_columns(self):
+        self.assertEqual(self.batch.get_column('uuid'), [UUID1, UUID2])
+        self.assertEqual(self.batch.get_column('count'), [1, 2])
+        self.assertEqual(self.batch.get_column('enabled'), [True, False])
+
+    def test_views(self):
+        view = self.batch[1]
+
+        self.assertEqual(view.name, "second")
+        self.assertEqual(view['count'], 2)
+        self.assertIs(view.enabled, False)
+        self.assertIsInstance(view.count, int)
+        self.assertRaises(AttributeError, lambda: view.unknown)
+        self.assertEqual([v.name for v in self.batch], ["first", "second"])
+        self.assertEqual(self.batch[-1].uuid, UUID2)
+        self.assertRaises(IndexError, lambda: self.batch[2])
+
+    def test_to_models(self):
+        result = self.batch.to_models()
+
+        self.assertEqual(len(result), 2)
+        self.assertIsInstance(result[0], BatchModel)
+        self.assertEqual(result[0].uuid, UUID1)
+        self.assertEqual(result[1].name, "second")
+
+    def test_to_simple_rows(self):
+        self.assertEqual(self.batch.to_simple_rows(), [
+            dict(SIMPLE_ROWS[0], enabled=True),
+            dict(SIMPLE_ROWS[1], enabled=False)])
+
+    def test_slice(self):
+        result = self.batch[1:]
+
+        self.assertIsInstance(result, batches.ModelBatch)
+        self.assertEqual(result.get_column('name'), ["second"])
+
+
+@base.unittest.skipIf(batches.numpy is None, "numpy is not installed")
+class NumpyModelBatchTestCase(ModelBatchTestCase):
+
+    use_numpy = True
+
+    def test_numeric_columns_are_arrays(self):
+        self.assertIsInstance(self.batch._columns['count'],
+                              batches.numpy.ndarray)
+        self.assertIsInstance(self.batch._columns['name'], list)
+
+
+class ModelBatchFromModelsTestCase(base.BaseTestCase):
+
+    def test_from_models(self):
+        model_list = [BatchModel(name="first"), BatchModel(count=5)]
+
+        batch = batches.ModelBatch.from_models(BatchModel, model_list)
+
+        self.assertEqual(batch.get_column('name'), ["first", "name"])
+        self.assertEqual(batch.get_column('count'), [0, 5])
+        self.assertEqual(batch.get_column('uuid'),
+                         [m.uuid for m in model_list])
+
+    def test_from_simple_tuples(self):
+        batch = batches.ModelBatch.from_simple_tuples(
+            BatchModel, ('uuid', 'count'),
+            iter([(str(UUID1), 1), (str(UUID2), 2)]))
+
+        self.assertEqual(batch.get_column('uuid'), [UUID1, UUID2])
+        self.assertEqual(batch.get_column('count'), [1, 2])
+        self.assertEqual(batch.get_column('name'), [None, None])
+
+    def test_empty(self):
+        batch = batches.ModelBatch.from_models(BatchModel, [])
+
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(batch.to_models(), [])
+
+    def test_columns_with_different_length(self):
+        self.assertRaises(ValueError, batches.ModelBatch, BatchModel,
+                          {'name': ["a"], 'count': [1, 2]})
+
+    def test_unknown_column(self):
+        self.assertRaises(ValueError, batches.ModelBatch, BatchModel,
+                          {'fake': [1]})
+
+    def test_view_to_model_validates_values(self):
+        batch = batches.ModelBatch(BatchModel, {'name': ["a"]})
+
+        model = batch[0].to_model()
+
+        self.assertEqual(model.name, "a")
+        self.assertEqual(model.count, 0)
+        self.assertIsInstance(model.uuid, uuid.UUID)
+
+    def test_view_to_model_rejects_invalid_value(self):
+        batch = batches.ModelBatch(BatchModel, {'count': ["a"]})
+
+        self.assertRaises(exc.TypeError, batch[0].to_model)
+
+    def test_view_to_model_uses_trusted_restore(self):
+        batch = batches.ModelBatch(BatchModel, {'name': ["a"]},
+                                   trusted=True)
+
+        with mock.patch.object(BatchModel, 'restore_trusted') as restore:
+            batch[0].to_model()
+
+        restore.assert_called_once_with(uuid=None, name="a", count=None,
+                                        enabled=None)
+
+    def test_slice_keeps_trusted(self):
+        batch = batches.ModelBatch(BatchModel, {'name': ["a", "b"]},
+                                   trusted=True)
+
+        self.assertTrue(batch[1:].trusted)
+
+    def test_from_models_is_trusted(self):
+        batch = batches.ModelBatch.from_models(BatchModel, [BatchModel()])
+
+        self.assertTrue(batch.trusted)
+
+    def test_check_fills_defaults(self):
+        batch = batches.ModelBatch(BatchModel, {'count': [None, 5]})
+
+        batch.check()
+
+        self.assertTrue(batch.trusted)
+        self.assertEqual(batch.get_column('count'), [0, 5])
+        self.assertEqual(batch.get_column('name'), ["name", "name"])
+        self.assertTrue(all(isinstance(value, uuid.UUID)
+                            for value in batch.get_column('uuid')))
+
+    def test_check_rejects_invalid_value(self):
+        batch = batches.ModelBatch(BatchModel, {'count': [1, "a"]})
+
+        self.assertRaises(exc.TypeError, batch.check)
+        self.assertFalse(batch.trusted)
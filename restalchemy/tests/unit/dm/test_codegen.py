@@ -0,0 +1,161 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import pickle
+import uuid
+
+from restalchemy.common import exceptions as exc
+from restalchemy.dm import codegen
+from restalchemy.dm import models
+from restalchemy.dm import properties
+from restalchemy.dm import relationships
+from restalchemy.dm import types
+from restalchemy.tests.unit import base
+
+
+class ParentModel(models.ModelWithUUID):
+    pass
+
+
+class CompiledModel(models.ModelWithUUID):
+    __compiled__ = True
+
+    str_field = properties.property(types.String(min_length=1,
+                                                 max_length=5),
+                                    required=True)
+    int_field = properties.property(types.Integer(min_value=0), default=1)
+    float_field = properties.property(types.Float(max_value=1.0))
+    bool_field = properties.property(types.Boolean, default=False)
+    enum_field = properties.property(types.Enum(['a', 'b']), default='a')
+    uri_field = properties.property(types.Uri)
+    parent = relationships.relationship(ParentModel)
+
+
+class CompiledModelTestCase(base.BaseTestCase):
+
+    def test_layout_is_compiled(self):
+        self.assertIsInstance(CompiledModel._layout,
+                              codegen.CompiledPropertyLayout)
+
+    def test_inline_checks_in_source(self):
+        source = CompiledModel._layout.build_values.__source__
+
+        self.assertIn("isinstance(value, string_types)", source)
+        self.assertIn("isinstance(value, UUID)", source)
+        self.assertIn("check_value_", source)
+
+    def test_restore_trusted_is_compiled(self):
+        source = CompiledModel._layout.restore_values.__source__
+
+        model = CompiledModel.restore_trusted(str_field="", int_field=-1)
+
+        self.assertNotIn("check_value_", source)
+        self.assertEqual(model.str_field, "")
+        self.assertEqual(model.int_field, -1)
+        self.assertEqual(model.enum_field, 'a')
+        self.assertIsInstance(model.uuid, uuid.UUID)
+        self.assertFalse(model.is_dirty())
+
+    def test_pickle(self):
+        model = CompiledModel(str_field="fake", parent=ParentModel())
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            result = pickle.loads(pickle.dumps(model, protocol))
+
+            self.assertEqual(result.uuid, model.uuid)
+            self.assertEqual(result.str_field, "fake")
+            self.assertEqual(result.parent, model.parent)
+            self.assertIs(result.properties.layout, CompiledModel._layout)
+            self.assertRaises(exc.ModelTypeError, setattr, result,
+                              'int_field', -1)
+
+    def test_defaults(self):
+        model = CompiledModel(str_field="fake")
+
+        self.assertEqual(model.int_field, 1)
+        self.assertFalse(model.bool_field)
+        self.assertEqual(model.enum_field, 'a')
+        self.assertIsNone(model.float_field)
+        self.assertIsInstance(model.uuid, uuid.UUID)
+
+    def test_values(self):
+        parent = ParentModel()
+        model = CompiledModel(str_field="fake", int_field=5, float_field=0.5,
+                              bool_field=True, enum_field='b', parent=parent,
+                              uri_field="/v1/%s" % parent.uuid)
+
+        self.assertEqual(model.int_field, 5)
+        self.assertEqual(model.float_field, 0.5)
+        self.assertTrue(model.bool_field)
+        self.assertEqual(model.enum_field, 'b')
+        self.assertIs(model.parent, parent)
+
+    def test_required(self):
+        self.assertRaises(exc.PropertyRequired, CompiledModel)
+
+    def test_incorrect_values(self):
+        for kwargs in ({'str_field': ""},
+                       {'str_field': "too long"},
+                       {'str_field': 1},
+                       {'str_field': "fake", 'int_field': -1},
+                       {'str_field': "fake", 'int_field': "1"},
+                       {'str_field': "fake", 'float_field': 2.0},
+                       {'str_field': "fake", 'bool_field': 1},
+                       {'str_field': "fake", 'enum_field': 'c'},
+                       {'str_field': "fake", 'uri_field': "fake"},
+                       {'str_field': "fake", 'uuid': "fake"},
+                       {'str_field': "fake", 'parent': object()}):
+            self.assertRaises(exc.TypeError, CompiledModel, **kwargs)
+
+    def test_set_values(self):
+        model = CompiledModel(str_field="fake")
+
+        model.int_field = 10
+
+        self.assertEqual(model.int_field, 10)
+        self.assertRaises(exc.ModelTypeError, setattr, model, 'int_field',
+                          -1)
+        self.assertRaises(exc.ModelTypeError, setattr, model, 'parent',
+                          object())
+        self.assertRaises(exc.PropertyRequired, setattr, model, 'str_field',
+                          None)
+
+
+class RowDecoderTestCase(base.BaseTestCase):
+
+    def test_decode_row(self):
+        decode_row = codegen.compile_row_decoder(
+            ('a', 'b', 'c'), (None, int, str), dict, constants={'d': 4})
+
+        self.assertEqual(decode_row(('1', '2', None)),
+                         {'a': '1', 'b': 2, 'c': None, 'd': 4})
+
+    def test_decode_row_of_not_identifier_names(self):
+        decode_row = codegen.compile_row_decoder(
+            ('class', 'my-column', u'name'), (None, int, None), dict,
+            constants={'def': None})
+
+        self.assertEqual(decode_row((1, '2', 3)),
+                         {'class': 1, 'my-column': 2, 'name': 3,
+                          'def': None})
+
+    def test_decode_row_of_one_column(self):
+        decode_row = codegen.compile_row_decoder(('a',), (None,), dict)
+
+        self.assertEqual(decode_row((1,)), {'a': 1})
+        self.assertRaises(ValueError, decode_row, (1, 2))
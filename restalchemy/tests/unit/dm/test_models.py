@@ -16,9 +16,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import pickle
+
 import mock
 import six
 
+from restalchemy.common import exceptions as exc
 from restalchemy.dm import models
 from restalchemy.dm import properties
 from restalchemy.dm import relationships
@@ -95,7 +99,9 @@ class ModelTestCase(base.BaseTestCase):
     def test_obj_setattr(self):
         self.test_instance.fake_prop1 = FAKE_VALUE1
 
-        self.assertEqual(self.PM_MOCK.__getitem__().value, FAKE_VALUE1)
+        # NOTE: Model has no properties, so it's a plain attribute.
+        self.assertEqual(vars(self.test_instance)['fake_prop1'], FAKE_VALUE1)
+        self.assertFalse(self.PM_MOCK.__getitem__.called)
 
 
 class Model1(models.Model):
@@ -125,6 +131,20 @@ class TestModel(BaseModel):
 
 class InheritModelTestCase(base.BaseTestCase):
 
+    def test_property_names(self):
+        self.assertEqual(BaseModel.get_id_property_names(), ())
+        self.assertEqual(
+            BaseModel.get_data_property_names(),
+            ('property1', 'property2', 'property3', 'property4'))
+        self.assertEqual(Model3.get_id_property_names(), ('uuid',))
+        self.assertEqual(Model3.get_data_property_names(), ())
+
+    def test_id_and_data_properties(self):
+        model = Model3()
+
+        self.assertEqual(list(model.get_id_properties()), ['uuid'])
+        self.assertEqual(model.get_data_properties(), {})
+
     def test_correct_type_in_base_model(self):
         props = BaseModel.properties.properties
 
@@ -142,6 +162,124 @@ class InheritModelTestCase(base.BaseTestCase):
         self.assertEqual(props['property4']._property_type, Model2)
 
 
+class DescriptorModelTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(DescriptorModelTestCase, self).setUp()
+        self._model = TestModel(property1="fake_string", property2=2)
+
+    def test_descriptors_installed(self):
+        for name in TestModel.properties:
+            self.assertIsInstance(vars(TestModel)[name],
+                                  properties.PropertyDescriptor)
+
+    def test_class_access_returns_property_class(self):
+        self.assertIs(TestModel.property1, properties.Property)
+        self.assertIs(TestModel.property3, relationships.Relationship)
+
+    def test_get_and_set(self):
+        self._model.property2 = 5
+
+        self.assertEqual(self._model.property2, 5)
+        self.assertEqual(self._model.properties['property2'].value, 5)
+
+    def test_set_incorrect_type(self):
+        self.assertRaises(exc.ModelTypeError, setattr, self._model,
+                          'property2', "fake_string")
+
+    def test_set_read_only(self):
+        self.assertRaises(exc.ReadOnlyProperty, setattr, Model3(), 'uuid',
+                          None)
+
+    def test_methods_are_not_shadowed(self):
+
+        class ItemsModel(models.Model):
+            items = properties.property(types.Integer)
+            property1 = properties.property(types.Integer)
+
+        model = ItemsModel(property1=1)
+
+        self.assertNotIn('items', vars(ItemsModel))
+        self.assertEqual(dict(model.items()),
+                         {'items': None, 'property1': 1})
+
+        model.items = 5
+        model.other = 6
+
+        self.assertEqual(model['items'], 5)
+        self.assertNotIn('items', vars(model))
+        self.assertEqual(vars(model)['other'], 6)
+        self.assertRaises(exc.ModelTypeError, setattr, model, 'items', "x")
+        self.assertIn('__setattr__', vars(ItemsModel))
+
+    def test_setattr_is_not_overridden(self):
+        # NOTE: Models without shadowed properties are set by descriptors
+        #       only, the setattr of object is kept.
+        self.assertIs(TestModel.__setattr__, object.__setattr__)
+        self.assertIs(models.Model.__setattr__, object.__setattr__)
+
+
+class RestoreTrustedTestCase(base.BaseTestCase):
+
+    def _test_restore(self, model_class):
+        uuid_value = models.uuid.uuid4()
+        # NOTE: property1 is a string property. Values are not validated
+        #       so integer value is kept as is.
+        with mock.patch.object(models.uuid, 'uuid4') as uuid4_mock:
+            with mock.patch.object(model_class, 'validate') as validate_mock:
+                model = model_class.restore_trusted(uuid=uuid_value,
+                                                    property1=1)
+
+        self.assertFalse(uuid4_mock.called)
+        self.assertFalse(validate_mock.called)
+        self.assertEqual(model.uuid, uuid_value)
+        self.assertEqual(model.property1, 1)
+        self.assertEqual(model.property2, 2)
+        self.assertFalse(model.is_dirty())
+
+    def test_restore_trusted(self):
+
+        class RegularModel(models.ModelWithUUID):
+            property1 = properties.property(types.String())
+            property2 = properties.property(types.Integer(), default=2)
+
+        self._test_restore(RegularModel)
+
+    def test_restore_trusted_compact(self):
+
+        class LocalCompactModel(models.ModelWithUUID):
+            __compact__ = True
+            property1 = properties.property(types.String())
+            property2 = properties.property(types.Integer(), default=2)
+
+        self._test_restore(LocalCompactModel)
+
+
+class ValueProperty(properties.AbstractProperty):
+    """Custom property which doesn't track changes."""
+
+    def __init__(self, property_type, value=None):
+        self._first_value = self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def set_value_force(self, value):
+        self._value = value
+
+    def is_dirty(self):
+        return self._first_value != self._value
+
+    @classmethod
+    def is_id_property(cls):
+        return False
+
+
 class DirtyModelTestCase(base.BaseTestCase):
 
     def setUp(self):
@@ -155,6 +293,21 @@ class DirtyModelTestCase(base.BaseTestCase):
     def test_dirty_is_false(self):
         self.assertFalse(self._model.is_dirty())
 
+    def test_clear_dirty_of_custom_property(self):
+
+        class CustomModel(models.Model):
+            custom = properties.property(types.Integer,
+                                         property_class=ValueProperty)
+
+        model = CustomModel(custom=1)
+        model.custom = 2
+
+        model.clear_dirty()
+
+        self.assertEqual(model.custom, 2)
+        self.assertTrue(model.is_dirty())
+        self.assertEqual(model.get_dirty_names(), ['custom'])
+
     def test_dirty_is_false_after_change_property2(self):
         self._model.property2 = 6
         self._model.property2 = 2
@@ -171,7 +324,154 @@ class DirtyModelTestCase(base.BaseTestCase):
 
         self.assertTrue(self._model.is_dirty())
 
+    def test_dirty_names_and_clear_dirty(self):
+        self._model.property1 = "new fake_string"
+
+        self.assertEqual(self._model.get_dirty_names(), ['property1'])
+
+        self._model.clear_dirty()
+
+        self.assertFalse(self._model.is_dirty())
+        self.assertEqual(self._model.property1, "new fake_string")
+
     def test_property3_is_not_dirty(self):
         self._model.property3 = Model3(uuid=self._model.property3.uuid)
 
         self.assertFalse(self._model.is_dirty())
+
+    def test_dict_changed_in_place_is_dirty(self):
+        for compact in (False, True):
+
+            class DictModel(models.Model):
+                __compact__ = compact
+
+                meta = properties.property(types.Dict(), default=dict)
+
+            model = DictModel.restore_trusted(meta={'a': {'b': 1}})
+            self.assertFalse(model.is_dirty())
+
+            model.meta['a']['b'] = 2
+
+            self.assertTrue(model.is_dirty())
+            self.assertEqual(model.get_dirty_names(), ['meta'])
+
+            model.clear_dirty()
+            model.meta['x'] = 1
+
+            self.assertEqual(model.get_dirty_names(), ['meta'])
+
+
+class CompactModel(models.ModelWithUUID):
+    __compact__ = True
+
+    property1 = properties.property(types.String(max_length=10),
+                                    required=True)
+    property2 = properties.property(types.Integer, default=lambda: 2)
+    property3 = properties.property(types.Integer, read_only=True)
+    property4 = relationships.relationship(Model3)
+
+
+class CompactModelTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(CompactModelTestCase, self).setUp()
+        self._model = CompactModel(property1="fake", property3=3)
+
+    def test_manager_type(self):
+        self.assertIsInstance(self._model.properties,
+                              properties.CompactPropertyManager)
+        self.assertIs(self._model.properties.layout, CompactModel._layout)
+
+    def test_values(self):
+        self.assertEqual(self._model.property1, "fake")
+        self.assertEqual(self._model.property2, 2)
+        self.assertEqual(self._model.property3, 3)
+        self.assertIsNone(self._model.property4)
+
+    def test_mapping_interface(self):
+        self.assertEqual(
+            sorted(self._model.keys()),
+            ['property1', 'property2', 'property3', 'property4', 'uuid'])
+        self.assertEqual(self._model['property1'], "fake")
+        self.assertEqual(
+            self._model.properties['property3'].property_type.__class__,
+            types.Integer)
+
+    def test_set_value(self):
+        self._model.property2 = 5
+        self._model.property4 = Model3()
+
+        self.assertEqual(self._model.property2, 5)
+        self.assertIsInstance(self._model.property4, Model3)
+
+    def test_set_incorrect_value(self):
+        self.assertRaises(exc.ModelTypeError, setattr, self._model,
+                          'property1', "too long string")
+        self.assertRaises(exc.ModelTypeError, setattr, self._model,
+                          'property4', CompactModel(property1="fake"))
+
+    def test_set_read_only_value(self):
+        self.assertRaises(exc.ReadOnlyProperty, setattr, self._model,
+                          'property3', 4)
+        self.assertRaises(exc.ReadOnlyProperty, setattr, self._model,
+                          'uuid', self._model.uuid)
+
+    def test_required_value(self):
+        self.assertRaises(exc.PropertyRequired, CompactModel)
+
+    def test_dirty(self):
+        self.assertFalse(self._model.is_dirty())
+
+        self._model.property2 = 6
+
+        self.assertTrue(self._model.is_dirty())
+        self.assertTrue(self._model.properties['property2'].is_dirty())
+
+        self._model.property2 = 2
+
+        self.assertFalse(self._model.is_dirty())
+
+    def test_manager_has_no_dict(self):
+        self.assertFalse(hasattr(self._model.properties, '__dict__'))
+        self.assertIsInstance(self._model.properties, collections.Mapping)
+
+    def test_pickle(self):
+        self._model.property2 = 5
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            result = pickle.loads(pickle.dumps(self._model, protocol))
+
+            self.assertEqual(dict(result), dict(self._model))
+            self.assertIs(result.properties.layout, CompactModel._layout)
+            self.assertEqual(result.get_dirty_names(), ['property2'])
+
+    def test_inherited_model_has_own_layout(self):
+
+        class InheritCompactModel(CompactModel):
+            property5 = properties.property(types.Integer)
+
+        self.assertIsNot(InheritCompactModel._layout, CompactModel._layout)
+        self.assertIn('property5', InheritCompactModel._layout.names)
+
+    def test_containers_are_not_supported(self):
+
+        def create_class():
+
+            class ContainerModel(models.Model):
+                __compact__ = True
+
+                container = properties.container(
+                    property1=properties.property(types.Integer))
+
+        self.assertRaises(TypeError, create_class)
+
+
+class ModelWithTimeUUIDTestCase(base.BaseTestCase):
+
+    def test_default_uuid_is_time_ordered(self):
+        first = models.ModelWithTimeUUID()
+        second = models.ModelWithTimeUUID()
+
+        self.assertEqual(first.uuid.version, 7)
+        self.assertLess(first.uuid, second.uuid)
+        self.assertTrue(types.Uri().validate('/fake/%s' % first.uuid))
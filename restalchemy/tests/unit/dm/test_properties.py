@@ -20,6 +20,7 @@ import mock
 
 from restalchemy.common import exceptions
 from restalchemy.dm import properties
+from restalchemy.dm import types
 from restalchemy.tests.unit import base
 
 FAKE_VALUE = 'FAKE_VALUE'
@@ -159,6 +160,38 @@ class PropertyTestCase(base.BaseTestCase):
         self.assertEqual(property_obj._value, old_value)
 
 
+class RestorePropertyTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(RestorePropertyTestCase, self).setUp()
+        self.fake_property_type = mock.MagicMock()
+        self.default = mock.MagicMock(return_value=FAKE_VALUE2)
+
+    def test_restore_without_validation(self):
+        property_obj = properties.Property.restore(
+            self.fake_property_type, value=FAKE_VALUE, required=True,
+            default=self.default)
+
+        self.assertEqual(property_obj.value, FAKE_VALUE)
+        self.assertFalse(property_obj.is_dirty())
+        self.assertTrue(property_obj.is_required())
+        self.assertFalse(self.fake_property_type.validate.called)
+        self.assertFalse(self.default.called)
+
+    def test_restore_missing_value(self):
+        property_obj = properties.Property.restore(
+            self.fake_property_type, default=self.default)
+
+        self.assertEqual(property_obj.value, FAKE_VALUE2)
+        self.default.assert_called_once_with()
+
+    def test_init_does_not_call_default_if_value(self):
+        properties.Property(self.fake_property_type, value=FAKE_VALUE,
+                            default=self.default)
+
+        self.assertFalse(self.default.called)
+
+
 class PropertyCreatorTestCase(base.BaseTestCase):
 
     ARGS = [1, 2, 3]
@@ -302,6 +335,75 @@ class PropertyManagerTestCase(base.BaseTestCase):
                           'fake1', 2)
 
 
+class CompactPropertyManagerTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(CompactPropertyManagerTestCase, self).setUp()
+        self.layout = properties.PropertyLayout(properties.PropertyCollection(
+            fake2=properties.property(types.Integer, default=lambda: 2),
+            fake1=properties.property(types.String, required=True),
+            fake3=properties.property(types.Integer, id_property=True)))
+
+    def test_layout_names(self):
+        self.assertEqual(self.layout.names, ('fake1', 'fake2', 'fake3'))
+        self.assertEqual(self.layout.index('fake3'), 2)
+
+    def test_layout_flags(self):
+        self.assertTrue(self.layout.is_required(0))
+        self.assertFalse(self.layout.is_required(1))
+        self.assertFalse(self.layout.is_read_only(1))
+        self.assertTrue(self.layout.is_read_only(2))
+        self.assertIsInstance(self.layout.get_type(1), types.Integer)
+
+    def test_layout_rejects_positional_args(self):
+        self.assertRaises(TypeError, properties.PropertyLayout,
+                          properties.PropertyCollection(
+                              fake1=properties.property(types.Integer, 1)))
+
+    def test_init_manager(self):
+        manager = properties.CompactPropertyManager(self.layout,
+                                                    fake1=FAKE_VALUE)
+
+        self.assertEqual(manager.value,
+                         {'fake1': FAKE_VALUE, 'fake2': 2, 'fake3': None})
+        self.assertEqual(list(manager), ['fake1', 'fake2', 'fake3'])
+        self.assertFalse(manager['fake2'].is_dirty())
+
+    def test_init_manager_required_value(self):
+        self.assertRaises(exceptions.PropertyRequired,
+                          properties.CompactPropertyManager, self.layout)
+
+    def test_set_value(self):
+        manager = properties.CompactPropertyManager(self.layout,
+                                                    fake1=FAKE_VALUE)
+
+        manager['fake2'].value = 3
+
+        self.assertEqual(manager.get_value(1), 3)
+        self.assertTrue(manager['fake2'].is_dirty())
+        self.assertRaises(exceptions.TypeError, manager.set_value, 1,
+                          FAKE_VALUE)
+        self.assertRaises(exceptions.ReadOnlyProperty, manager.set_value, 2,
+                          1)
+
+    def test_dirty_tracking(self):
+        manager = properties.CompactPropertyManager(self.layout,
+                                                    fake1=FAKE_VALUE)
+
+        self.assertFalse(manager.is_dirty())
+        manager.set_value(1, 3)
+        manager.set_value(0, FAKE_VALUE)
+
+        self.assertTrue(manager.is_dirty())
+        self.assertEqual(manager.get_dirty_names(), ['fake2'])
+
+        manager.clear_dirty()
+
+        self.assertFalse(manager.is_dirty())
+        self.assertEqual(manager.get_dirty_names(), [])
+        self.assertEqual(manager.get_value(1), 3)
+
+
 @mock.patch('restalchemy.dm.properties.PropertyCreator',
             return_value=FAKE_VALUE)
 class PropertyFuncTestCase(base.BaseTestCase):
@@ -16,6 +16,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import re
 import uuid
 
@@ -314,3 +315,304 @@ class EnumTestCase(base.BaseTestCase):
 
     def test_validate_incorrect_value(self):
         self.assertFalse(self.test_instance.validate(4))
+
+
+class LazyJSONDictTestCase(base.BaseTestCase):
+
+    RAW = '{"a": 1, "b": {"c": [1, 2]}}'
+
+    def setUp(self):
+        super(LazyJSONDictTestCase, self).setUp()
+
+        self.test_instance = types.LazyJSONDict(raw=self.RAW)
+
+    def test_not_decoded_until_access(self):
+        self.assertFalse(self.test_instance.is_decoded())
+        self.assertEqual(self.test_instance.to_json(), self.RAW)
+
+        self.assertEqual(self.test_instance['a'], 1)
+
+        self.assertTrue(self.test_instance.is_decoded())
+
+    def test_read_keeps_raw_document(self):
+        self.assertEqual(len(self.test_instance), 2)
+        self.assertEqual(self.test_instance['a'], 1)
+
+        self.assertFalse(self.test_instance.is_changed())
+        self.assertEqual(self.test_instance.to_json(), self.RAW)
+
+    def test_set_item_encodes_document(self):
+        self.test_instance['a'] = 2
+
+        self.assertTrue(self.test_instance.is_changed())
+        self.assertIsNone(self.test_instance.get_raw())
+        self.assertEqual(json.loads(self.test_instance.to_json()),
+                         {'a': 2, 'b': {'c': [1, 2]}})
+
+    def test_nested_value_encodes_document(self):
+        self.test_instance['b']['c'].append(3)
+
+        self.assertTrue(self.test_instance.is_changed())
+        self.assertEqual(json.loads(self.test_instance.to_json()),
+                         {'a': 1, 'b': {'c': [1, 2, 3]}})
+
+    def test_del_item(self):
+        del self.test_instance['a']
+
+        self.assertEqual(self.test_instance.data, {'b': {'c': [1, 2]}})
+        self.assertTrue(self.test_instance.is_changed())
+
+    def test_equal(self):
+        self.assertEqual(self.test_instance, self.test_instance)
+        self.assertFalse(self.test_instance.is_decoded())
+        self.assertEqual(self.test_instance, types.LazyJSONDict(raw=self.RAW))
+        self.assertEqual(self.test_instance, json.loads(self.RAW))
+        self.assertNotEqual(self.test_instance, {'a': 1})
+
+
+class JSONTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(JSONTestCase, self).setUp()
+
+        self.test_instance = types.JSON()
+
+    def test_validate_correct_value(self):
+        self.assertTrue(self.test_instance.validate({}))
+        self.assertTrue(self.test_instance.validate(types.LazyJSONDict('{}')))
+
+    def test_validate_incorrect_value(self):
+        self.assertFalse(self.test_instance.validate(TEST_STR_VALUE))
+
+    def test_simple_type_is_dict(self):
+        self.assertEqual(self.test_instance.to_simple_type({'a': 1}),
+                         {'a': 1})
+        self.assertEqual(self.test_instance.from_simple_type({'a': 1}),
+                         {'a': 1})
+
+    def test_simple_type_of_lazy_document_is_dict(self):
+        value = types.LazyJSONDict('{"a": 1}')
+
+        result = self.test_instance.to_simple_type(value)
+
+        self.assertIs(type(result), dict)
+        self.assertEqual(json.dumps(result), '{"a": 1}')
+        # NOTE: The dictionary may be changed by a caller.
+        self.assertIsNone(value.get_raw())
+
+    def test_to_storage_type(self):
+        self.assertEqual(
+            json.loads(self.test_instance.to_storage_type({'a': 1})),
+            {'a': 1})
+        self.assertEqual(self.test_instance.to_storage_type(
+            types.LazyJSONDict('{"a":  1}')), '{"a":  1}')
+
+    def test_from_storage_type(self):
+        value = self.test_instance.from_storage_type('{"a": 1}')
+
+        self.assertIsInstance(value, types.LazyJSONDict)
+        self.assertFalse(value.is_decoded())
+        self.assertEqual(value, {'a': 1})
+
+
+class CompressedTestCase(base.BaseTestCase):
+
+    LONG_STR = u'long text \u263a ' * 100
+
+    def setUp(self):
+        super(CompressedTestCase, self).setUp()
+
+        self.test_instance = types.Compressed(types.String(), threshold=64)
+
+    def test_validate(self):
+        self.assertTrue(self.test_instance.validate(TEST_STR_VALUE))
+        self.assertFalse(self.test_instance.validate(TEST_INT_VALUE))
+
+    def test_simple_type_is_not_compressed(self):
+        self.assertEqual(self.test_instance.to_simple_type(self.LONG_STR),
+                         self.LONG_STR)
+
+    def test_short_value_stored_as_is(self):
+        self.assertEqual(self.test_instance.to_storage_type(TEST_STR_VALUE),
+                         TEST_STR_VALUE)
+        self.assertEqual(
+            self.test_instance.from_storage_type(TEST_STR_VALUE),
+            TEST_STR_VALUE)
+
+    def test_long_value_compressed(self):
+        stored = self.test_instance.to_storage_type(self.LONG_STR)
+
+        self.assertTrue(stored.startswith(b'\x00z'))
+        self.assertLess(len(stored), len(self.LONG_STR))
+        self.assertEqual(
+            self.test_instance.from_storage_type(bytearray(stored)),
+            self.LONG_STR)
+
+    def test_value_with_header_prefix(self):
+        value = u'\x00' + self.LONG_STR[:10]
+
+        stored = self.test_instance.to_storage_type(value)
+
+        self.assertEqual(self.test_instance.from_storage_type(stored), value)
+
+    def test_custom_compressor(self):
+        compressor = mock.Mock(**{
+            'marker': b'm',
+            'compress.side_effect': lambda data: b'packed',
+            'decompress.side_effect': lambda data: b'unpacked'})
+        test_instance = types.Compressed(types.String, compressor=compressor,
+                                         threshold=8)
+
+        stored = test_instance.to_storage_type(self.LONG_STR)
+
+        self.assertEqual(stored, b'\x00mpacked')
+        self.assertEqual(
+            types.Compressed(types.String).from_storage_type(stored),
+            u'unpacked')
+
+    def test_unknown_compressor(self):
+        self.assertRaises(ValueError, self.test_instance.from_storage_type,
+                          b'\x00?data')
+
+    def test_json_document(self):
+        test_instance = types.Compressed(types.JSON(), threshold=16)
+        value = {'key': 'value' * 20}
+
+        stored = test_instance.to_storage_type(value)
+        restored = test_instance.from_storage_type(stored)
+
+        self.assertTrue(stored.startswith(b'\x00z'))
+        self.assertIsInstance(restored, types.LazyJSONDict)
+        self.assertEqual(restored, value)
+
+
+class BinaryUUIDTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(BinaryUUIDTestCase, self).setUp()
+
+        self.test_instance = types.BinaryUUID()
+        self.value = uuid.uuid4()
+
+    def test_simple_type_is_string(self):
+        self.assertEqual(self.test_instance.to_simple_type(self.value),
+                         str(self.value))
+
+    def test_storage_type(self):
+        stored = self.test_instance.to_storage_type(self.value)
+
+        self.assertEqual(len(stored), 16)
+        self.assertEqual(
+            self.test_instance.from_storage_type(bytearray(stored)),
+            self.value)
+
+
+class CodedEnumTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(CodedEnumTestCase, self).setUp()
+
+        self.test_instance = types.CodedEnum(['ACTIVE', 'ERROR', 'DELETED'])
+
+    def test_validate(self):
+        self.assertTrue(self.test_instance.validate('ERROR'))
+        self.assertFalse(self.test_instance.validate('UNKNOWN'))
+
+    def test_storage_type(self):
+        self.assertEqual(self.test_instance.to_storage_type('DELETED'), 2)
+        self.assertEqual(self.test_instance.from_storage_type(1), 'ERROR')
+        self.assertEqual(self.test_instance.to_simple_type('ERROR'), 'ERROR')
+
+
+class BinaryMacTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(BinaryMacTestCase, self).setUp()
+
+        self.test_instance = types.BinaryMac()
+
+    def test_storage_type(self):
+        stored = self.test_instance.to_storage_type('00:1A:02:03:04:FF')
+
+        self.assertEqual(stored, 0x001a020304ff)
+        self.assertEqual(self.test_instance.from_storage_type(stored),
+                         '00:1a:02:03:04:ff')
+
+
+@base.unittest.skipIf(types.ipaddress is None, "ipaddress is not installed")
+class IPAddressTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(IPAddressTestCase, self).setUp()
+
+        self.test_instance = types.IPAddress()
+
+    def test_validate(self):
+        self.assertTrue(self.test_instance.validate(
+            types.ipaddress.ip_address(u'10.0.0.1')))
+        self.assertFalse(self.test_instance.validate('10.0.0.1'))
+        self.assertFalse(types.IPAddress(version=6).validate(
+            types.ipaddress.ip_address(u'10.0.0.1')))
+
+    def test_simple_type(self):
+        value = self.test_instance.from_simple_type('fe80::1')
+
+        self.assertEqual(self.test_instance.to_simple_type(value), 'fe80::1')
+
+    def test_storage_type(self):
+        for prop_type, address, length in (
+                (self.test_instance, '10.0.0.1', 16),
+                (self.test_instance, 'fe80::1', 16),
+                (types.IPAddress(version=4), '10.0.0.1', 4),
+                (types.IPAddress(version=6), 'fe80::1', 16)):
+            value = prop_type.from_simple_type(address)
+
+            stored = prop_type.to_storage_type(value)
+
+            self.assertEqual(len(stored), length)
+            self.assertEqual(prop_type.from_storage_type(bytearray(stored)),
+                             value)
+
+    def test_ipv4_in_mixed_column(self):
+        value = self.test_instance.from_simple_type('10.0.0.1')
+
+        stored = self.test_instance.to_storage_type(value)
+
+        self.assertEqual(stored[:12], b'\x00' * 10 + b'\xff\xff')
+        self.assertEqual(
+            self.test_instance.from_storage_type(bytearray(stored)), value)
+        # NOTE: Values of 4 bytes are still read.
+        self.assertEqual(self.test_instance.from_storage_type(value.packed),
+                         value)
+
+
+@base.unittest.skipIf(types.ipaddress is None, "ipaddress is not installed")
+class IPNetworkTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        super(IPNetworkTestCase, self).setUp()
+
+        self.test_instance = types.IPNetwork()
+
+    def test_validate(self):
+        self.assertTrue(self.test_instance.validate(
+            types.ipaddress.ip_network(u'10.0.0.0/8')))
+        self.assertFalse(self.test_instance.validate('10.0.0.0/8'))
+
+    def test_storage_type(self):
+        for prop_type, network, length in (
+                (self.test_instance, '10.0.0.0/8', 17),
+                (self.test_instance, 'fe80::/64', 17),
+                (self.test_instance, '::ffff:0:0/96', 17),
+                (self.test_instance, '::ffff:a00:0/104', 17),
+                (self.test_instance, '0.0.0.0/0', 17),
+                (self.test_instance, '10.0.0.1/32', 17),
+                (types.IPNetwork(version=6), '::ffff:0:0/96', 17),
+                (types.IPNetwork(version=4), '10.0.0.0/8', 5)):
+            value = prop_type.from_simple_type(network)
+
+            stored = prop_type.to_storage_type(value)
+
+            self.assertEqual(len(stored), length)
+            self.assertEqual(prop_type.to_simple_type(
+                prop_type.from_storage_type(stored)), network)
@@ -17,6 +17,7 @@
 #    under the License.
 
 from restalchemy.storage.sql.dialect import mysql
+from restalchemy.storage.sql import expressions
 from restalchemy.storage.sql import filters
 from restalchemy.tests.unit import base
 
@@ -42,6 +43,15 @@ class FakeTable(object):
         return ["`pk`"]
 
 
+class FakePkTable(FakeTable):
+
+    def get_column_names(self, with_pk=True, do_sort=True):
+        return ["pk"] if with_pk else []
+
+    def get_escaped_column_names(self, with_pk=True, do_sort=True):
+        return ["`pk`"] if with_pk else []
+
+
 FAKE_VALUES = ["pk", 111, "field2", True]
 FAKE_PK_VALUES = ["pk"]
 
@@ -58,12 +68,69 @@ class MySQLInsertTestCase(base.BaseTestCase):
             "`field_bool`) VALUES (%s, %s, %s, %s)")
 
 
+class MySQLInsertManyTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        TABLE = FakeTable()
+        self.target = mysql.MySQLInsertMany(TABLE, [
+            dict(zip(TABLE.get_column_names(), FAKE_VALUES)),
+            dict(zip(TABLE.get_column_names(), reversed(FAKE_VALUES)))])
+
+    def test_statement(self):
+        self.assertEqual(
+            self.target.get_statement(),
+            "INSERT INTO `FAKE_TABLE` (`pk`, `field_int`, `field_str`, "
+            "`field_bool`) VALUES (%s, %s, %s, %s), (%s, %s, %s, %s)")
+
+    def test_values(self):
+        self.assertEqual(self.target.get_values(),
+                         tuple(FAKE_VALUES) + tuple(reversed(FAKE_VALUES)))
+
+
+class MySQLUpsertManyTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        self._TABLE = FakeTable()
+        self.dialect = mysql.MySQLDialect()
+
+    def test_statement(self):
+        target = self.dialect.upsert(
+            self._TABLE, dict(zip(self._TABLE.get_column_names(),
+                                  FAKE_VALUES)))
+
+        self.assertEqual(
+            target.get_statement(),
+            "INSERT INTO `FAKE_TABLE` (`pk`, `field_int`, `field_str`, "
+            "`field_bool`) VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE "
+            "`field_int` = VALUES(`field_int`), "
+            "`field_str` = VALUES(`field_str`), "
+            "`field_bool` = VALUES(`field_bool`)")
+        self.assertEqual(target.get_values(), tuple(FAKE_VALUES))
+
+    def test_many_rows(self):
+        row = dict(zip(self._TABLE.get_column_names(), FAKE_VALUES))
+        target = self.dialect.upsert_many(self._TABLE, [row, row])
+
+        self.assertIn("VALUES (%s, %s, %s, %s), (%s, %s, %s, %s) ON "
+                      "DUPLICATE KEY UPDATE", target.get_statement())
+        self.assertEqual(len(target.get_values()), 8)
+
+    def test_table_without_data_columns(self):
+        target = mysql.MySQLUpsertMany(FakePkTable(), [{'pk': 1}])
+
+        self.assertEqual(
+            target.get_statement(),
+            "INSERT INTO `FAKE_TABLE` (`pk`) VALUES (%s) "
+            "ON DUPLICATE KEY UPDATE `pk` = VALUES(`pk`)")
+
+
 class MySQLUpdateTestCase(base.BaseTestCase):
 
     def setUp(self):
         TABLE = FakeTable()
-        self.target = mysql.MySQLUpdate(TABLE, FAKE_PK_VALUES,
-                                        FAKE_VALUES)
+        self._data = dict(zip(TABLE.get_column_names(), FAKE_VALUES))
+        self._ids = {'pk': self._data.pop('pk')}
+        self.target = mysql.MySQLUpdate(TABLE, self._ids, self._data)
 
     def test_statement(self):
         self.assertEqual(
@@ -71,6 +138,53 @@ class MySQLUpdateTestCase(base.BaseTestCase):
             "UPDATE `FAKE_TABLE` SET `field_int` = %s, `field_str` = %s, "
             "`field_bool` = %s WHERE `pk` = %s")
 
+    def test_values(self):
+        self.assertEqual(self.target.get_values(),
+                         (111, "field2", True, "pk"))
+
+    def test_statement_changed_columns_only(self):
+        target = mysql.MySQLUpdate(FakeTable(), self._ids,
+                                   {'field_bool': False})
+
+        self.assertEqual(
+            target.get_statement(),
+            "UPDATE `FAKE_TABLE` SET `field_bool` = %s WHERE `pk` = %s")
+        self.assertEqual(target.get_values(), (False, "pk"))
+
+    def test_statement_incr(self):
+        target = mysql.MySQLUpdate(FakeTable(), self._ids,
+                                   {'field_int': expressions.Incr(5),
+                                    'field_bool': False})
+
+        self.assertEqual(
+            target.get_statement(),
+            "UPDATE `FAKE_TABLE` SET `field_int` = `field_int` + %s, "
+            "`field_bool` = %s WHERE `pk` = %s")
+        self.assertEqual(target.get_values(), (5, False, "pk"))
+
+    def test_incr_in_statement_key(self):
+        target = mysql.MySQLUpdate(FakeTable(), self._ids,
+                                   {'field_int': expressions.Incr(5)})
+
+        self.assertNotEqual(
+            target.get_statement_key(),
+            mysql.MySQLUpdate(FakeTable(), self._ids,
+                              {'field_int': 5}).get_statement_key())
+
+
+class MySQLFilteredUpdateTestCase(base.BaseTestCase):
+
+    def test_statement_incr(self):
+        target = mysql.MySQLFilteredUpdate(
+            FakeTable(), filters={'field_str': 'x'},
+            data={'field_int': expressions.Incr(-1)})
+
+        self.assertEqual(
+            target.get_statement(),
+            "UPDATE `FAKE_TABLE` SET `field_int` = `field_int` + %s "
+            "WHERE `field_str` = %s")
+        self.assertEqual(target.get_values(), (-1, 'x'))
+
 
 class MySQLDeleteTestCase(base.BaseTestCase):
 
@@ -179,3 +293,260 @@ class MySQLSelectTestCase(base.BaseTestCase):
             "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
             "FROM `FAKE_TABLE` WHERE `field_bool` <= %s AND "
             "`field_int` <= %s AND `field_str` <= %s AND `pk` <= %s")
+
+
+class StatementCacheTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        self._TABLE = FakeTable()
+        self.dialect = mysql.MySQLDialect(statement_cache_size=2)
+        self.cache = self.dialect.statement_cache
+
+    def test_select_reuses_compiled_statement(self):
+        first = self.dialect.select(self._TABLE, {'pk': 1, 'field_int': 2})
+        second = self.dialect.select(self._TABLE, {'pk': 3,
+                                                   'field_int': filters.EQ(4)})
+
+        self.assertIs(first.get_compiled(), second.get_compiled())
+        self.assertEqual(second.get_values(), [4, 3])
+        self.assertEqual(self.cache.get_stats(),
+                         {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 2})
+
+    def test_select_other_operator_is_other_shape(self):
+        first = self.dialect.select(self._TABLE, {'pk': 1})
+        second = self.dialect.select(self._TABLE, {'pk': filters.GT(1)})
+
+        self.assertNotEqual(first.get_statement(), second.get_statement())
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_update_by_changed_columns(self):
+        first = self.dialect.update(self._TABLE, {'pk': 1}, {'field_int': 2})
+        second = self.dialect.update(self._TABLE, {'pk': 3}, {'field_int': 4})
+        third = self.dialect.update(self._TABLE, {'pk': 3}, {'field_str': 4})
+
+        self.assertIs(first.get_compiled(), second.get_compiled())
+        self.assertIsNot(first.get_compiled(), third.get_compiled())
+        self.assertEqual(second.get_values(), (4, 3))
+
+    def test_unknown_column_is_checked_on_compile(self):
+        self.assertRaises(ValueError, self.dialect.select, self._TABLE,
+                          {'unknown': 1})
+        self.assertEqual(len(self.cache), 0)
+
+    def test_bounded_size(self):
+        self.dialect.insert(self._TABLE, {}).get_compiled()
+        self.dialect.delete(self._TABLE, {}).get_compiled()
+        self.dialect.insert(self._TABLE, {}).get_compiled()
+        self.dialect.select(self._TABLE, {}).get_compiled()
+        self.dialect.delete(self._TABLE, {}).get_compiled()
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_clear(self):
+        self.dialect.select(self._TABLE, {})
+
+        self.cache.clear()
+
+        self.assertEqual(self.cache.get_stats(),
+                         {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 2})
+
+
+class MySQLSelectPaginationTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        self._TABLE = FakeTable()
+
+    def test_limit_offset(self):
+        target = mysql.MySQLSelect(self._TABLE, {'field_int': 1}, limit=10,
+                                   offset=20)
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` WHERE `field_int` = %s LIMIT %s OFFSET %s")
+        self.assertEqual(target.get_values(), [1, 10, 20])
+
+    def test_offset_without_limit(self):
+        target = mysql.MySQLSelect(self._TABLE, {}, offset=20)
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` LIMIT 18446744073709551615 OFFSET %s")
+
+    def test_keyset(self):
+        target = mysql.MySQLSelect(
+            self._TABLE, {'field_bool': True},
+            order_by=['field_int', 'pk'], limit=10, keyset=[5, 'pk5'])
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` WHERE `field_bool` = %s AND "
+            "(`field_int`, `pk`) > (%s, %s) "
+            "ORDER BY `field_int` ASC, `pk` ASC LIMIT %s")
+        self.assertEqual(target.get_values(), [True, 5, 'pk5', 10])
+
+    def test_keyset_descending(self):
+        target = mysql.MySQLSelect(self._TABLE, {}, order_by=['pk'],
+                                   descending=True, keyset=['pk5'])
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` WHERE (`pk`) < (%s) ORDER BY `pk` DESC")
+
+    def test_directions_of_columns(self):
+        target = mysql.MySQLSelect(self._TABLE, {},
+                                   order_by=['field_int', 'pk'],
+                                   descending=[True, False])
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` ORDER BY `field_int` DESC, `pk` ASC")
+
+    def test_keyset_of_mixed_directions(self):
+        self.assertRaises(ValueError, mysql.MySQLSelect, self._TABLE, {},
+                          order_by=['field_int', 'pk'],
+                          descending=[True, False], keyset=[1, 'pk1'])
+
+    def test_directions_do_not_match_order(self):
+        self.assertRaises(ValueError, mysql.MySQLSelect, self._TABLE, {},
+                          order_by=['field_int', 'pk'], descending=[True])
+
+    def test_unknown_order_column(self):
+        self.assertRaises(ValueError, mysql.MySQLSelect, self._TABLE, {},
+                          order_by=['unknown'])
+
+    def test_keyset_does_not_match_order(self):
+        self.assertRaises(ValueError, mysql.MySQLSelect, self._TABLE, {},
+                          order_by=['pk'], keyset=[1, 2])
+
+    def test_columns(self):
+        target = mysql.MySQLSelect(self._TABLE, {'field_int': 1},
+                                   columns=['field_str', 'pk'])
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_str` FROM `FAKE_TABLE` "
+            "WHERE `field_int` = %s")
+
+    def test_columns_in_statement_key(self):
+        dialect = mysql.MySQLDialect()
+        dialect.select(self._TABLE, {})
+        dialect.select(self._TABLE, {}, columns=['field_str'])
+        dialect.select(self._TABLE, {}, columns=['field_str'])
+
+        self.assertEqual((dialect.statement_cache.hits,
+                          dialect.statement_cache.misses), (1, 2))
+
+    def test_unknown_column(self):
+        self.assertRaises(ValueError, mysql.MySQLSelect, self._TABLE, {},
+                          columns=['unknown'])
+
+    def test_for_update(self):
+        target = mysql.MySQLSelect(self._TABLE, {'pk': 1}, limit=2,
+                                   for_update=True)
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` WHERE `pk` = %s LIMIT %s FOR UPDATE")
+        self.assertEqual(target.get_values(), [1, 2])
+
+    def test_nowait_and_skip_locked(self):
+        nowait = mysql.MySQLSelect(self._TABLE, {}, nowait=True)
+        skip_locked = mysql.MySQLSelect(self._TABLE, {}, skip_locked=True)
+
+        self.assertTrue(nowait.get_statement().endswith(
+            "FROM `FAKE_TABLE` FOR UPDATE NOWAIT"))
+        self.assertTrue(skip_locked.get_statement().endswith(
+            "FROM `FAKE_TABLE` FOR UPDATE SKIP LOCKED"))
+        self.assertNotEqual(nowait.get_statement_key(),
+                            skip_locked.get_statement_key())
+        self.assertNotEqual(
+            nowait.get_statement_key(),
+            mysql.MySQLSelect(self._TABLE, {}).get_statement_key())
+        self.assertRaises(ValueError, mysql.MySQLSelect, self._TABLE, {},
+                          nowait=True, skip_locked=True)
+
+
+class MySQLSelectExpressionsTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        self._TABLE = FakeTable()
+        self.dialect = mysql.MySQLDialect()
+
+    def test_in_lists_share_statement(self):
+        first = self.dialect.select(self._TABLE,
+                                    {'pk': filters.In([1, 2, 3])})
+        second = self.dialect.select(self._TABLE,
+                                     {'pk': filters.In([4, 5, 6, 7])})
+
+        self.assertIs(first.get_compiled(), second.get_compiled())
+        self.assertEqual(
+            first.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` WHERE `pk` IN (%s, %s, %s, %s)")
+        self.assertEqual(first.get_values(), [1, 2, 3, 3])
+
+    def test_or_clause(self):
+        target = self.dialect.select(
+            self._TABLE,
+            filters.OR({'pk': 1},
+                       {'field_int': filters.Between(2, 3),
+                        'field_str': filters.StartsWith('a')}),
+            limit=5)
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT `pk`, `field_int`, `field_str`, `field_bool` "
+            "FROM `FAKE_TABLE` WHERE (`pk` = %s OR "
+            "`field_int` BETWEEN %s AND %s AND `field_str` LIKE %s) "
+            "LIMIT %s")
+        self.assertEqual(target.get_values(), [1, 2, 3, 'a%', 5])
+
+    def test_unknown_column_in_clause(self):
+        self.assertRaises(ValueError, self.dialect.select, self._TABLE,
+                          filters.OR({'pk': 1}, {'unknown': 2}))
+
+    def test_filtered_delete_by_clause(self):
+        target = self.dialect.filtered_delete(
+            self._TABLE, filters.AND({'pk': filters.NotIn([1, 2])}))
+
+        self.assertEqual(target.get_statement(),
+                         "DELETE FROM `FAKE_TABLE` WHERE "
+                         "(`pk` NOT IN (%s, %s))")
+        self.assertEqual(target.get_values(), (1, 2))
+
+
+class MySQLCountTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        self._TABLE = FakeTable()
+
+    def test_count(self):
+        target = mysql.MySQLCount(self._TABLE, {'field_int': filters.GT(1)})
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT COUNT(*) AS `count` FROM `FAKE_TABLE` "
+            "WHERE `field_int` > %s")
+        self.assertEqual(target.get_values(), [1])
+
+    def test_exists(self):
+        target = mysql.MySQLExists(self._TABLE, {'pk': 1})
+
+        self.assertEqual(
+            target.get_statement(),
+            "SELECT 1 AS `exists` FROM `FAKE_TABLE` WHERE `pk` = %s LIMIT 1")
+        self.assertEqual(target.get_values(), [1])
+
+    def test_exists_without_filters(self):
+        target = mysql.MySQLExists(self._TABLE, {})
+
+        self.assertEqual(target.get_statement(),
+                         "SELECT 1 AS `exists` FROM `FAKE_TABLE` LIMIT 1")
@@ -142,3 +142,175 @@ class IsNotTestCase(base.BaseTestCase):
 
     def test_value_property(self):
         self.assertEqual(self._expr.value, TEST_VALUE)
+
+
+class ConvertValueTestCase(base.BaseTestCase):
+
+    def test_convert_value(self):
+        result = filters.GT(value=TEST_VALUE).convert_value(str.lower)
+
+        self.assertIsInstance(result, filters.GT)
+        self.assertEqual(result.value, TEST_VALUE.lower())
+
+    def test_convert_none_value(self):
+        expr = filters.Is(value=None)
+
+        self.assertIs(expr.convert_value(str.lower), expr)
+
+
+class InTestCase(base.BaseTestCase):
+
+    def test_construct_expression_padded(self):
+        expr = filters.In([1, 2, 3])
+
+        self.assertEqual(expr.construct_expression(name=TEST_NAME),
+                         '`' + TEST_NAME + '` IN (%s, %s, %s, %s)')
+        self.assertEqual(expr.get_values(), [1, 2, 3, 3])
+        self.assertEqual(expr.get_shape(), (filters.In, 4))
+
+    def test_same_shape_of_close_sizes(self):
+        self.assertEqual(filters.In(range(5)).get_shape(),
+                         filters.In(range(8)).get_shape())
+        self.assertEqual(filters.In(range(1025)).get_shape(),
+                         (filters.In, 2048))
+
+    def test_empty(self):
+        self.assertEqual(filters.In([]).construct_expression(TEST_NAME),
+                         'FALSE')
+        self.assertEqual(filters.NotIn([]).construct_expression(TEST_NAME),
+                         'TRUE')
+        self.assertEqual(filters.In([]).get_values(), [])
+
+    def test_not_in(self):
+        expr = filters.NotIn([1])
+
+        self.assertEqual(expr.construct_expression(name=TEST_NAME),
+                         '`' + TEST_NAME + '` NOT IN (%s)')
+        self.assertTrue(expr.match(2))
+        self.assertFalse(expr.match(1))
+        self.assertFalse(expr.match(None))
+
+    def test_convert_value(self):
+        result = filters.In(['A', None]).convert_value(str.lower)
+
+        self.assertIsInstance(result, filters.In)
+        self.assertEqual(result.value, ['a', None])
+
+
+class BetweenTestCase(base.BaseTestCase):
+
+    def test_construct_expression(self):
+        expr = filters.Between(1, 5)
+
+        self.assertEqual(expr.construct_expression(name=TEST_NAME),
+                         '`' + TEST_NAME + '` BETWEEN %s AND %s')
+        self.assertEqual(expr.get_values(), [1, 5])
+
+    def test_match(self):
+        expr = filters.Between(1, 5)
+
+        self.assertTrue(expr.match(1))
+        self.assertTrue(expr.match(5))
+        self.assertFalse(expr.match(6))
+        self.assertFalse(expr.match(None))
+
+
+class LikeTestCase(base.BaseTestCase):
+
+    def test_construct_expression(self):
+        expr = filters.Like('a%')
+
+        self.assertEqual(expr.construct_expression(name=TEST_NAME),
+                         '`' + TEST_NAME + '` LIKE %s')
+        self.assertEqual(expr.get_values(), ['a%'])
+
+    def test_match(self):
+        expr = filters.Like('a_c%')
+
+        self.assertTrue(expr.match('abc'))
+        self.assertTrue(expr.match('a.cdef'))
+        self.assertFalse(expr.match('ac'))
+        self.assertFalse(expr.match(None))
+
+    def test_match_escaped(self):
+        self.assertTrue(filters.Like('100\\%').match('100%'))
+        self.assertFalse(filters.Like('100\\%').match('1000'))
+
+    def test_starts_with_escapes_prefix(self):
+        expr = filters.StartsWith('50%_off')
+
+        self.assertEqual(expr.get_values(), ['50\\%\\_off%'])
+        self.assertTrue(expr.match('50%_off now'))
+        self.assertFalse(expr.match('50% off'))
+
+
+class ClauseTestCase(base.BaseTestCase):
+
+    def setUp(self):
+        self._clause = filters.OR(
+            {'a': 1},
+            filters.AND({'b': filters.In([2, 3])}, {'c': filters.GT(4)}))
+
+    def test_construct_where(self):
+        self.assertEqual(
+            filters.construct_where(self._clause),
+            '(`a` = %s OR (`b` IN (%s, %s) AND `c` > %s))')
+        self.assertEqual(filters.get_values(self._clause), [1, 2, 3, 4])
+        self.assertEqual(filters.get_names(self._clause),
+                         set(['a', 'b', 'c']))
+
+    def test_dict_is_implicit_and(self):
+        values = {'b': 2, 'a': filters.NE(1)}
+
+        self.assertEqual(filters.construct_where(values),
+                         '`a` <> %s AND `b` = %s')
+        self.assertEqual(filters.get_values(values), [1, 2])
+
+    def test_empty_clauses(self):
+        self.assertEqual(filters.construct_where(filters.OR()), 'FALSE')
+        self.assertEqual(filters.construct_where(filters.AND({})),
+                         '(TRUE)')
+
+    def test_match(self):
+        rows = [{'a': 1, 'b': 0, 'c': 0},
+                {'a': 0, 'b': 3, 'c': 5},
+                {'a': 0, 'b': 3, 'c': 4}]
+
+        self.assertEqual([filters.match(self._clause, row.get)
+                          for row in rows], [True, True, False])
+
+    def test_convert_values(self):
+        result = filters.convert_values(self._clause,
+                                        lambda name, value: value * 10)
+
+        self.assertIsInstance(result, filters.OR)
+        self.assertEqual(filters.get_values(result), [10, 20, 30, 40])
+        self.assertEqual(filters.get_shape(result),
+                         filters.get_shape(self._clause))
+
+
+class ColumnTestCase(base.BaseTestCase):
+
+    def test_operators(self):
+        clause = ((filters.Column('a') == 1) |
+                  ~filters.Column('b').in_([2, 3]) &
+                  (filters.Column('c') != None))  # noqa
+
+        self.assertEqual(
+            filters.construct_where(clause),
+            '((`a` = %s) OR (NOT (`b` IN (%s, %s)) AND (`c` IS NOT %s)))')
+        self.assertEqual(filters.get_values(clause), [1, 2, 3, None])
+
+    def test_match(self):
+        clause = filters.Column('a').between(1, 3) & ~(
+            filters.Column('b') == 'x')
+
+        self.assertTrue(filters.match(clause, {'a': 2, 'b': 'y'}.get))
+        self.assertFalse(filters.match(clause, {'a': 2, 'b': 'x'}.get))
+        self.assertFalse(filters.match(clause, {'a': 4, 'b': 'y'}.get))
+
+    def test_not_dict(self):
+        clause = filters.NOT({'a': 1, 'b': filters.LT(2)})
+
+        self.assertEqual(filters.construct_where(clause),
+                         'NOT (`a` = %s AND `b` < %s)')
@@ -0,0 +1,35 @@
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+#
+# Copyright 2019 Mail.ru Group
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from restalchemy.storage.sql import utils
+from restalchemy.tests.unit import base
+
+
+class MarkerTestCase(base.BaseTestCase):
+
+    def test_encode_decode(self):
+        values = [1, u'text', None, b'\xff\x00binary']
+
+        marker = utils.encode_marker(['a', '-b', 'c', 'd'], values)
+
+        self.assertEqual(utils.decode_marker(marker),
+                         (['a', '-b', 'c', 'd'], values))
+
+    def test_decode_invalid_marker(self):
+        self.assertRaises(ValueError, utils.decode_marker, 'invalid')
+        self.assertRaises(ValueError, utils.decode_marker, 'e30=')
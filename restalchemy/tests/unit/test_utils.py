@@ -16,6 +16,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import uuid
+
+import mock
+
 from restalchemy.common import utils
 from restalchemy.tests.unit import base
 
@@ -51,3 +55,38 @@ class ReadOnlyDictProxyTestCase(base.BaseTestCase):
             d[1] = 5
 
         self.assertRaises(TypeError, rotest, dict1)
+
+
+class UUID7TestCase(base.BaseTestCase):
+
+    def test_version_and_variant(self):
+        value = utils.uuid7()
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_timestamp(self):
+        with mock.patch.object(utils, '_UUID7_STATE', [0, 0]):
+            with mock.patch('time.time', return_value=1500000000.123):
+                value = utils.uuid7()
+
+        self.assertEqual(value.int >> 80, 1500000000123)
+
+    def test_ordered(self):
+        values = [utils.uuid7() for _ in range(10000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    def test_ordered_when_clock_goes_back(self):
+        first = utils.uuid7()
+        with mock.patch('time.time', return_value=0):
+            second = utils.uuid7()
+
+        self.assertLess(first, second)
+
+    def test_counter_overflow(self):
+        with mock.patch('time.time', return_value=1600000000.0):
+            values = [utils.uuid7() for _ in range(0x1001)]
+
+        self.assertEqual(values, sorted(values))